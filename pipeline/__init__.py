@@ -1,34 +1,47 @@
-# pipeline/__init__.py
 """
 Pipeline package exports
 Ensures run_all.py can import functions cleanly.
+
+Exports are resolved lazily (PEP 562) so `import pipeline` stays cheap:
+Selenium, requests, textstat and slugify are only imported by the
+submodule that actually needs them, and nothing touches the filesystem
+until a stage writes its output.
 """
 
-# --- Import scrapers ---
-from .scrapers.trends_scraper import scrape_google_trends
-from .scrapers.news_scraper import scrape_news
-from .scrapers.competitor_scraper import scrape_competitors
-from .scrapers.social_scraper import scrape_instagram_profile
-
-# --- Import AI generators ---
-from .ai_generator import (
-    generate_web_copy,
-    generate_blog,
-    generate_social_posts,
-    generate_ads,
-)
-
-# --- Import QC ---
-from .qc import run_quality_checks
-
-__all__ = [
-    "scrape_google_trends",
-    "scrape_news",
-    "scrape_competitors",
-    "scrape_instagram_profile",
-    "generate_web_copy",
-    "generate_blog",
-    "generate_social_posts",
-    "generate_ads",
-    "run_quality_checks",
-]
+import importlib
+
+_EXPORTS = {
+    # --- Scrapers ---
+    "scrape_google_trends": ".scrapers.trends_scraper",
+    "scrape_news": ".scrapers.news_scraper",
+    "scrape_competitors": ".scrapers.competitor_scraper",
+    "scrape_instagram_profile": ".scrapers.social_scraper",
+
+    # --- AI generators ---
+    "generate_web_copy": ".ai_generator",
+    "generate_blog": ".ai_generator",
+    "generate_social_posts": ".ai_generator",
+    "generate_ads": ".ai_generator",
+
+    # --- QC ---
+    "run_quality_checks": ".qc",
+
+    # --- Output location ---
+    "set_output_root": ".paths",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # resolve once
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
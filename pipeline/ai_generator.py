@@ -1,26 +1,44 @@
 import os
 import json
-import requests
-import base64
+import time
 import random
+import threading
 from datetime import datetime
-from slugify import slugify
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .build_cache import build_cache, stage_key, file_digest
+from .image_cache import image_cache, image_key
+from .artifacts import artifact_store
+from .phash import phash_index
+from .sd_batcher import LOCAL_SD_BATCH, get_batcher
+from .ingest import ingest, stream_raw, discard
+from .paths import output_file
+from .markdown_outline import outline, remember
+from .text_model import text_model, text_model_stream, model_id
+from .qc import IncrementalQC, BrandViolation
+from .tracing import span
+from . import transport
+
+# `requests` (via .transport) and `slugify` are imported inside the functions that use them
+# so importing this module (e.g. just for QC workers) stays cheap.
 
 # ============================================================
-# OUTPUT FOLDERS
+# PROVIDER ENDPOINTS (override via env or configure_providers())
 # ============================================================
 
-os.makedirs("outputs/web_copy", exist_ok=True)
-os.makedirs("outputs/blogs", exist_ok=True)
-os.makedirs("outputs/social", exist_ok=True)
-os.makedirs("outputs/ads", exist_ok=True)
-os.makedirs("outputs/images", exist_ok=True)
+HF_API_URL = os.getenv(
+    "HF_API_URL",
+    "https://router.huggingface.co/hf-inference/models/"
+    "stabilityai/stable-diffusion-xl-base-1.0"
+)
+LOCAL_SD_URL = os.getenv("LOCAL_SD_URL", "http://127.0.0.1:7860/sdapi/v1/txt2img")
+STOCK_IMAGES_PATH = os.getenv("STOCK_IMAGES_PATH", "assets/stock_images.json")
 
 # ============================================================
 # FREE STOCK IMAGES (Guaranteed Free Commercial License)
 # ============================================================
 
-STOCK_IMAGES = {
+DEFAULT_STOCK_IMAGES = {
     "interior": [
         "https://images.pexels.com/photos/6588571/pexels-photo-6588571.jpeg",
         "https://images.pexels.com/photos/271743/pexels-photo-271743.jpeg",
@@ -32,18 +50,103 @@ STOCK_IMAGES = {
     ]
 }
 
+
+def _load_stock_images(path):
+    """{category: [url, ...]} from a JSON file, or the built-in Pexels set."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data:
+            return data
+    except (OSError, ValueError):
+        pass
+    return DEFAULT_STOCK_IMAGES
+
+
+STOCK_IMAGES = _load_stock_images(STOCK_IMAGES_PATH)
+
 PLACEHOLDER_IMAGE = "assets/placeholder.jpg"  # must exist
 
+
+def configure_providers(hf_url=None, local_sd_url=None, stock_images=None):
+    """Point the image providers somewhere else (e.g. pipeline.mock_server)."""
+    global HF_API_URL, LOCAL_SD_URL, STOCK_IMAGES
+    if hf_url:
+        HF_API_URL = hf_url
+    if local_sd_url:
+        LOCAL_SD_URL = local_sd_url
+    if stock_images:
+        STOCK_IMAGES = stock_images
+
+# Bump when a generator's prompt template or output shape changes —
+# it is part of every build-cache key below.
+TEMPLATE_VERSION = "2"
+IMAGE_PIPELINE_VERSION = "1"
+
+# ============================================================
+# IMAGE PROVIDER POLICY
+# ============================================================
+
+# "serial": HF → local SD → stock, each after the previous one fails.
+# "hedged": start HF, launch the next provider if nothing has answered
+#           within IMAGE_HEDGE_DELAY seconds (or as soon as one fails),
+#           keep the first image that arrives and discard the rest.
+IMAGE_PROVIDER_MODE = os.getenv("IMAGE_PROVIDER_MODE", "serial")
+IMAGE_HEDGE_DELAY = float(os.getenv("IMAGE_HEDGE_DELAY", "8"))
+
+# Overall budget per image across all providers; the placeholder is used
+# once it runs out. The default equals the old worst case (60 + 60 + 30).
+IMAGE_DEADLINE = float(os.getenv("IMAGE_DEADLINE", "150"))
+
+# When every provider fails the placeholder is recorded in the build cache
+# for this long, so unchanged re-runs don't retry the network; 0 retries
+# on every run.
+IMAGE_FAILURE_TTL = float(os.getenv("IMAGE_FAILURE_TTL", "3600"))
+
+HF_TIMEOUT = 60
+LOCAL_SD_TIMEOUT = 60
+STOCK_TIMEOUT = 30
+
+# Generation parameters sent to each provider. They are part of the
+# image-cache key, so changing one regenerates instead of reusing.
+HF_PARAMS = {"negative_prompt": "low quality, blurry, distorted"}
+LOCAL_SD_PARAMS = {"steps": 20}
+
+# Near-duplicate policy (perceptual hash vs other slugs' recent images):
+# "reroll" retries with a new seed / another stock photo up to
+# IMAGE_REROLLS times, "warn" only logs, "off" skips hashing.
+IMAGE_DEDUP = os.getenv("IMAGE_DEDUP", "reroll")
+IMAGE_REROLLS = int(os.getenv("IMAGE_REROLLS", "2"))
+
+# Blogs stream into outputs/blogs/<slug>.md.part under incremental QC and
+# abort on the first brand violation; 0 generates the whole body first.
+BLOG_STREAM = os.getenv("BLOG_STREAM", "1") != "0"
+
+
+# Images go through the artifact store: one blob per distinct content,
+# outputs/images/<slug>.<ext> is a hardlink to it.
+
+def _save_image(slug, data, ext):
+    return artifact_store.put_bytes(f"images/{slug}", data, ext)
+
+
+def _place_image(slug, tmp, ext):
+    """Move a downloaded temp file into the store and outputs/images/."""
+    return artifact_store.put_file(f"images/{slug}", tmp, ext, move=True)
+
+
 # ============================================================
 # 1️⃣ HuggingFace SDXL — Free Tier
 # ============================================================
 
-def generate_with_huggingface(prompt, slug):
-    HF_API_URL = (
-        "https://router.huggingface.co/hf-inference/models/"
-        "stabilityai/stable-diffusion-xl-base-1.0"
-    )
+def _report(cancel, *args):
+    """print() a provider failure unless the attempt was cancelled (a hedging loser)."""
+    if cancel is None or not cancel.is_set():
+        print(*args)
 
+
+def _fetch_huggingface(prompt, timeout=HF_TIMEOUT, params=None, cancel=None):
+    """Return (temp file, ext) or None."""
     headers = {
         "Authorization": f"Bearer {os.getenv('HF_API_KEY')}",
         "Content-Type": "application/json"
@@ -51,29 +154,39 @@ def generate_with_huggingface(prompt, slug):
 
     payload = {
         "inputs": prompt,
-        "parameters": {
-            "negative_prompt": "low quality, blurry, distorted"
-        }
+        "parameters": dict(params or HF_PARAMS)
     }
 
     try:
-        response = requests.post(HF_API_URL, headers=headers, json=payload, timeout=60)
+        response = transport.post(
+            HF_API_URL, provider="huggingface", headers=headers, json=payload,
+            timeout=timeout, stream=True, cancel=cancel
+        )
+        if response is None:
+            return None
 
         if response.status_code == 200:
-            r = response.json()
-            if "generated_image" in r:
-                img_bytes = base64.b64decode(r["generated_image"])
-                path = f"outputs/images/{slug}.png"
-                with open(path, "wb") as f:
-                    f.write(img_bytes)
-                print("🖼️ HuggingFace SDXL image saved:", path)
-                return path
-            
-        print("⚠️ HF Error →", response.text)
+            # JSON {"generated_image": b64} or a raw image body
+            files = ingest(response, "generated_image", "png", limit=1, cancel=cancel)
+            if files:
+                return files[0]
+            _report(cancel, "⚠️ HF response missing image")
+            return None
+
+        _report(cancel, "⚠️ HF Error →", response.text)
 
     except Exception as e:
-        print("⚠️ HuggingFace Failure:", e)
+        _report(cancel, "⚠️ HuggingFace Failure:", e)
+
+    return None
+
 
+def generate_with_huggingface(prompt, slug, timeout=HF_TIMEOUT):
+    result = _fetch_huggingface(prompt, timeout)
+    if result:
+        path = _place_image(slug, *result)
+        print("🖼️ HuggingFace SDXL image saved:", path)
+        return path
     return None
 
 
@@ -81,31 +194,42 @@ def generate_with_huggingface(prompt, slug):
 # 2️⃣ Local Stable Diffusion (AUTOMATIC1111 API)
 # ============================================================
 
-def generate_with_local_sd(prompt, slug):
+def _fetch_local_sd(prompt, timeout=LOCAL_SD_TIMEOUT, params=None, cancel=None):
+    """Return (temp file, ext) or None."""
+    params = params or LOCAL_SD_PARAMS
+    if LOCAL_SD_BATCH > 1:
+        # Coalesced with other in-flight slugs into one txt2img call
+        tmp = get_batcher(lambda: LOCAL_SD_URL).generate(prompt, params, timeout, cancel)
+        return (tmp, "png") if tmp else None
+
     try:
-        url = "http://127.0.0.1:7860/sdapi/v1/txt2img"
+        url = LOCAL_SD_URL
 
         payload = {
             "prompt": prompt,
-            "steps": 20
+            **params
         }
 
-        response = requests.post(url, json=payload, timeout=60)
+        response = transport.post(url, provider="local_sd", json=payload, timeout=timeout,
+                                  stream=True, cancel=cancel)
 
-        if response.status_code == 200:
-            img_b64 = response.json()["images"][0]
-            img_bytes = base64.b64decode(img_b64)
+        if response is not None and response.status_code == 200:
+            files = ingest(response, "images", "png", limit=1, cancel=cancel)
+            if files:
+                return files[0]
 
-            path = f"outputs/images/{slug}.png"
-            with open(path, "wb") as f:
-                f.write(img_bytes)
+    except Exception as e:
+        _report(cancel, "ℹ️ Local SD not running → skipping:", e)
 
-            print("🖼️ Local SD image saved:", path)
-            return path
+    return None
 
-    except Exception as e:
-        print("ℹ️ Local SD not running → skipping:", e)
 
+def generate_with_local_sd(prompt, slug, timeout=LOCAL_SD_TIMEOUT):
+    result = _fetch_local_sd(prompt, timeout)
+    if result:
+        path = _place_image(slug, *result)
+        print("🖼️ Local SD image saved:", path)
+        return path
     return None
 
 
@@ -113,25 +237,40 @@ def generate_with_local_sd(prompt, slug):
 # 3️⃣ Free Stock Images (Pexels / Unsplash / Pixabay)
 # ============================================================
 
-def fallback_stock_image(slug, category="interior"):
+def _pick_stock_url(category="interior", avoid=()):
+    """Random stock URL, skipping those whose image-cache key is in avoid."""
+    images = [url for url in STOCK_IMAGES.get(category, []) if image_key("stock", url) not in avoid]
+    return random.choice(images) if images else None
+
+
+def _fetch_stock_url(url, timeout=STOCK_TIMEOUT, cancel=None):
+    """Return (temp file, ext) or None."""
+    if not url:
+        return None
     try:
-        images = STOCK_IMAGES.get(category, [])
-        if not images:
-            return None
+        response = transport.get(url, provider="stock", timeout=timeout, stream=True, cancel=cancel)
+        if response is not None:
+            with response:
+                if response.status_code == 200:
+                    return stream_raw(response, "jpg", cancel)
 
-        url = random.choice(images)
-        img_data = requests.get(url, timeout=30).content
+    except Exception as e:
+        _report(cancel, "⚠️ Stock fallback failed:", e)
 
-        path = f"outputs/images/{slug}.jpg"
-        with open(path, "wb") as f:
-            f.write(img_data)
+    return None
 
-        print("🖼️ Stock fallback image saved:", path)
-        return path
 
-    except Exception as e:
-        print("⚠️ Stock fallback failed:", e)
+def _fetch_stock(category="interior", timeout=STOCK_TIMEOUT):
+    """Return (temp file, ext) or None."""
+    return _fetch_stock_url(_pick_stock_url(category), timeout)
+
 
+def fallback_stock_image(slug, category="interior", timeout=STOCK_TIMEOUT):
+    result = _fetch_stock(category, timeout)
+    if result:
+        path = _place_image(slug, *result)
+        print("🖼️ Stock fallback image saved:", path)
+        return path
     return None
 
 
@@ -141,10 +280,8 @@ def fallback_stock_image(slug, category="interior"):
 
 def placeholder_image(slug):
     try:
-        path = f"outputs/images/{slug}.jpg"
-        with open(PLACEHOLDER_IMAGE, "rb") as src:
-            with open(path, "wb") as dst:
-                dst.write(src.read())
+        # Stored once, every slug links to the same blob
+        path = artifact_store.put_file(f"images/{slug}", PLACEHOLDER_IMAGE, "jpg", share=False)
 
         print("🖼️ Placeholder image used:", path)
         return path
@@ -158,69 +295,334 @@ def placeholder_image(slug):
 # MASTER IMAGE GENERATOR WITH 4-LAYER FALLBACK
 # ============================================================
 
-def generate_image(prompt, slug):
-    print(f"\n🖼️ Generating Image for → {slug}")
+def _provider_plan(prompt, attempt=0, avoid=()):
+    """
+    [(name, image-cache key, fetch(timeout, cancel), timeout), ...] in
+    preference order; fetch returns (temp file, ext), a cached blob path,
+    or None, and gives up quietly once the cancel event is set.
+    Generated images are keyed by prompt + parameters, stock images by
+    URL, so each stock photo is downloaded once no matter the prompt.
+    Re-rolls (attempt > 0) add a seed and skip the image keys in avoid.
+    """
+    hf_params = dict(HF_PARAMS, seed=attempt) if attempt else HF_PARAMS
+    sd_params = dict(LOCAL_SD_PARAMS, seed=attempt) if attempt else LOCAL_SD_PARAMS
+    stock_url = _pick_stock_url(avoid=avoid)
+    stock_key = image_key("stock", stock_url or "")
+    plan = [
+        ("huggingface", image_key("huggingface", prompt, **hf_params),              # 1) HuggingFace SDXL
+         lambda timeout, cancel: _fetch_huggingface(prompt, timeout, hf_params, cancel), HF_TIMEOUT),
+        ("local_sd", image_key("local_sd", prompt, **sd_params),                    # 2) Local Stable Diffusion
+         lambda timeout, cancel: _fetch_local_sd(prompt, timeout, sd_params, cancel), LOCAL_SD_TIMEOUT),
+    ]
+    if stock_url:
+        plan.append(("stock", stock_key,                                           # 3) Stock Fallback
+                     lambda timeout, cancel: _fetch_stock_cached(stock_key, stock_url, timeout, cancel),
+                     STOCK_TIMEOUT))
+    return plan
+
+
+def _fetch_stock_cached(key, url, timeout=STOCK_TIMEOUT, cancel=None):
+    """Cached blob path for this stock URL, else (temp file, ext) or None."""
+    return image_cache.get(key) or _fetch_stock_url(url, timeout, cancel)
+
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool():
+    # A loser keeps its thread until its request in flight returns (it
+    # stops at the next wait or chunk after that), so this pool is sized
+    # for several in-flight images × providers.
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv("IMAGE_HEDGE_WORKERS", "16")),
+                thread_name_prefix="image-hedge",
+            )
+        return _hedge_pool
+
+
+def _traced_fetch(name, slug, fetch, timeout, settled=None):
+    """
+    Call one provider inside a trace span, recording bytes and outcome.
+    settled doubles as the fetch's cancel event.
+    """
+    with span(f"image.{name}", cat="provider", slug=slug, timeout=round(timeout, 2)) as s:
+        result = fetch(timeout, settled)
+        if settled is not None and settled.is_set():
+            s.set(outcome="lost" if result else "cancelled", bytes=0)
+            _discard_result(result)
+            return None
+        if isinstance(result, str):
+            s.set(outcome="image_cache", bytes=0)
+        else:
+            s.set(outcome="ok" if result else "miss",
+                  bytes=os.path.getsize(result[0]) if result else 0)
+        return result
+
+
+def _discard_result(result):
+    """Drop a downloaded temp file nobody will use (cache blobs are kept)."""
+    if isinstance(result, tuple):
+        discard(result[0])
+
+
+def _serial_providers(plan, slug, deadline, failed):
+    """First provider in plan order with an image; the ones that fail are added to failed."""
+    for name, key, fetch, timeout in plan:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print(f"⏰ Image deadline reached before trying {name}")
+            break
+        result = _traced_fetch(name, slug, fetch, min(timeout, remaining))
+        if result:
+            return name, key, result
+        failed.add(name)
+    return None, None, None
+
+
+def _hedged_providers(plan, slug, deadline, failed):
+    """
+    Race providers with staggered starts. Returns (name, key, result) for
+    the first acceptable image, or (None, None, None) when every
+    provider failed or the deadline passed. Providers that came back
+    empty are added to failed.
+
+    Once a winner is chosen the race is settled: losers stop at their next
+    rate-limit wait, retry or body chunk without printing failures, and
+    whatever they still return is discarded and never written. A request
+    already waiting on the server cannot be aborted and runs to its
+    response or socket timeout.
+    """
+    pool = _get_hedge_pool()
+    settled = threading.Event()
+    pending = {}
+    queue = list(plan)
+    next_launch = time.monotonic()
 
-    # 1) HuggingFace SDXL
-    img = generate_with_huggingface(prompt, slug)
-    if img:
-        return img
+    try:
+        while queue or pending:
+            now = time.monotonic()
+            if now >= deadline:
+                print(f"⏰ Image deadline reached for {slug}")
+                break
+
+            if queue and (now >= next_launch or not pending):
+                name, key, fetch, timeout = queue.pop(0)
+                fut = pool.submit(
+                    _traced_fetch, name, slug, fetch,
+                    min(timeout, deadline - now), settled,
+                )
+                pending[fut] = (name, key)
+                next_launch = now + IMAGE_HEDGE_DELAY
+                continue
+
+            wake = deadline if not queue else min(deadline, next_launch)
+            done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                name, key = pending.pop(fut)
+                result = fut.result()
+                if result:
+                    return name, key, result
+                failed.add(name)
+                # Failed fast — don't sit out the hedge delay
+                next_launch = time.monotonic()
+
+        return None, None, None
+
+    finally:
+        settled.set()
+        for fut in pending:
+            fut.cancel()  # not-yet-started providers never run
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                _discard_result(fut.result())  # finished alongside the winner
+
+
+def _cached_image(plan):
+    """
+    (provider, key, blob) for the most preferred provider already in the
+    image cache, or None. Only prompt-keyed providers are consulted here —
+    a cached stock photo must not pre-empt a real generation attempt; the
+    stock entry is checked when the plan reaches it (_fetch_stock_cached).
+    """
+    for name, key, _, _ in plan:
+        if name == "stock":
+            continue
+        blob = image_cache.get(key)
+        if blob:
+            return name, key, blob
+    return None
 
-    # 2) Local Stable Diffusion
-    img = generate_with_local_sd(prompt, slug)
-    if img:
-        return img
 
-    # 3) Stock Fallback
-    img = fallback_stock_image(slug)
-    if img:
-        return img
+def _store_image(key, slug, provider, result):
+    """Add to the image cache and the artifact store (links, no copies)."""
+    if isinstance(result, str):  # already a cache blob
+        ext = os.path.splitext(result)[1].lstrip(".")
+        return artifact_store.put_file(f"images/{slug}", result, ext)
 
-    # 4) Guaranteed Fallback
-    return placeholder_image(slug)
+    tmp, ext = result
+    blob = image_cache.put_file(key, tmp, ext, provider=provider)
+    if blob:
+        return artifact_store.put_file(f"images/{slug}", blob, ext)
+    return _place_image(slug, tmp, ext)
 
 
-# ============================================================
-# CONTENT GENERATORS (TEXT ONLY MODELS — OSS, Mistral)
-# ============================================================
+def _near_duplicates(slug, provider, path, force=False):
+    """
+    [(distance, other slug), ...] whose recent image looks like path.
+    path is recorded in the perceptual index unless it is a duplicate
+    that will be re-rolled.
+    """
+    if IMAGE_DEDUP == "off":
+        return []
+    try:
+        digest, hashes = phash_index.hashes(path)
+    except Exception as e:
+        print("⚠️ Perceptual hash failed:", e)
+        return []
+    return phash_index.claim(slug, hashes, digest, provider, force=force or IMAGE_DEDUP != "reroll")
 
-def text_model(prompt):
-    """Simple local model stub — update if needed."""
-    return (
-        "Generated content (placeholder).\n"
-        "Replace with Mistral/OSS text model if required."
-    )
+
+def _record_placeholder(slug, path):
+    if IMAGE_DEDUP == "off" or not path:
+        return
+    try:
+        digest, hashes = phash_index.hashes(path)
+        phash_index.add(slug, hashes, digest, provider="placeholder")
+    except Exception as e:
+        print("⚠️ Perceptual hash failed:", e)
+
+
+def generate_image(prompt, slug, mode=None):
+    with span("generate_image", cat="image", slug=slug) as s:
+        stage = f"image:{slug}"
+        key = stage_key(IMAGE_PIPELINE_VERSION, prompt, slug)
+
+        cached = build_cache.lookup(stage, key)
+        if cached and cached.get("retry_after", float("inf")) > time.time():
+            if "retry_after" in cached:
+                print(f"♻️ Providers failed recently for {slug}, keeping placeholder → {cached['path']}")
+            else:
+                print(f"♻️ Image unchanged, reusing → {cached['path']}")
+            s.set(outcome="cached")
+            return cached["path"]
+
+        print(f"\n🖼️ Generating Image for → {slug}")
+
+        mode = mode or IMAGE_PROVIDER_MODE
+        deadline = time.monotonic() + IMAGE_DEADLINE
+        rejected = set()  # image keys that came back as near-duplicates
+        failed = set()    # providers that came back empty; not retried on re-rolls
+        duplicate = None  # (provider, key, result) being re-rolled, kept as a fallback
+
+        for attempt in range(IMAGE_REROLLS + 1):
+            plan = [p for p in _provider_plan(prompt, attempt, rejected) if p[0] not in failed]
+            if duplicate:
+                plan = [p for p in plan if p[0] == duplicate[0]]  # re-roll only that provider
+            hit = _cached_image(plan)
+            if hit:
+                name, ikey, result = hit
+                print(f"♻️ Image cache hit ({name}) →", result)
+            elif mode == "hedged":
+                name, ikey, result = _hedged_providers(plan, slug, deadline, failed)
+            else:
+                name, ikey, result = _serial_providers(plan, slug, deadline, failed)
+
+            final = attempt == IMAGE_REROLLS
+            if not result and duplicate:
+                # The re-roll failed: a near-duplicate beats the placeholder
+                (name, ikey, result), hit, final = duplicate, None, True
+            elif not result:
+                break
+            elif duplicate:
+                _discard_result(duplicate[2])
+            duplicate = None
+
+            path = result if isinstance(result, str) else result[0]
+            dupes = _near_duplicates(slug, name, path, force=final)
+            if dupes and IMAGE_DEDUP == "reroll" and not final:
+                print(f"🔁 Image for {slug} ≈ {dupes[0][1]} (distance {dupes[0][0]}) — re-rolling {name}")
+                rejected.add(ikey)
+                duplicate = (name, ikey, result)
+                continue
+            if dupes:
+                print(f"⚠️ Image for {slug} ≈ {', '.join(other for _, other in dupes[:3])}")
+
+            img = _store_image(ikey, slug, name, result)
+            print(f"🖼️ Image saved via {name}:", img)
+            build_cache.record(stage, key, {"path": img}, outputs=[img])
+            s.set(provider=name, mode=mode, bytes=os.path.getsize(img),
+                  outcome="image_cache" if hit else "ok", rerolls=attempt, duplicates=len(dupes))
+            return img
+
+        # 4) Guaranteed Fallback — cached only for IMAGE_FAILURE_TTL, after
+        #    which the next run retries the real providers.
+        s.set(provider="placeholder", mode=mode)
+        with span("image.placeholder", cat="provider", slug=slug) as p:
+            img = placeholder_image(slug)
+            p.set(outcome="ok" if img else "miss",
+                  bytes=os.path.getsize(img) if img else 0)
+        _record_placeholder(slug, img)
+        if img and IMAGE_FAILURE_TTL > 0:
+            build_cache.record(stage, key, {"path": img, "retry_after": time.time() + IMAGE_FAILURE_TTL},
+                               outputs=[img])
+        return img
 
 
 # ============================================================
 # WEB COPY GENERATOR
 # ============================================================
 
-def generate_web_copy():
-    title = "Interior Emulsion Paints – Calyco"
-    slug = slugify(title)
+DEFAULT_WEB_COPY_TITLE = "Interior Emulsion Paints – Calyco"
+
+
+def _manifest_result(output):
+    """What the run manifest keeps for copy: everything but the body (read back from the file)."""
+    return {k: v for k, v in output.items() if k != "body"}
+
+
+def generate_web_copy(title=DEFAULT_WEB_COPY_TITLE, prompt=None, image_prompt=None, slug=None):
+    from slugify import slugify
 
-    body = text_model(
+    slug = slug or slugify(title)
+    prompt = prompt or (
         "Write a high-quality, SEO-friendly webpage copy for Calyco interior paints."
+        if title == DEFAULT_WEB_COPY_TITLE
+        else f"Write a high-quality, SEO-friendly webpage copy for: {title}"
     )
+    path = output_file("web_copy", f"{slug}.json")
 
     img = generate_image(
-        f"Modern Indian home interior painted in calming tones — {title}",
+        image_prompt or f"Modern Indian home interior painted in calming tones — {title}",
         slug
     )
 
+    stage = f"web_copy:{slug}"
+    key = stage_key(TEMPLATE_VERSION, model_id(), title, prompt, img, file_digest(img))
+    cached = build_cache.lookup(stage, key)
+    if cached:
+        print("♻️ Web copy unchanged")
+        with open(path, "r") as f:
+            return json.load(f)
+
+    body = text_model(prompt)
+
     output = {
         "title": title,
         "slug": slug,
+        "description": outline(body)["excerpt"],
         "body": body,
         "image": img,
         "timestamp": str(datetime.utcnow())
     }
 
-    path = f"outputs/web_copy/{slug}.json"
     with open(path, "w") as f:
         json.dump(output, f, indent=2)
 
+    build_cache.record(stage, key, _manifest_result(output), outputs=[path])
     print("✔ Web copy generated")
     return output
 
@@ -229,29 +631,92 @@ def generate_web_copy():
 # BLOG GENERATOR
 # ============================================================
 
-def generate_blog():
-    topic = "Trending Home Paint Colors for 2025"
-    slug = slugify(topic)
-
-    body = text_model(f"Write a 700-word blog on: {topic}")
+DEFAULT_BLOG_TOPIC = "Trending Home Paint Colors for 2025"
+
+
+def _stream_body(prompt, path, slug):
+    """
+    Append the body to <path>.part as chunks arrive, with IncrementalQC
+    watching. Moved into place once complete; on a brand violation the
+    stream is closed (no more tokens paid for), the partial file removed
+    and BrandViolation raised.
+    """
+    part = f"{path}.part"
+    qc = IncrementalQC()
+    chunks = []
+    start = time.perf_counter()
+
+    with span("blog.stream", cat="provider", slug=slug) as s:
+        stream = text_model_stream(prompt)
+        try:
+            with open(part, "w", encoding="utf-8") as f:
+                for chunk in stream:
+                    if not chunks:
+                        s.set(ttfb_ms=round((time.perf_counter() - start) * 1000, 2))
+                    chunks.append(chunk)
+                    f.write(chunk)
+                    f.flush()
+                    violations = qc.feed(chunk)
+                    if violations:
+                        s.set(outcome="aborted", chars=qc.chars, violations=violations)
+                        raise BrandViolation(slug, violations)
+                violations = qc.finish()
+                if violations:
+                    s.set(outcome="rejected", chars=qc.chars, violations=violations)
+                    raise BrandViolation(slug, violations)
+        except BaseException:
+            stream.close()
+            discard(part)
+            raise
+
+        os.replace(part, path)
+        body = "".join(chunks)
+        remember(body, qc.outline, qc.keywords)  # parsed while streaming; QC / SEO reuse it
+        s.set(outcome="ok", chars=qc.chars, chunks=len(chunks), words=qc.words, headings=qc.headings)
+    return body
+
+
+def generate_blog(topic=DEFAULT_BLOG_TOPIC, prompt=None, image_prompt=None, slug=None):
+    from slugify import slugify
+
+    slug = slug or slugify(topic)
+    prompt = prompt or f"Write a 700-word blog on: {topic}"
+    path = output_file("blogs", f"{slug}.md")
 
     img = generate_image(
-        f"Stylish 2025 trending color palette interior concept art",
+        image_prompt or (
+            "Stylish 2025 trending color palette interior concept art"
+            if topic == DEFAULT_BLOG_TOPIC
+            else f"Interior concept art for: {topic}"
+        ),
         slug
     )
 
+    stage = f"blog:{slug}"
+    key = stage_key(TEMPLATE_VERSION, model_id(), topic, prompt, img, file_digest(img))
+    cached = build_cache.lookup(stage, key)
+    if cached:
+        print("♻️ Blog unchanged")
+        with open(path, "r", encoding="utf-8") as f:
+            return dict(cached, body=f.read())
+
+    if BLOG_STREAM:
+        body = _stream_body(prompt, path, slug)
+    else:
+        body = text_model(prompt)
+        with open(path, "w") as f:
+            f.write(body)
+
     output = {
         "title": topic,
         "slug": slug,
+        "description": outline(body)["excerpt"],
         "body": body,
         "image": img,
         "timestamp": str(datetime.utcnow())
     }
 
-    path = f"outputs/blogs/{slug}.md"
-    with open(path, "w") as f:
-        f.write(body)
-
+    build_cache.record(stage, key, _manifest_result(output), outputs=[path])
     print("✔ Blog generated")
     return output
 
@@ -260,21 +725,31 @@ def generate_blog():
 # SOCIAL POSTS
 # ============================================================
 
-def generate_social_posts():
-    posts = [
-        "🎨 Discover 2025’s hottest paint trends with Calyco!",
-        "✨ Transform your home with AI-personalised color palettes.",
-        "🏡 Your dream interiors start with the right color choice."
-    ]
+DEFAULT_SOCIAL_POSTS = [
+    "🎨 Discover 2025’s hottest paint trends with Calyco!",
+    "✨ Transform your home with AI-personalised color palettes.",
+    "🏡 Your dream interiors start with the right color choice."
+]
+
 
-    slug = "social-posts"
-    img = generate_image("simple pastel color wall aesthetic", slug)
+def generate_social_posts(posts=None, image_prompt=None, slug="social-posts"):
+    posts = posts or DEFAULT_SOCIAL_POSTS
+    img = generate_image(image_prompt or "simple pastel color wall aesthetic", slug)
+    path = output_file("social", f"{slug.replace('-', '_')}.json")
+
+    stage = f"social:{slug}"
+    key = stage_key(TEMPLATE_VERSION, posts, img, file_digest(img))
+    if build_cache.lookup(stage, key) is not None:
+        print("♻️ Social posts unchanged")
+        with open(path, "r") as f:
+            return json.load(f)
 
     output = {"posts": posts, "image": img}
 
-    with open("outputs/social/social_posts.json", "w") as f:
+    with open(path, "w") as f:
         json.dump(output, f, indent=2)
 
+    build_cache.record(stage, key, {"path": path}, outputs=[path])
     print("✔ Social posts generated")
     return output
 
@@ -283,15 +758,26 @@ def generate_social_posts():
 # ADS
 # ============================================================
 
-def generate_ads():
-    ads = [
-        "🏡 Upgrade your walls — choose Calyco Premium Paints!",
-        "✨ Smooth finish. Rich colors. Zero hassle.",
-        "🎨 Transform your home with Calyco’s 2025 palette."
-    ]
+DEFAULT_ADS = [
+    "🏡 Upgrade your walls — choose Calyco Premium Paints!",
+    "✨ Smooth finish. Rich colors. Zero hassle.",
+    "🎨 Transform your home with Calyco’s 2025 palette."
+]
+
+
+def generate_ads(ads=None, slug="ad-snippets"):
+    ads = ads or DEFAULT_ADS
+    path = output_file("ads", f"{slug.replace('-', '_')}.json")
 
-    with open("outputs/ads/ad_snippets.json", "w") as f:
+    stage = f"ads:{slug}"
+    key = stage_key(TEMPLATE_VERSION, ads)
+    if build_cache.lookup(stage, key) is not None:
+        print("♻️ Ads unchanged")
+        return ads
+
+    with open(path, "w") as f:
         json.dump({"ads": ads}, f, indent=2)
 
+    build_cache.record(stage, key, {"path": path}, outputs=[path])
     print("✔ Ads generated")
     return ads
@@ -0,0 +1,162 @@
+# pipeline/artifacts.py
+"""
+Content-addressed Artifact Store
+- Blobs live once per content hash under outputs/.store/blobs/ab/cd/<sha256>.<ext>
+- A journal index maps logical names ("images/<slug>") to blobs
+- The public path (outputs/images/<slug>.<ext>) is a hardlink to the blob
+  (copy_file_range, which reflinks on CoW filesystems, or a plain copy as
+  fallbacks), so identical images — e.g. every placeholder — share storage
+- Listing reads the index instead of scanning directories
+"""
+
+import os
+import shutil
+import hashlib
+import threading
+
+from .journal import JournalIndex
+from .paths import output_path, output_file
+
+STORE_DIR = ".store"  # relative to the output root
+_CHUNK = 1024 * 1024
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _clone(src, dst):
+    """Share src's bytes at dst: hardlink, else reflink-capable copy, else copy."""
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            remaining = os.fstat(fin.fileno()).st_size
+            while remaining > 0:
+                n = os.copy_file_range(fin.fileno(), fout.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        return
+    except (OSError, AttributeError):
+        pass
+    shutil.copyfile(src, dst)
+
+
+def _place(src, dst):
+    """Atomically replace dst with a clone of src (never truncate in place)."""
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    _clone(src, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+class ArtifactStore:
+    def __init__(self, root=None):
+        self._root = root
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_root = None
+
+    @property
+    def root(self):
+        return self._root or output_path(STORE_DIR)
+
+    @property
+    def index(self):
+        root = self.root
+        with self._lock:
+            if self._index is None or self._index_root != root:
+                if self._index is not None:
+                    self._index.close()
+                self._index = JournalIndex(os.path.join(root, "index.jsonl"))
+                self._index_root = root
+            return self._index
+
+    def blob_path(self, sha, ext):
+        return os.path.join(self.root, "blobs", sha[:2], sha[2:4], f"{sha}.{ext}")
+
+    # ---------------- writes
+
+    def put_file(self, name, src, ext, move=False, share=True):
+        """
+        Store src under logical `name` (e.g. "images/<slug>") and materialize
+        it at outputs/<name>.<ext>. With move=True src is consumed (a temp
+        download); otherwise it is left alone and, if `share`, hardlinked
+        (only for immutable sources such as image-cache blobs — repo assets
+        that may be edited in place should pass share=False to be copied).
+        Returns the public path.
+        """
+        sha = _sha256(src)
+        blob = self.blob_path(sha, ext)
+
+        if os.path.exists(blob):
+            if move:
+                os.remove(src)  # already stored — drop the duplicate
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            if move:
+                os.replace(src, blob)
+            elif share:
+                _place(src, blob)
+            else:
+                tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.copyfile(src, tmp)
+                os.replace(tmp, blob)
+
+        public = output_file(f"{name}.{ext}")
+        _place(blob, public)
+
+        old = self.index.get(name)
+        if old and old.get("ext") != ext:
+            try:
+                os.remove(output_path(f"{name}.{old['ext']}"))
+            except OSError:
+                pass
+
+        self.index.set(name, {"sha": sha, "ext": ext, "size": os.path.getsize(blob)})
+        return public
+
+    def put_bytes(self, name, data, ext):
+        tmp = output_file(STORE_DIR, "tmp", f"{os.getpid()}.{threading.get_ident()}.{ext}")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.put_file(name, tmp, ext, move=True)
+
+    # ---------------- reads
+
+    def get(self, name):
+        """Index entry {"sha", "ext", "size"} for name, or None."""
+        return self.index.get(name)
+
+    def path(self, name):
+        entry = self.get(name)
+        return output_path(f"{name}.{entry['ext']}") if entry else None
+
+    def list(self, prefix=""):
+        """[(name, public path, entry), ...] under prefix, sorted by name — no directory scan."""
+        return sorted(
+            (name, output_path(f"{name}.{entry['ext']}"), entry)
+            for name, entry in self.index.items(prefix)
+        )
+
+    def stats(self):
+        entries = self.index.items()
+        unique = {e["sha"]: e["size"] for _, e in entries}
+        return {
+            "artifacts": len(entries),
+            "blobs": len(unique),
+            "logical_bytes": sum(e["size"] for _, e in entries),
+            "stored_bytes": sum(unique.values()),
+        }
+
+
+artifact_store = ArtifactStore()
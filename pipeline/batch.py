@@ -0,0 +1,258 @@
+# pipeline/batch.py
+"""
+Batch / Manifest Mode
+- Reads a JSONL or CSV manifest of content items lazily
+- Streams each item through text → image → derivatives → QC → JSON-LD/sitemap → export
+- Bounded in-flight concurrency: the manifest is only read as slots free up
+- Results are yielded as they complete, not collected at the end
+"""
+
+import os
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .ai_generator import (
+    generate_web_copy,
+    generate_blog,
+    generate_social_posts,
+    generate_ads,
+)
+from .build_cache import stage_key
+from .derivatives import ensure_derivatives
+from .qc import run_quality_checks
+from .seo_generator import SEOGenerator
+from .paths import output_path
+from . import events
+from .scheduler import DEFAULT_WORKERS
+from .tracing import span
+
+# Relative to the output root
+RESULTS_PATH = os.path.join("batch", "results.jsonl")
+
+KIND_ALIASES = {
+    "web": "web_copy",
+    "web_copy": "web_copy",
+    "page": "web_copy",
+    "blog": "blog",
+    "social": "social",
+    "social_posts": "social",
+    "ad": "ads",
+    "ads": "ads",
+}
+
+
+# ============================================================
+# MANIFEST READING
+# ============================================================
+
+def _split_list(value):
+    """CSV cells carry lists as 'a | b | c'; JSONL carries real lists."""
+    if value is None or isinstance(value, list):
+        return value
+    parts = [p.strip() for p in str(value).split("|")]
+    return [p for p in parts if p] or None
+
+
+def normalize_item(raw, line=None):
+    """
+    Map a manifest row onto generator arguments.
+
+    Accepts our own fields (type, title/topic, prompt, image_prompt, slug,
+    posts, ads) as well as job lines shaped like requests.jsonl
+    (request_id, title, body), which are treated as blog topics.
+    Social / ads rows without a slug or title get one from a hash of their
+    content, so two such rows never write over each other's files.
+    """
+    kind = KIND_ALIASES.get(str(raw.get("type") or raw.get("kind") or "blog").lower())
+    if kind is None:
+        raise ValueError(f"Unknown item type: {raw.get('type') or raw.get('kind')!r}")
+
+    title = raw.get("title") or raw.get("topic")
+    if kind in ("web_copy", "blog") and not title:
+        raise ValueError("Item is missing a title/topic")
+
+    from slugify import slugify
+
+    slug = raw.get("slug")
+    if not slug and title:
+        slug = slugify(f"{raw['request_id']} {title}" if raw.get("request_id") else title)
+
+    posts, ads = _split_list(raw.get("posts")), _split_list(raw.get("ads"))
+    if not slug and kind in ("social", "ads"):
+        base = "social-posts" if kind == "social" else "ad-snippets"
+        slug = f"{base}-{stage_key(kind, posts, ads, raw.get('image_prompt'))[:10]}"
+
+    return {
+        "id": raw.get("id") or raw.get("request_id") or slug or (f"line-{line}" if line else None),
+        "kind": kind,
+        "title": title,
+        "slug": slug,
+        "prompt": raw.get("prompt") or raw.get("body"),
+        "image_prompt": raw.get("image_prompt"),
+        "posts": posts,
+        "ads": ads,
+    }
+
+
+def iter_manifest(path):
+    """
+    Yield raw manifest rows one at a time (JSONL or CSV by extension).
+    Unparseable JSONL lines are yielded as {'_error': ...} so the batch
+    reports them instead of aborting.
+    """
+    is_csv = os.path.splitext(path)[1].lower() == ".csv"
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if is_csv:
+            for n, row in enumerate(csv.DictReader(f), 2):
+                row["_line"] = n
+                yield row
+            return
+
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = {"_error": f"Invalid JSON: {e}"}
+            row["_line"] = n
+            yield row
+
+
+# ============================================================
+# PER-ITEM PIPELINE
+# ============================================================
+
+def _generate(item):
+    """Run the generator for one item; return (output, text for QC, schema type)."""
+    kind = item["kind"]
+
+    if kind == "web_copy":
+        out = generate_web_copy(item["title"], item["prompt"], item["image_prompt"], item["slug"])
+        return out, out["body"], "web"
+
+    if kind == "blog":
+        out = generate_blog(item["title"], item["prompt"], item["image_prompt"], item["slug"])
+        return out, out["body"], "blog"
+
+    if kind == "social":
+        out = generate_social_posts(item["posts"], item["image_prompt"], item["slug"])
+        return out, "\n".join(out["posts"]), None
+
+    ads = generate_ads(item["ads"], item["slug"])
+    return {"ads": ads}, "\n".join(ads), None
+
+
+def process_item(raw):
+    """
+    Take one manifest row through the full pipeline.
+    Never raises — failures come back as a result with status 'error'.
+    """
+    start = time.perf_counter()
+    line = raw.get("_line")
+    result = {"line": line, "status": "ok"}
+
+    with span("batch.item", cat="item", line=line) as s:
+        try:
+            if "_error" in raw:
+                raise ValueError(raw["_error"])
+
+            item = normalize_item(raw, line)
+            result.update(id=item["id"], kind=item["kind"], slug=item["slug"])
+            s.set(kind=item["kind"], slug=item["slug"])
+
+            with span(f"generate.{item['kind']}", cat="stage", slug=item["slug"]):
+                output, text, schema_type = _generate(item)
+            result["image"] = output.get("image")
+
+            if result["image"]:
+                with span("derivatives", cat="image", slug=item["slug"]):
+                    ensure_derivatives(result["image"])
+
+            result["qc"] = run_quality_checks(text)
+
+            if schema_type:
+                SEOGenerator().generate_schema({**output, "type": schema_type})
+
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+            s.set(outcome="error", error=result["error"])
+
+    result["elapsed"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_batch(rows, workers=None, max_in_flight=None):
+    """
+    Stream rows through process_item on a bounded pool.
+
+    At most max_in_flight items are submitted at any time; the next row is
+    only pulled from `rows` once a slot frees up, so memory stays flat no
+    matter how long the manifest is. Results are yielded in completion
+    order.
+    """
+    workers = workers or DEFAULT_WORKERS
+    max_in_flight = max(max_in_flight or workers * 2, workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        pending = set()
+
+        for row in rows:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+            pending.add(pool.submit(process_item, row))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+
+def _publish_item(result, counts):
+    """Progress (and any brand violation) of one finished item for live clients."""
+    events.publish("item", line=result["line"], slug=result.get("slug"), kind=result.get("kind"),
+                   status=result["status"], error=result.get("error"), elapsed=result["elapsed"],
+                   ok=counts["ok"], failed=counts["error"])
+    violations = (result.get("qc") or {}).get("brand_violations")
+    if violations:
+        events.publish("qc", document=f"{result.get('kind')}/{result.get('slug')}", violations=violations)
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def run_manifest(path, results_path=None, workers=None, max_in_flight=None):
+    """Run a manifest file end to end, appending each result to results_path."""
+    results_path = results_path or output_path(RESULTS_PATH)
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+
+    counts = {"ok": 0, "error": 0}
+    start = time.perf_counter()
+
+    with open(results_path, "w", encoding="utf-8") as out:
+        for result in run_batch(iter_manifest(path), workers, max_in_flight):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[result["status"]] += 1
+
+            if result["status"] == "error":
+                print(f"🚨 Item failed (line {result['line']}): {result['error']}")
+            if events.enabled:
+                _publish_item(result, counts)
+
+    SEOGenerator().generate_sitemap()  # rewrites only shards this run changed
+
+    elapsed = time.perf_counter() - start
+    total = counts["ok"] + counts["error"]
+    counts["elapsed"] = elapsed
+    counts["items_per_sec"] = total / elapsed if elapsed else 0.0
+    counts["results_path"] = results_path
+    return counts
@@ -0,0 +1,173 @@
+# pipeline/brand_rules.py
+"""
+Brand-Safety Rule Compiler
+- Prohibited phrases are read from docs/brand_rules.md (quoted lines under
+  "Prohibited"), not hardcoded
+- All phrases compile into ONE regex: a prefix trie, so shared prefixes are
+  tested once, with word boundaries ("llm" no longer matches inside words)
+  and spaces/hyphens interchangeable ("AI generated" == "AI-generated")
+- Text and phrases are NFKC-normalized and case-folded; matches report
+  offsets into the original text
+- The compiled rules are cached per rules-file (path, size, mtime)
+"""
+
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+
+RULES_PATH = os.getenv("BRAND_RULES_PATH", os.path.join("docs", "brand_rules.md"))
+
+# Used only when the rules file is missing
+DEFAULT_PHRASES = [
+    "AI generated",
+    "Artificial Intelligence",
+    "We asked an AI",
+    "ChatGPT",
+    "LLM",
+    "Machine-generated",
+]
+
+_QUOTED = re.compile(r"[“\"]([^”\"]+)[”\"]")
+_SEP = re.compile(r"[\s\-‐‑‒–—_]+")
+_SEP_RE = r"[\s\-‐‑‒–—_]+"
+_END = ""
+
+
+def normalize(text):
+    """
+    (NFKC + casefold text, offsets) where offsets[i] is the index in text
+    of normalized char i, or None when they line up one-to-one.
+    """
+    if text.isascii():
+        return text.lower(), None
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    if len(folded) == len(text):
+        return folded, None
+
+    parts, offsets = [], []
+    for i, ch in enumerate(text):
+        n = unicodedata.normalize("NFKC", ch).casefold()
+        parts.append(n)
+        offsets.extend([i] * len(n))
+    offsets.append(len(text))
+    return "".join(parts), offsets
+
+
+def canonical(phrase):
+    """Normalized phrase with every separator run collapsed to one space."""
+    return " ".join(w for w in _SEP.split(normalize(phrase)[0]) if w)
+
+
+def parse_rules(markdown):
+    """Quoted phrases listed under the "Prohibited" heading."""
+    phrases, active = [], False
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        title = stripped.lstrip("#").strip().lower()
+        if title == "prohibited":
+            active = True
+            continue
+        if active and stripped.startswith("#"):
+            break
+        if active:
+            phrases.extend(m.strip() for m in _QUOTED.findall(stripped) if m.strip())
+    return phrases
+
+
+# ============================================================
+# COMPILER
+# ============================================================
+
+def _trie_regex(node):
+    alts = [
+        (_SEP_RE if atom == " " else re.escape(atom)) + _trie_regex(child)
+        for atom, child in sorted(node.items()) if atom != _END
+    ]
+    if not alts:
+        return ""
+    if len(alts) == 1 and _END not in node:
+        return alts[0]
+    group = "(?:" + "|".join(alts) + ")"
+    return group + "?" if _END in node else group
+
+
+def compile_phrases(phrases):
+    """One regex for all phrases, built from their prefix trie."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in canonical(phrase):
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+    if not trie:
+        return re.compile(r"(?!)")
+    return re.compile(r"(?<!\w)" + _trie_regex(trie) + r"(?!\w)")
+
+
+class BrandRules:
+    def __init__(self, phrases, source=None):
+        self.source = source
+        self.rules = {}
+        for phrase in phrases:
+            self.rules.setdefault(canonical(phrase), phrase)  # canonical -> as written
+        self.rules.pop("", None)
+        self.pattern = compile_phrases(self.rules.values())
+        self.digest = hashlib.sha256("\n".join(sorted(self.rules)).encode("utf-8")).hexdigest()
+        self.max_len = max((len(k) for k in self.rules), default=0)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def rule_for(self, matched):
+        return self.rules.get(" ".join(w for w in _SEP.split(matched) if w))
+
+    def scan(self, text):
+        """[{"rule", "start", "end", "text"}, ...] — offsets into the original text."""
+        folded, offsets = normalize(text)
+        found = []
+        for m in self.pattern.finditer(folded):
+            start, end = m.span()
+            if offsets is not None:
+                start, end = offsets[start], offsets[end - 1] + 1
+            found.append({"rule": self.rule_for(m.group()), "start": start, "end": end,
+                          "text": text[start:end]})
+        return found
+
+    def violations(self, text):
+        """Distinct rules matched in text, in order of first appearance."""
+        return self.violations_folded(normalize(text)[0])
+
+    def violations_folded(self, folded):
+        """violations() for text that already went through normalize()."""
+        return list(dict.fromkeys(self.rule_for(m.group()) for m in self.pattern.finditer(folded)))
+
+
+# ============================================================
+# LOADING (cached per rules file)
+# ============================================================
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_rules(path=None):
+    """Compiled BrandRules for path (default docs/brand_rules.md)."""
+    path = path or RULES_PATH
+    try:
+        st = os.stat(path)
+        stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    except OSError:
+        stamp = (None, 0, 0)
+
+    with _cache_lock:
+        rules = _cache.get(stamp)
+        if rules is None:
+            if stamp[0] is None:
+                rules = BrandRules(DEFAULT_PHRASES)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    rules = BrandRules(parse_rules(f.read()) or DEFAULT_PHRASES, source=path)
+            _cache[stamp] = rules
+        return rules
@@ -0,0 +1,151 @@
+# pipeline/build_cache.py
+"""
+Incremental Build Cache
+- Content-addressed stage keys (hash of prompt, template version, upstream hashes)
+- Run manifest (append-only journal) recording each stage's key, small
+  result metadata and output file hashes
+- Unchanged stages are skipped and their cached outputs reused
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import threading
+
+from .journal import JournalIndex
+from .paths import output_path
+
+# Relative to the output root
+MANIFEST_PATH = os.path.join(".cache", "manifest.jsonl")
+
+_CHUNK = 1024 * 1024
+
+
+# ============================================================
+# HASHING
+# ============================================================
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def stage_key(*parts) -> str:
+    """Stable key for a stage from its JSON-serialisable inputs."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hash_bytes(blob.encode("utf-8"))
+
+
+_digest_lock = threading.Lock()
+_digests = {}  # path -> (size, mtime_ns, sha256)
+
+
+def file_digest(path):
+    """
+    sha256 of a file, memoised on (size, mtime_ns) so unchanged
+    artifacts are not re-read on every lookup.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    st = os.stat(path)
+    with _digest_lock:
+        memo = _digests.get(path)
+    if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+        return memo[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digests[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+# ============================================================
+# RUN MANIFEST
+# ============================================================
+
+class BuildCache:
+    """
+    Maps stage name -> {key, result, outputs} in an append-only journal
+    (one line per recorded stage, nothing rewritten per run).
+
+    lookup() returns the cached result only when the stored key matches
+    and every recorded output file still exists with the same content.
+    Results are small metadata (paths, titles, excerpts) — callers read
+    bodies back from their output files. Nothing is recorded while the
+    cache is disabled.
+    """
+
+    def __init__(self, path=None, enabled=None):
+        self._path = path
+        if enabled is None:
+            enabled = os.getenv("BUILD_CACHE", "1") != "0"
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._journal = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return self._path or output_path(MANIFEST_PATH)
+
+    def _entries(self):
+        """The journal for the current output root."""
+        path = self.path
+        with self._lock:
+            if self._journal is None or self._journal.path != path:
+                if self._journal is not None:
+                    self._journal.close()
+                self._journal = JournalIndex(path)
+            return self._journal
+
+    def lookup(self, stage, key):
+        if not self.enabled:
+            return None
+
+        entry = self._entries().get(stage)
+        if not entry or entry.get("key") != key:
+            self.misses += 1
+            return None
+
+        for path, digest in entry.get("outputs", {}).items():
+            if file_digest(path) != digest:
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return entry.get("result")
+
+    def record(self, stage, key, result, outputs=()):
+        if not self.enabled:
+            return
+        self._entries().set(stage, {
+            "key": key,
+            "result": result,
+            "outputs": {p: file_digest(p) for p in outputs if p},
+        })
+
+    def output_digest(self, stage, path):
+        """Hash recorded for one of a stage's outputs (for downstream keys)."""
+        entry = self._entries().get(stage) or {}
+        return entry.get("outputs", {}).get(path)
+
+    def entries(self, prefix=""):
+        """[(stage, entry), ...] for recorded stages starting with prefix."""
+        return self._entries().items(prefix)
+
+    def flush(self):
+        """Entries are appended as they are recorded; this only closes the file."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+
+
+build_cache = BuildCache()
+atexit.register(build_cache.flush)
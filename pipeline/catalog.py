@@ -0,0 +1,294 @@
+# pipeline/catalog.py
+"""
+Catalog Mode (bulk JSON-LD)
+- Streams a CSV / JSONL product catalog (one row per SKU: shade, finish,
+  size, price, ...) and emits schema.org Product + Offer JSON-LD; rows
+  with type "blog" / "article" become Article
+- Writes one compact file per slug (outputs/catalog/jsonld/<slug>.json)
+  and a consolidated outputs/catalog/catalog.ndjson
+- Rows are processed in chunks on a spawn process pool; each worker
+  serializes and writes its chunk's files itself (tmp + os.replace) and
+  hands back one NDJSON block, which the parent appends. At most
+  2 × workers chunks are in flight, so memory does not grow with the
+  catalog beyond one small entry per slug
+- Slugs must be unique: the first row the parent receives for a slug is
+  kept, later ones are reported to errors.jsonl and left out of the
+  NDJSON, and the slug's file is rewritten from the kept row at the end
+- orjson is used for serialization when installed, json otherwise
+"""
+
+import os
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .paths import output_path, output_dir
+from .tracing import span
+
+CATALOG_DIR = "catalog"  # relative to the output root
+CATALOG_WORKERS = int(os.getenv("CATALOG_WORKERS", str(os.cpu_count() or 2)))
+CATALOG_CHUNK = int(os.getenv("CATALOG_CHUNK", "1000"))   # rows per pool task
+DEFAULT_CURRENCY = os.getenv("CATALOG_CURRENCY", "INR")
+
+AVAILABILITY = {
+    "in_stock": "InStock", "instock": "InStock", "in stock": "InStock", "yes": "InStock",
+    "true": "InStock", "1": "InStock",
+    "out_of_stock": "OutOfStock", "outofstock": "OutOfStock", "out of stock": "OutOfStock",
+    "no": "OutOfStock", "false": "OutOfStock", "0": "OutOfStock",
+    "preorder": "PreOrder", "pre_order": "PreOrder", "backorder": "BackOrder",
+    "discontinued": "Discontinued", "limited": "LimitedAvailability",
+}
+
+ARTICLE_TYPES = {"blog", "article"}
+
+try:
+    import orjson
+
+    def dumps(data):
+        return orjson.dumps(data)
+except ImportError:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False)
+
+    def dumps(data):
+        return _encoder.encode(data).encode("utf-8")
+
+
+# ============================================================
+# ROW → JSON-LD
+# ============================================================
+
+def _clean(row):
+    """Stripped string values; empty cells dropped so lookups can just test truthiness."""
+    out = {}
+    for key, value in row.items():
+        if value is None or isinstance(value, (list, dict)):
+            continue
+        value = value.strip() if isinstance(value, str) else str(value)
+        if value:
+            out[key] = value
+    return out
+
+
+def _field(row, *names):
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value
+    return None
+
+
+def row_slug(row):
+    from slugify import slugify
+
+    slug = _field(row, "slug")
+    if slug:
+        return slugify(slug)
+    name = _field(row, "name", "title", "product", "topic")
+    parts = [name] + [_field(row, k) for k in ("shade", "finish", "size", "sku")]
+    return slugify(" ".join(p for p in parts if p))
+
+
+def product_jsonld(row, slug):
+    from .seo_generator import SITE_URL, generate_jsonld_web_copy
+
+    name = _field(row, "name", "title", "product")
+    if not name:
+        raise ValueError("row has no name/title")
+    sku = _field(row, "sku")
+    shade = _field(row, "shade", "color", "colour")
+    finish = _field(row, "finish")
+    size = _field(row, "size")
+
+    variant = ", ".join(p for p in (shade, finish, size) if p)
+    data = generate_jsonld_web_copy(
+        slug, f"{name} – {variant}" if variant else name,
+        _field(row, "description") or "", image=_field(row, "image", "image_url"),
+    )
+    data.pop("datePublished", None)  # a catalog row is not dated content
+    data["url"] = data["mainEntityOfPage"] = f"{SITE_URL}/products/{slug}"
+    if sku:
+        data["sku"] = sku
+    for key, prop in (("gtin", "gtin"), ("mpn", "mpn"), ("category", "category")):
+        value = _field(row, key)
+        if value:
+            data[prop] = value
+    if shade:
+        data["color"] = shade
+    extra = [{"@type": "PropertyValue", "name": label, "value": value}
+             for label, value in (("Finish", finish), ("Size", size)) if value]
+    if extra:
+        data["additionalProperty"] = extra
+
+    price = _field(row, "price")
+    if price is not None:
+        offer = {
+            "@type": "Offer",
+            "price": f"{float(price):.2f}",
+            "priceCurrency": _field(row, "currency") or DEFAULT_CURRENCY,
+            "url": data["url"],
+        }
+        if sku:
+            offer["sku"] = sku
+        availability = _field(row, "availability", "stock")
+        if availability:
+            status = AVAILABILITY.get(availability.lower())
+            if status is None:
+                raise ValueError(f"unknown availability {availability!r}")
+            offer["availability"] = f"https://schema.org/{status}"
+        data["offers"] = offer
+    return data
+
+
+def article_jsonld(row, slug):
+    from .seo_generator import generate_jsonld_article
+
+    title = _field(row, "title", "topic", "name")
+    if not title:
+        raise ValueError("row has no title")
+    return generate_jsonld_article(slug, title, _field(row, "description") or "",
+                                   image=_field(row, "image", "image_url"))
+
+
+def row_jsonld(row):
+    """(slug, JSON-LD dict) for one catalog row; ValueError if it is unusable."""
+    row = _clean(row)
+    slug = row_slug(row)
+    if not slug:
+        raise ValueError("row has no slug, name or title")
+    kind = (_field(row, "type", "kind") or "product").lower()
+    if kind in ARTICLE_TYPES:
+        return slug, article_jsonld(row, slug)
+    return slug, product_jsonld(row, slug)
+
+
+# ============================================================
+# WORKER (runs in a separate process)
+# ============================================================
+
+def _write_file(jsonld_dir, slug, doc):
+    path = os.path.join(jsonld_dir, f"{slug}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(doc)
+    os.replace(tmp, path)
+
+
+def _build_chunk(rows, jsonld_dir):
+    """
+    (NDJSON bytes, [(line, slug, size), ...], [(line, error), ...]) for one
+    chunk; the block holds the documents in that order, one per line.
+    """
+    lines, docs, errors = [], [], []
+    for row in rows:
+        line = row.pop("_line", None)
+        try:
+            if "_error" in row:
+                raise ValueError(row["_error"])
+            slug, data = row_jsonld(row)
+        except (ValueError, TypeError) as e:
+            errors.append((line, f"{type(e).__name__}: {e}"))
+            continue
+        doc = dumps(data)
+        lines.append(doc)
+        docs.append((line, slug, len(doc)))
+        if jsonld_dir:
+            _write_file(jsonld_dir, slug, doc)
+    return b"\n".join(lines) + b"\n" if lines else b"", docs, errors
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def _chunks(rows, n):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= n:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _results(chunks, jsonld_dir, workers):
+    """Yield _build_chunk results, on a bounded spawn pool when workers > 1."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield _build_chunk(chunk, jsonld_dir)
+        return
+
+    # spawn, not fork: the pipeline may call this from worker threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+            pending.add(pool.submit(_build_chunk, chunk, jsonld_dir))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+
+def run_catalog(path, workers=None, chunk_size=None, files=True):
+    """
+    Stream a catalog file into JSON-LD. Returns counts:
+    documents, errors, duplicates, elapsed, docs_per_sec, ndjson path.
+    """
+    from .batch import iter_manifest
+
+    workers = CATALOG_WORKERS if workers is None else workers
+    chunk_size = chunk_size or CATALOG_CHUNK
+    jsonld_dir = output_dir(CATALOG_DIR, "jsonld") if files else None
+    ndjson_path = os.path.join(output_dir(CATALOG_DIR), "catalog.ndjson")
+    errors_path = output_path(CATALOG_DIR, "errors.jsonl")
+
+    counts = {"documents": 0, "errors": 0, "duplicates": 0}
+    start = time.perf_counter()
+    seen = {}        # slug -> (line, offset, size) of the kept document
+    contested = set()
+
+    with span("catalog", cat="stage", workers=workers) as s:
+        tmp = f"{ndjson_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb", buffering=1 << 20) as out, open(errors_path, "w", encoding="utf-8") as err:
+            for block, docs, errors in _results(_chunks(iter_manifest(path), chunk_size), jsonld_dir, workers):
+                view, pos, offset, kept = memoryview(block), 0, out.tell(), []
+                for line, slug, size in docs:
+                    doc, pos = view[pos:pos + size + 1], pos + size + 1
+                    first = seen.get(slug)
+                    if first is not None:
+                        contested.add(slug)
+                        counts["duplicates"] += 1
+                        errors.append((line, f"ValueError: duplicate slug {slug!r} (kept line {first[0]})"))
+                        continue
+                    seen[slug] = (line, offset, size)
+                    offset += size + 1
+                    kept.append(doc)
+                out.write(b"".join(kept))
+                counts["documents"] += len(kept)
+                counts["errors"] += len(errors)
+                for line, message in errors:
+                    err.write(json.dumps({"line": line, "error": message}) + "\n")
+
+        if jsonld_dir and contested:
+            # A later duplicate may have replaced the kept row's file
+            with open(tmp, "rb") as f:
+                for slug in contested:
+                    _, offset, size = seen[slug]
+                    f.seek(offset)
+                    _write_file(jsonld_dir, slug, f.read(size))
+        os.replace(tmp, ndjson_path)  # readers never see a half-written catalog
+
+        elapsed = time.perf_counter() - start
+        counts.update(
+            elapsed=elapsed,
+            docs_per_sec=counts["documents"] / elapsed if elapsed else 0.0,
+            ndjson_path=ndjson_path,
+            errors_path=errors_path,
+        )
+        s.set(documents=counts["documents"], errors=counts["errors"], duplicates=counts["duplicates"])
+    return counts
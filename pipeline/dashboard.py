@@ -1,137 +1,571 @@
+# pipeline/dashboard.py
+"""
+Dashboard
+- Driven by the run manifest (build_cache: web copy, blogs, JSON-LD and the
+  content hash of each output), the artifact index (images) and a stat scan
+  of the kinds the manifest doesn't record (social, ads, QC reports,
+  scraper outputs, and copy from runs with BUILD_CACHE=0)
+- Every artifact becomes a small card (title, excerpt, thumbnail, link),
+  cached in outputs/.store/dashboard.jsonl by content hash (size + mtime for
+  scanned files), so unchanged artifacts are never re-read
+- outputs/dashboard/dashboard.html is a small shell; cards are written as
+  paginated per-section fragments (outputs/dashboard/data/<section>/NNNN.js)
+  that the page loads when a section is opened. Fragments are JSON wrapped
+  in a dashboardLoad(...) call so the page also works from file://
+- Only pages whose cards changed are rewritten; data/manifest.js lists
+  every section's pages with a version each for cache busting
+"""
+
 import os
 import json
+import threading
+from datetime import datetime
+from html import escape
+
+from .artifacts import artifact_store
+from .build_cache import build_cache, stage_key
+from .derivatives import build_derivatives, derivatives_for, relative_prefix
+from .journal import JournalIndex
+from .markdown_outline import outline
+from .paths import output_path, output_dir
+from .tracing import span
+
+# Bump when the card / page / shell format changes — forces a full rebuild.
+DASHBOARD_VERSION = "3"
+
+OUTPUT_DIR = "dashboard"  # relative to the output root
+DATA_DIR = "data"         # relative to OUTPUT_DIR
+STATE_PATH = os.path.join(".store", "dashboard.jsonl")
+
+PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+TEXT_CHARS = 600  # excerpt / snippet length on a card
+
+SECTIONS = {
+    "web_copy": "📝 Web Copy",
+    "blogs": "📄 Blogs",
+    "social": "📣 Social Posts",
+    "ads": "💡 Ad Snippets",
+    "images": "🖼️ Images",
+    "seo": "📦 JSON-LD",
+    "qc": "🔍 QC Reports",
+    "raw": "📰 Scraper Outputs",
+}
+
+# run manifest stage prefix -> section
+STAGE_SECTIONS = {"web_copy": "web_copy", "blog": "blogs", "jsonld": "seo"}
+
+# Copy the run manifest may not cover (nothing is recorded with BUILD_CACHE=0)
+COPY_SCANNED = (
+    ("web_copy", "web_copy", ".json"),
+    ("blogs", "blogs", ".md"),
+)
+
+# (section, folder under the output root, extension) — not in the run manifest
+SCANNED = (
+    ("social", "social", ".json"),
+    ("ads", "ads", ".json"),
+    ("qc", os.path.join("qc", "web_copy"), ".json"),
+    ("qc", os.path.join("qc", "blog"), ".json"),
+    ("qc", os.path.join("qc", "social"), ".json"),
+    ("qc", os.path.join("qc", "ads"), ".json"),
+    ("raw", "raw", ""),
+)
+
 
-OUTPUT_DIR = "outputs/dashboard"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# ============================================================
+# ITEMS
+# ============================================================
 
+def _relative(path, root):
+    """path relative to the output root (cheaper than os.path.relpath), or None outside it."""
+    return path[len(root):].replace(os.sep, "/") if path.startswith(root) else None
 
-def _load_json(path):
-    if not os.path.exists(path):
-        return {}
+
+def _image_sha(image):
+    """Artifact hash of an image path, so cards follow image changes."""
+    name = image and _relative(image, os.path.join(output_path(), ""))
+    if not name:
+        return None
+    name = os.path.splitext(name)[0]
+    entry = artifact_store.get(name)
+    return entry["sha"] if entry else None
+
+
+def collect_items():
+    """[(section, item id, path, key, manifest result), ...] for every artifact."""
+    root = os.path.join(output_path(), "")
+    items, recorded = [], set()
+
+    for stage, entry in build_cache.entries():
+        section = STAGE_SECTIONS.get(stage.split(":", 1)[0])
+        if section is None:
+            continue
+        result = entry.get("result") or {}
+        for path, digest in entry.get("outputs", {}).items():
+            rel = _relative(path, root)
+            if digest and rel and os.path.exists(path):  # rel is None for another root's run
+                key = [digest, _image_sha(result.get("image"))]
+                items.append((section, rel, path, key, result))
+                recorded.add(path)
+
+    for name, path, entry in artifact_store.list("images/"):
+        items.append(("images", _relative(path, root), path, [entry["sha"]], None))
+
+    for section, folder, ext in COPY_SCANNED + SCANNED:
+        try:
+            entries = os.scandir(output_path(folder))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if (entry.is_file() and entry.name.endswith(ext) and not entry.name.endswith(".tmp")
+                        and entry.path not in recorded):
+                    st = entry.stat()
+                    items.append((section, _relative(entry.path, root), entry.path,
+                                  [st.st_size, st.st_mtime_ns], None))
+    return items
+
+
+# ============================================================
+# CARDS
+# ============================================================
+
+def _read_json(path):
     try:
-        with open(path, "r") as f:
+        with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
-    except:
-        return {}
+    except (OSError, ValueError):
+        return None
+
 
+def _clip(text, n=TEXT_CHARS):
+    text = str(text or "")
+    return text if len(text) <= n else text[:n].rstrip() + "…"
 
-def _load_text(path):
-    if not os.path.exists(path):
-        return ""
+
+def _link(path, prefix):
+    return prefix + (_relative(path, os.path.join(output_path(), ""))
+                     or os.path.relpath(path, output_path()).replace(os.sep, "/"))
+
+
+def _thumb(image, prefix, derivatives):
+    """Thumbnail derivative if one was rendered, else the image itself."""
+    if not image or not os.path.exists(image):
+        return None
+    manifest = derivatives.get(image) or derivatives_for(image)
+    return prefix + manifest["thumbnail"]["path"] if manifest else _link(image, prefix)
+
+
+def _copy_card(item_id, path, result, prefix, derivatives):
+    # The manifest keeps metadata only; the body comes from the artifact
+    if path.endswith(".json"):
+        result = dict(result or {}, **(_read_json(path) or {}))
+        body = result.get("body") or ""
+    else:
+        result = result or {}
+        with open(path, "r", encoding="utf-8") as f:
+            body = f.read()
+    doc = outline(body)
+    card = {
+        "title": result.get("title") or doc["title"] or item_id,
+        "text": _clip(result.get("description") or doc["excerpt"]),
+        "meta": f"{doc['words']} words · {len(doc['headings'])} headings · {doc['links']} links",
+        "thumb": _thumb(result.get("image"), prefix, derivatives),
+    }
+    keywords = [k for k, v in doc["keywords"].items() if v["count"]]
+    if keywords:
+        card["tags"] = keywords
+    return card
+
+
+def _post_text(post):
+    if isinstance(post, dict):
+        for key in ("caption", "text", "description", "headline"):
+            if post.get(key):
+                return str(post[key])
+    return str(post)
+
+
+def _posts_card(item_id, path, result, prefix, derivatives):
+    data = _read_json(path)
+    posts = data.get("posts", data.get("ads", [])) if isinstance(data, dict) else data
+    posts = posts if isinstance(posts, list) else []
+    tags = [t for p in posts if isinstance(p, dict) for t in p.get("hashtags", [])]
+    card = {
+        "title": os.path.splitext(os.path.basename(path))[0].replace("_", " "),
+        "text": _clip("\n".join(_post_text(p) for p in posts)) if data is not None else "Unreadable JSON",
+        "meta": f"{len(posts)} items",
+        "pre": True,
+    }
+    if isinstance(data, dict) and data.get("image"):
+        card["thumb"] = _thumb(data["image"], prefix, derivatives)
+    if tags:
+        card["tags"] = tags
+    return card
+
+
+def _image_card(item_id, path, result, prefix, derivatives):
+    return {"title": os.path.basename(path), "thumb": _thumb(path, prefix, derivatives)}
+
+
+def _jsonld_card(item_id, path, result, prefix, derivatives):
+    data = _read_json(path) or {}
+    return {
+        "title": data.get("headline") or data.get("name") or os.path.basename(path),
+        "subtitle": f"{data.get('@type', 'JSON-LD')} · {os.path.dirname(item_id)}",
+        "text": _clip(json.dumps(data, ensure_ascii=False)),
+        "pre": True,
+    }
+
+
+def _qc_card(item_id, path, result, prefix, derivatives):
+    report = _read_json(path) or {}
+    r = report.get("result") or {}
+    issues = list(r.get("brand_violations", [])) + list(r.get("seo_issues", []))
+    if r.get("error"):
+        status, text = "error", r["error"]
+    elif issues:
+        status, text = "warn", "\n".join(issues)
+    else:
+        status, text = "ok", "Clean"
+    score = r.get("readability_score")
+    return {
+        "title": report.get("document") or item_id,
+        "text": _clip(text),
+        "meta": f"readability {round(score, 1) if isinstance(score, (int, float)) else 'n/a'}",
+        "status": status,
+        "pre": True,
+    }
+
+
+def _raw_card(item_id, path, result, prefix, derivatives):
     try:
-        with open(path, "r") as f:
-            return f.read()
-    except:
-        return ""
-
-
-def build_dashboard():
-
-    print("📊 Building dashboard → outputs/dashboard/dashboard.html")
-
-    # Load all generated output files
-    web_copy = _load_json("outputs/web_copy/interior-emulsion-paints-calyco.json")
-    blog_md = _load_text("outputs/blogs/trending-home-paint-colors-2025.md")
-    social_posts = _load_json("outputs/social/social_posts.json")
-    ads = _load_json("outputs/ads/ad_snippets.json")
-    news = _load_json("outputs/raw/news.json")
-
-    # QC results might exist or not
-    qc_web = _load_json("outputs/qc/web_copy_qc.json")
-    qc_blog = _load_json("outputs/qc/blog_qc.json")
-
-    # Images folder
-    images_folder = "outputs/images"
-    os.makedirs(images_folder, exist_ok=True)
-    images = os.listdir(images_folder)
-
-    # SEO JSON-LD
-    jsonld_folder = "outputs/blogs/jsonld"
-    jsonld_files = []
-    if os.path.exists(jsonld_folder):
-        jsonld_files = os.listdir(jsonld_folder)
-
-    # Build HTML
-    html = f"""
-    <html>
-    <head>
-        <title>Calyco AI Pipeline Dashboard</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                padding: 20px;
-            }}
-            h2 {{
-                background: #EEE;
-                padding: 10px;
-            }}
-            pre {{
-                background: #F7F7F7;
-                padding: 12px;
-                border-radius: 5px;
-                white-space: pre-wrap;
-            }}
-            .image-box {{
-                margin: 10px 0;
-            }}
-            img {{
-                max-width: 400px;
-                border-radius: 8px;
-                margin-bottom: 15px;
-            }}
-        </style>
-    </head>
-    <body>
-
-        <h1>📊 Calyco AI Content Engine — Demo Dashboard</h1>
-
-        <h2>📰 Industry News (Scraped)</h2>
-        <pre>{json.dumps(news, indent=2)}</pre>
-
-        <h2>📝 Web Copy</h2>
-        <pre>{json.dumps(web_copy, indent=2)}</pre>
-
-        <h2>📄 Blog Article (Markdown)</h2>
-        <pre>{blog_md}</pre>
-
-        <h2>📣 Social Media Posts</h2>
-        <pre>{json.dumps(social_posts, indent=2)}</pre>
-
-        <h2>💡 Ad Snippets</h2>
-        <pre>{json.dumps(ads, indent=2)}</pre>
-
-        <h2>🔍 QC — Web Copy</h2>
-        <pre>{json.dumps(qc_web, indent=2)}</pre>
-
-        <h2>🔍 QC — Blog</h2>
-        <pre>{json.dumps(qc_blog, indent=2)}</pre>
-
-        <h2>🖼️ Generated Images</h2>
-    """
-
-    for img_file in images:
-        html += f"""
-        <div class="image-box">
-            <img src="../images/{img_file}" alt="{img_file}">
-        </div>
-        """
-
-    html += """
-        <h2>📦 JSON-LD Files</h2>
-        <ul>
-    """
-
-    for f in jsonld_files:
-        html += f"<li>{f}</li>"
-
-    html += """
-        </ul>
-    </body>
-    </html>
-    """
-
-    # Write output HTML
-    with open(os.path.join(OUTPUT_DIR, "dashboard.html"), "w") as f:
-        f.write(html)
-
-    print("✅ Dashboard ready → outputs/dashboard/dashboard.html")
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            snippet = f.read(TEXT_CHARS + 1)
+    except OSError:
+        snippet = ""
+    return {"title": os.path.basename(path), "text": _clip(snippet), "pre": True}
+
+
+CARDS = {
+    "web_copy": _copy_card,
+    "blogs": _copy_card,
+    "social": _posts_card,
+    "ads": _posts_card,
+    "images": _image_card,
+    "seo": _jsonld_card,
+    "qc": _qc_card,
+    "raw": _raw_card,
+}
+
+
+def build_card(section, item_id, path, result, prefix, derivatives):
+    try:
+        card = CARDS[section](item_id, path, result, prefix, derivatives)
+    except Exception as e:  # one bad artifact must not take the dashboard down
+        card = {"title": item_id, "text": f"{type(e).__name__}: {e}", "status": "error"}
+    card["id"] = item_id
+    card["link"] = _link(path, prefix)
+    return {k: v for k, v in card.items() if v not in (None, "", [])}
+
+
+# ============================================================
+# WRITING
+# ============================================================
+
+def _publish(path, name, data):
+    """Write a dashboardLoad(name, data) fragment atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"dashboardLoad({json.dumps(name)}, ")
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.write(");\n")
+    os.replace(tmp, path)
+
+
+def page_name(section, n):
+    return f"{section}/{n:04d}"
+
+
+_STYLE = """
+body{font-family:Inter,Segoe UI,Roboto,Helvetica,Arial,sans-serif;margin:20px;background:#f7f8fb;color:#111}
+h1{margin-bottom:0}
+details{background:#fff;border-radius:8px;box-shadow:0 2px 6px rgba(0,0,0,0.06);margin:12px 0;padding:8px 12px}
+summary{font-size:1.2rem;font-weight:600;cursor:pointer;padding:6px 0}
+.count{color:#666;font-weight:400;font-size:0.95rem}
+.card{display:flex;gap:12px;padding:12px;border-top:1px solid #eee}
+.card.warn{border-left:4px solid #e0a000}.card.error{border-left:4px solid #d33}.card.ok{border-left:4px solid #2a2}
+.thumb{width:120px;flex:0 0 120px;border-radius:6px;object-fit:cover}
+.card h3{margin:0 0 6px 0}
+.subtitle{color:#555;font-size:0.95rem;margin-bottom:6px}
+pre{white-space:pre-wrap;background:#fafafa;padding:8px;border-radius:6px;overflow:auto;max-height:220px;margin:0}
+.tags{color:#0b74de;font-size:0.9rem;margin-top:6px}
+.meta{margin-top:8px;font-size:0.9rem;color:#666}
+.meta a{margin-left:8px}
+.pager{display:flex;gap:10px;align-items:center;padding:8px 0}
+.images .card{display:inline-block;border:0;padding:6px}
+#live{background:#fff;border-radius:8px;box-shadow:0 2px 6px rgba(0,0,0,0.06);padding:8px 12px;margin:12px 0}
+#live-status{color:#666;font-weight:400;font-size:0.9rem}
+#live table{border-collapse:collapse;font-size:0.9rem}#live td,#live th{padding:2px 10px;text-align:left}
+.stage-started{color:#0b74de}.stage-finished{color:#2a2}.stage-failed{color:#d33}.stage-skipped{color:#999}
+@media (max-width:700px){.card{flex-direction:column}.thumb{width:100%}}
+"""
+
+_SCRIPT = """
+const PAGES = {}, CURRENT = {}, BOUND = {};
+let MANIFEST = null;
+
+function el(tag, cls, text) {
+  const e = document.createElement(tag);
+  if (cls) e.className = cls;
+  if (text !== undefined) e.textContent = text;
+  return e;
+}
+
+function load(src) {
+  const s = document.createElement("script");
+  s.src = src;
+  document.head.appendChild(s);
+}
+
+function card(c) {
+  const box = el("div", "card" + (c.status ? " " + c.status : ""));
+  if (c.thumb) {
+    const img = el("img", "thumb");
+    img.loading = "lazy"; img.decoding = "async"; img.src = c.thumb; img.alt = c.title;
+    box.appendChild(img);
+  }
+  const body = el("div", "card-body");
+  body.appendChild(el("h3", "", c.title));
+  if (c.subtitle) body.appendChild(el("div", "subtitle", c.subtitle));
+  if (c.text) body.appendChild(el(c.pre ? "pre" : "p", "", c.text));
+  if (c.tags) body.appendChild(el("div", "tags", c.tags.join(", ")));
+  const meta = el("div", "meta", c.meta || "");
+  const a = el("a", "", "Open"); a.href = c.link; a.target = "_blank";
+  meta.appendChild(a);
+  body.appendChild(meta);
+  box.appendChild(body);
+  return box;
+}
+
+function pageName(section, n) {
+  return section + "/" + String(n).padStart(4, "0");
+}
+
+function render(section) {
+  const info = MANIFEST.sections.find(s => s.id === section);
+  const n = CURRENT[section] || 0;
+  const page = PAGES[pageName(section, n) + "@" + info.pages[n]];
+  const box = document.querySelector("#" + section + " .cards");
+  const pager = document.querySelector("#" + section + " .pager");
+  box.replaceChildren(...(page ? page.cards.map(card) : [el("p", "", info.count ? "Loading…" : "Nothing here yet.")]));
+  pager.replaceChildren();
+  if (info.pages.length > 1) {
+    const prev = el("button", "", "‹ Prev"), next = el("button", "", "Next ›");
+    prev.disabled = n === 0; next.disabled = n >= info.pages.length - 1;
+    prev.onclick = () => show(section, n - 1); next.onclick = () => show(section, n + 1);
+    pager.append(prev, el("span", "", "Page " + (n + 1) + " / " + info.pages.length), next);
+  }
+}
+
+function show(section, n) {
+  const info = MANIFEST.sections.find(s => s.id === section);
+  CURRENT[section] = n;
+  const name = pageName(section, n);
+  if (info.pages.length && !PAGES[name + "@" + info.pages[n]]) load("data/" + name + ".js?v=" + info.pages[n]);
+  render(section);
+}
+
+function dashboardLoad(name, data) {
+  if (name === "manifest") {
+    MANIFEST = data;
+    document.getElementById("updated").textContent = "Updated: " + data.updated + " (UTC)";
+    for (const s of data.sections) {
+      const box = document.getElementById(s.id);
+      box.querySelector(".count").textContent = "(" + s.count + ")";
+      if (!BOUND[s.id]) {
+        BOUND[s.id] = true;
+        box.addEventListener("toggle", () => { if (box.open && !(s.id in CURRENT)) show(s.id, 0); });
+      }
+      if (s.id in CURRENT) show(s.id, Math.min(CURRENT[s.id], Math.max(s.pages.length - 1, 0)));
+    }
+    return;
+  }
+  PAGES[name + "@" + data.version] = data;
+  const section = name.split("/")[0];
+  if (MANIFEST && pageName(section, CURRENT[section] || 0) === name) render(section);
+}
+
+// Live progress, only when served by pipeline/live_server.py
+function live() {
+  if (!location.protocol.startsWith("http") || !window.EventSource) return;
+  document.getElementById("live").hidden = false;
+  const status = document.getElementById("live-status");
+  const stages = {}, spans = {};
+  let queued = false;
+
+  function renderSpans() {
+    queued = false;
+    const rows = Object.entries(spans).sort().map(([name, s]) => {
+      const tr = el("tr");
+      for (const v of [name, s.n, s.last.toFixed(0), (s.total / s.n).toFixed(0), s.errors]) tr.appendChild(el("td", "", String(v)));
+      return tr;
+    });
+    const head = el("tr");
+    for (const h of ["span", "calls", "last ms", "avg ms", "errors"]) head.appendChild(el("th", "", h));
+    document.getElementById("live-spans").replaceChildren(head, ...rows);
+  }
+
+  const es = new EventSource("/events");
+  es.onopen = () => { status.textContent = "connected"; };
+  es.onerror = () => { status.textContent = "reconnecting…"; };
+  es.addEventListener("dropped", e => { status.textContent = "missed " + JSON.parse(e.data).missed + " events"; });
+  es.addEventListener("stage", e => {
+    const d = JSON.parse(e.data);
+    stages[d.name] = d;
+    document.getElementById("live-stages").replaceChildren(...Object.values(stages).map(s =>
+      el("li", "stage-" + s.status, s.label + " — " + s.status + (s.seconds !== undefined ? " (" + s.seconds.toFixed(2) + "s)" : ""))));
+    if (d.name === "dashboard" && d.status === "finished") load("data/manifest.js?t=" + Date.now());
+  });
+  es.addEventListener("span", e => {
+    const d = JSON.parse(e.data);
+    if (d.cat !== "provider" && d.cat !== "stage") return;
+    const s = spans[d.name] || (spans[d.name] = {n: 0, total: 0, last: 0, errors: 0});
+    s.n++; s.total += d.ms; s.last = d.ms;
+    if (d.outcome === "error") s.errors++;
+    if (!queued) { queued = true; setTimeout(renderSpans, 250); }
+  });
+  es.addEventListener("item", e => {
+    const d = JSON.parse(e.data);
+    document.getElementById("live-items").textContent =
+      d.ok + " items ok, " + d.failed + " failed — last: " + (d.slug || "line " + d.line) + " (" + d.status + ")";
+  });
+  es.addEventListener("qc", e => {
+    const d = JSON.parse(e.data), list = document.getElementById("live-qc");
+    list.prepend(el("li", "stage-failed", d.document + ": " + (d.error || d.violations.join(", "))));
+    while (list.children.length > 50) list.lastChild.remove();
+  });
+}
+"""
+
+
+def _shell_parts():
+    yield ('<!doctype html>\n<html>\n<head>\n<meta charset="utf-8"/>\n'
+           "<title>Calyco AI Pipeline Dashboard</title>\n"
+           '<meta name="viewport" content="width=device-width,initial-scale=1"/>\n')
+    yield f"<style>{_STYLE}</style>\n<script>{_SCRIPT}</script>\n</head>\n<body>\n"
+    yield '<h1>📊 Calyco AI Content Engine — Dashboard</h1>\n<p id="updated"></p>\n'
+    yield ('<section id="live" hidden><h2>🔴 Live <span id="live-status"></span></h2>'
+           '<ul id="live-stages"></ul><p id="live-items"></p><table id="live-spans"></table>'
+           '<ul id="live-qc"></ul></section>\n')
+    for section, title in SECTIONS.items():
+        extra = " images" if section == "images" else ""
+        yield (f'<details id="{section}"><summary>{escape(title)} <span class="count"></span></summary>'
+               f'<div class="pager"></div><div class="cards{extra}"></div></details>\n')
+    # Loaded fresh on every visit; pages are versioned through it
+    yield ('<script>load("data/manifest.js?t=" + Date.now()); live();</script>\n'
+           "</body>\n</html>\n")
+
+
+def write_shell(path):
+    """Stream the shell page to disk (temp file + rename)."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for part in _shell_parts():
+            f.write(part)
+    os.replace(tmp, path)
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def build_dashboard(page_size=None):
+    with span("dashboard.build", cat="dashboard") as s:
+        path, counts = _build_dashboard(page_size or PAGE_SIZE)
+        s.set(bytes=os.path.getsize(path), **counts)
+    return path
+
+
+def _build_dashboard(page_size):
+    out_dir = output_dir(OUTPUT_DIR)
+    path = os.path.join(out_dir, "dashboard.html")
+    data_dir = os.path.join(out_dir, DATA_DIR)
+    prefix = relative_prefix(out_dir)  # card links resolve against the page, not the fragment
+    print("📊 Building dashboard →", path)
+
+    state = JournalIndex(output_path(STATE_PATH))
+    cards = {}  # section -> {item id: (key, card)}
+    stale = []
+    seen = set()
+
+    for section, item_id, item_path, key, result in collect_items():
+        key = [DASHBOARD_VERSION, *key]
+        seen.add(item_id)
+        known = state.get(f"card:{item_id}")
+        if known and known["key"] == key and known["section"] == section:
+            cards.setdefault(section, {})[item_id] = (key, known["card"])
+        else:
+            stale.append((section, item_id, item_path, key, result))
+
+    # Thumbnails for the cards being rebuilt, rendered together on the pool
+    images = [p for sec, _, p, _, _ in stale if sec == "images"]
+    images += [r.get("image") for sec, _, _, _, r in stale if r and r.get("image")]
+    derivatives = build_derivatives(images) if images else {}
+
+    for section, item_id, item_path, key, result in stale:
+        card = build_card(section, item_id, item_path, result, prefix, derivatives)
+        state.set(f"card:{item_id}", {"key": key, "section": section, "card": card})
+        cards.setdefault(section, {})[item_id] = (key, card)
+
+    for k, _ in state.items("card:"):
+        if k[len("card:"):] not in seen:
+            state.delete(k)
+
+    # Pages: rewritten only when their cards changed. A card is fully
+    # determined by its key, so a page's version is the hash of its ids + keys.
+    sections, written = [], 0
+    known_pages = state.items("page:")
+    for section, title in SECTIONS.items():
+        section_cards = sorted(cards.get(section, {}).items())
+        versions = []
+        for n in range(0, len(section_cards), page_size):
+            name = page_name(section, n // page_size)
+            chunk = section_cards[n:n + page_size]
+            digest = stage_key(DASHBOARD_VERSION, [(i, key) for i, (key, _) in chunk])[:12]
+            page_path = os.path.join(data_dir, f"{name}.js")
+            if state.get(f"page:{name}") != digest or not os.path.exists(page_path):
+                page = {"section": section, "page": n // page_size, "version": digest,
+                        "cards": [c for _, (_, c) in chunk]}
+                _publish(page_path, name, page)
+                state.set(f"page:{name}", digest)
+                written += 1
+            versions.append(digest)
+
+        for k, _ in known_pages:
+            if k.startswith(f"page:{section}/") and int(k.rsplit("/", 1)[1]) >= len(versions):
+                state.delete(k)
+                try:
+                    os.remove(os.path.join(data_dir, f"{k[len('page:'):]}.js"))
+                except OSError:
+                    pass
+        sections.append({"id": section, "title": title, "count": len(section_cards), "pages": versions})
+
+    manifest = {"version": DASHBOARD_VERSION, "page_size": page_size, "sections": sections}
+    digest = stage_key(manifest)
+    manifest_path = os.path.join(data_dir, "manifest.js")
+    if state.get("manifest") != digest or not os.path.exists(manifest_path):
+        manifest["updated"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        _publish(manifest_path, "manifest", manifest)
+        state.set("manifest", digest)
+
+    if state.get("shell") != DASHBOARD_VERSION or not os.path.exists(path):
+        write_shell(path)
+        state.set("shell", DASHBOARD_VERSION)
+    state.close()
+
+    counts = {"cards": sum(s["count"] for s in sections), "rebuilt": len(stale), "pages_written": written}
+    print(f"✅ Dashboard ready → {path} ({counts['cards']} cards, {counts['rebuilt']} rebuilt, "
+          f"{written} pages written)")
+    return path, counts
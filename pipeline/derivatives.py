@@ -0,0 +1,270 @@
+# pipeline/derivatives.py
+"""
+Responsive Image Derivatives
+- Several widths per image in WebP + JPEG (AVIF too when listed and supported;
+  if none of the listed formats can be encoded, WebP/JPEG are used instead)
+- A thumbnail and a tiny blurred LQIP preview (inline base64 data URI)
+- Rendered with Pillow on a process pool
+- Keyed by source content hash: outputs/derivatives/<key[:2]>/<key>/
+  with a manifest.json describing every variant, so nothing is re-rendered
+  while the source bytes are unchanged
+"""
+
+import os
+import io
+import json
+import base64
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .build_cache import stage_key, file_digest
+from .paths import output_path, output_root
+
+# Pillow is imported inside the worker (_render) only.
+
+DERIVATIVES_DIR = "derivatives"  # relative to the output root
+DERIVATIVE_VERSION = "1"
+
+WIDTHS = tuple(int(w) for w in os.getenv("DERIVATIVE_WIDTHS", "320,640,1024").split(",") if w)
+FORMATS = tuple(f for f in os.getenv("DERIVATIVE_FORMATS", "webp,jpg").split(",") if f)
+QUALITY = {"avif": 55, "webp": 78, "jpg": 80}
+PIL_FORMAT = {"avif": "AVIF", "webp": "WEBP", "jpg": "JPEG"}
+MIME = {"avif": "image/avif", "webp": "image/webp", "jpg": "image/jpeg"}
+FALLBACK_FORMATS = ("webp", "jpg")  # when Pillow can't encode any of FORMATS
+
+_unknown = [f for f in FORMATS if f not in PIL_FORMAT]
+if _unknown or not FORMATS:
+    raise ValueError(
+        f"DERIVATIVE_FORMATS={','.join(FORMATS)!r}: expected a comma-separated "
+        f"subset of {', '.join(PIL_FORMAT)}"
+    )
+
+THUMB_WIDTH = 160
+LQIP_WIDTH = 16
+
+DEFAULT_SIZES = "(max-width: 700px) 100vw, 400px"
+
+
+# ============================================================
+# WORKER (runs in a separate process)
+# ============================================================
+
+def _save(img, path, fmt):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    img.save(tmp, PIL_FORMAT[fmt], quality=QUALITY[fmt], **({"optimize": True} if fmt == "jpg" else {}))
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def _render(src, out_dir, rel_dir, widths, formats):
+    """Render every variant of src into out_dir; returns the manifest dict."""
+    from PIL import Image, ImageFilter, features
+
+    def encodable(fmt):
+        return fmt == "jpg" or features.check(fmt)
+
+    formats = [f for f in formats if encodable(f)] or [f for f in FALLBACK_FORMATS if encodable(f)]
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(src) as im:
+        im.load()
+        im = im.convert("RGB")
+        width, height = im.size
+
+        targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+        variants = []
+        for w in targets:
+            h = max(1, round(height * w / width))
+            resized = im.resize((w, h), Image.LANCZOS) if w != width else im
+            for fmt in formats:
+                name = f"w{w}.{fmt}"
+                size = _save(resized, os.path.join(out_dir, name), fmt)
+                variants.append({
+                    "width": w, "height": h, "format": fmt,
+                    "path": f"{rel_dir}/{name}", "bytes": size,
+                })
+
+        thumb = im.copy()
+        thumb.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 4), Image.LANCZOS)
+        thumb_fmt = formats[0]
+        thumb_name = f"thumb.{thumb_fmt}"
+        thumb_size = _save(thumb, os.path.join(out_dir, thumb_name), thumb_fmt)
+
+        lqip = im.resize((LQIP_WIDTH, max(1, round(height * LQIP_WIDTH / width))), Image.BILINEAR)
+        lqip = lqip.filter(ImageFilter.GaussianBlur(1))
+        buf = io.BytesIO()
+        lqip.save(buf, "JPEG", quality=40)
+
+    manifest = {
+        "width": width,
+        "height": height,
+        "variants": variants,
+        "thumbnail": {
+            "width": thumb.width, "height": thumb.height, "format": thumb_fmt,
+            "path": f"{rel_dir}/{thumb_name}", "bytes": thumb_size,
+        },
+        "lqip": "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode(),
+    }
+
+    path = os.path.join(out_dir, "manifest.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)  # written last: its presence means "complete"
+    return manifest
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+def derivative_key(image):
+    digest = file_digest(image)
+    if not digest:
+        return None
+    return stage_key(DERIVATIVE_VERSION, digest, WIDTHS, FORMATS, THUMB_WIDTH, LQIP_WIDTH)
+
+
+def _rel_dir(key):
+    return f"{DERIVATIVES_DIR}/{key[:2]}/{key}"
+
+
+def derivatives_for(image):
+    """Manifest for an already-rendered image, or None (never renders)."""
+    key = derivative_key(image)
+    if not key:
+        return None
+    try:
+        with open(output_path(_rel_dir(key), "manifest.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================================
+# RENDERING (process pool)
+# ============================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+_in_flight = {}  # key -> Future, so concurrent callers share one render
+
+
+def _get_pool():
+    # spawn, not fork: callers are usually multi-threaded
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=int(os.getenv("DERIVATIVE_WORKERS", str(os.cpu_count() or 2))),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def submit(image):
+    """Future resolving to the manifest for image (rendered at most once)."""
+    key = derivative_key(image)
+    if not key:
+        return None
+
+    pool = _get_pool()
+    rel_dir = _rel_dir(key)
+    with _pool_lock:
+        fut = _in_flight.get(key)
+        if fut is None:
+            fut = pool.submit(
+                _render, os.path.abspath(image), os.path.abspath(output_path(rel_dir)),
+                rel_dir, WIDTHS, FORMATS,
+            )
+            _in_flight[key] = fut
+            fut.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return fut
+
+
+def ensure_derivatives(image):
+    """Manifest for image, rendering it first if needed. None if it can't be read."""
+    manifest = derivatives_for(image)
+    if manifest is not None:
+        return manifest
+
+    fut = submit(image)
+    if fut is None:
+        return None
+    try:
+        return fut.result()
+    except Exception as e:
+        print(f"⚠️ Derivatives failed for {image}:", e)
+        return None
+
+
+def build_derivatives(images):
+    """{image: manifest or None} — renders every missing image in parallel."""
+    results = {}
+    pending = {}
+    for image in dict.fromkeys(i for i in images if i):
+        manifest = derivatives_for(image)
+        if manifest is not None:
+            results[image] = manifest
+        else:
+            pending[image] = submit(image)
+
+    for image, fut in pending.items():
+        try:
+            results[image] = fut.result() if fut else None
+        except Exception as e:
+            print(f"⚠️ Derivatives failed for {image}:", e)
+            results[image] = None
+    return results
+
+
+# ============================================================
+# MARKUP HELPERS
+# ============================================================
+
+def _href(path, prefix):
+    return f"{prefix}{path}" if prefix else path
+
+
+def srcset(manifest, fmt, prefix=""):
+    return ", ".join(
+        f"{_href(v['path'], prefix)} {v['width']}w"
+        for v in manifest["variants"] if v["format"] == fmt
+    )
+
+
+def largest(manifest, fmt=None):
+    variants = [v for v in manifest["variants"] if fmt is None or v["format"] == fmt]
+    return max(variants, key=lambda v: v["width"]) if variants else None
+
+
+def picture_html(manifest, prefix="", alt="", sizes=DEFAULT_SIZES, css_class=""):
+    """
+    <picture> with one <source> per modern format, a JPEG (or last format)
+    fallback <img>, lazy loading and the LQIP as a blurred background.
+    `prefix` turns output-root-relative paths into URLs for the page.
+    """
+    from html import escape
+
+    formats = list(dict.fromkeys(v["format"] for v in manifest["variants"]))
+    fallback = "jpg" if "jpg" in formats else formats[-1]
+    sources = "".join(
+        f'<source type="{MIME[fmt]}" srcset="{srcset(manifest, fmt, prefix)}" sizes="{sizes}">'
+        for fmt in formats if fmt != fallback
+    )
+    img = largest(manifest, fallback)
+    return (
+        f"<picture>{sources}"
+        f'<img src="{_href(img["path"], prefix)}" srcset="{srcset(manifest, fallback, prefix)}" '
+        f'sizes="{sizes}" width="{img["width"]}" height="{img["height"]}" '
+        f'alt="{escape(alt)}" loading="lazy" decoding="async" class="{css_class}" '
+        f'style="background:url({manifest["lqip"]}) center/cover no-repeat">'
+        f"</picture>"
+    )
+
+
+def relative_prefix(from_dir):
+    """URL prefix from a page in from_dir back to the output root."""
+    rel = os.path.relpath(output_root(), from_dir).replace(os.sep, "/")
+    return "" if rel == "." else rel + "/"
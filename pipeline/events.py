@@ -0,0 +1,62 @@
+# pipeline/events.py
+"""
+Live Events
+- publish(kind, **data) appends to a bounded in-memory ring; it never does
+  I/O and never waits on a reader. Until something enables it (the live
+  server) it returns after one global check, so the hot path pays nothing
+- Every event gets a sequence number. Readers (SSE clients) poll for what
+  came after the last one they saw — nobody is notified, so publishing costs
+  the same however many clients are connected; a reader that fell further
+  behind than the ring holds is told how many events it missed instead of
+  slowing the pipeline down
+- Span ends are published from tracing; stages, batch items and QC failures
+  publish their own events
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from itertools import islice
+
+EVENT_BUFFER = int(os.getenv("LIVE_EVENT_BUFFER", "4096"))
+
+enabled = False
+
+_lock = threading.Lock()
+_ring = deque(maxlen=EVENT_BUFFER)  # (seq, ts, kind, data)
+_seq = 0
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def publish(kind, **data):
+    """Record one event; O(1), drops the oldest once the ring is full."""
+    global _seq
+    if not enabled:
+        return
+    with _lock:
+        _seq += 1
+        _ring.append((_seq, time.time(), kind, data))
+
+
+def last_seq():
+    return _seq
+
+
+def since(seq):
+    """([(seq, ts, kind, data), ...] after seq, number missed); never waits."""
+    with _lock:
+        if _seq <= seq:
+            return [], 0
+        first = _ring[0][0]
+        start = max(seq + 1, first)
+        return list(islice(_ring, start - first, None)), start - seq - 1
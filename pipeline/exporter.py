@@ -1,7 +1,8 @@
-import pandas as pd
-import os
+from pipeline.paths import output_file
 
 def export_social_posts():
+    import pandas as pd
+
     # Demo CSV
     rows = [
         ["Instagram", "Top texture ideas for 2025", "#home #paint", "2025-11-12"],
@@ -10,10 +11,10 @@ def export_social_posts():
     
     df = pd.DataFrame(rows, columns=["Platform", "Caption", "Hashtags", "Schedule"])
 
-    os.makedirs("outputs/social_posts", exist_ok=True)
-    df.to_csv("outputs/social_posts/social_schedule.csv", index=False)
+    path = output_file("social_posts", "social_schedule.csv")
+    df.to_csv(path, index=False)
 
-    print("CSV exported → outputs/social_posts/social_schedule.csv")
+    print("CSV exported →", path)
 
 if __name__ == "__main__":
     export_social_posts()
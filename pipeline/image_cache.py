@@ -0,0 +1,226 @@
+# pipeline/image_cache.py
+"""
+Persistent Image Cache
+- Keyed by provider + normalised prompt + generation parameters
+- JSON metadata index with LRU eviction under a byte budget (IMAGE_CACHE_BYTES)
+- Cached images are hardlinked into outputs/images/ instead of copied
+- Hit / miss / eviction counters
+"""
+
+import os
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .paths import output_path
+
+CACHE_DIR = os.path.join(".cache", "images")  # relative to the output root
+INDEX_NAME = "index.json"
+
+DEFAULT_MAX_BYTES = int(os.getenv("IMAGE_CACHE_BYTES", str(512 * 1024 * 1024)))
+FLUSH_INTERVAL = 2.0
+
+
+def normalize_prompt(prompt):
+    """Case- and whitespace-insensitive form of a prompt."""
+    return " ".join(str(prompt).lower().split())
+
+
+def image_key(provider, prompt, **params):
+    blob = json.dumps(
+        [provider, normalize_prompt(prompt), params],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src, dst):
+    """
+    Place src at dst without duplicating bytes when the filesystem allows
+    (hardlink), falling back to a copy across devices. dst is replaced
+    atomically, never truncated in place, so shared inodes stay intact.
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+class ImageCache:
+    def __init__(self, root=None, max_bytes=None):
+        self._root = root
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._index = None          # OrderedDict key -> meta, least recent first
+        self._bytes = 0
+        self._dirty = False
+        self._last_flush = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @property
+    def root(self):
+        return self._root or output_path(CACHE_DIR)
+
+    def _blob_path(self, meta):
+        return os.path.join(self.root, meta["file"])
+
+    # ---------------- index persistence
+
+    def _load(self):
+        if self._index is not None:
+            return
+        entries = {}
+        try:
+            with open(os.path.join(self.root, INDEX_NAME), "r") as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+        self._index = OrderedDict(sorted(entries.items(), key=lambda kv: kv[1].get("last_used", 0)))
+        self._bytes = sum(m.get("size", 0) for m in self._index.values())
+
+    def flush(self, force=True):
+        with self._lock:
+            if not self._dirty or self._index is None:
+                return
+            if not force and time.monotonic() - self._last_flush < FLUSH_INTERVAL:
+                return
+            data = json.dumps({"version": 1, "entries": self._index}, separators=(",", ":"))
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX_NAME)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # ---------------- lookups
+
+    def get(self, key):
+        """Path of the cached blob for key, or None. Counts a hit or miss."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._load()
+            meta = self._index.get(key)
+            if meta is not None:
+                path = self._blob_path(meta)
+                if os.path.exists(path):
+                    meta["last_used"] = time.time()
+                    self._index.move_to_end(key)
+                    self._dirty = True
+                    self.hits += 1
+                    return path
+                # blob vanished underneath us
+                self._bytes -= meta.get("size", 0)
+                del self._index[key]
+                self._dirty = True
+            self.misses += 1
+            return None
+
+    def materialize(self, key, dest):
+        """Link the cached image for key to dest; return dest or None."""
+        blob = self.get(key)
+        if not blob:
+            return None
+        link_or_copy(blob, dest)
+        self.flush(force=False)
+        return dest
+
+    # ---------------- inserts
+
+    def put(self, key, data, ext, provider=None):
+        """Store image bytes; returns the blob path (or None when disabled)."""
+        if not self.enabled or len(data) > self.max_bytes:
+            return None
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.put_file(key, tmp, ext, provider)
+
+    def put_file(self, key, src, ext, provider=None):
+        """
+        Move a finished download into the cache (rename, no copy); returns
+        the blob path, or None when disabled — src is then left untouched.
+        src should live on the same filesystem as the cache.
+        """
+        size = os.path.getsize(src)
+        if not self.enabled or size > self.max_bytes:
+            return None
+
+        meta = {
+            "file": os.path.join(key[:2], f"{key}.{ext}"),
+            "size": size,
+            "provider": provider,
+            "created": time.time(),
+            "last_used": time.time(),
+        }
+        path = self._blob_path(meta)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(src, path)
+        except OSError:
+            shutil.move(src, path)
+
+        with self._lock:
+            self._load()
+            old = self._index.pop(key, None)
+            if old:
+                self._bytes -= old.get("size", 0)
+            self._index[key] = meta
+            self._bytes += meta["size"]
+            self._dirty = True
+            victims = self._evict_locked()
+
+        for victim in victims:
+            try:
+                os.remove(victim)
+            except OSError:
+                pass
+
+        self.flush(force=False)
+        return path
+
+    def _evict_locked(self):
+        victims = []
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            _, meta = self._index.popitem(last=False)
+            self._bytes -= meta.get("size", 0)
+            victims.append(self._blob_path(meta))
+            self.evictions += 1
+        return victims
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+image_cache = ImageCache()
+atexit.register(image_cache.flush)
@@ -4,10 +4,10 @@ No paid APIs required.
 """
 
 import os
-import requests
 
-# Ensure output directory exists
-os.makedirs("outputs/images", exist_ok=True)
+from pipeline.paths import output_file
+from pipeline import transport
+from pipeline.ingest import ingest
 
 # Free-tier HF SD model
 # HF_API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2"
@@ -18,7 +18,8 @@ HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {}
 
 def generate_image(prompt, slug):
 
-    HF_API_URL = (
+    HF_API_URL = os.getenv(
+        "HF_API_URL",
         "https://router.huggingface.co/hf-inference/models/"
         "stabilityai/stable-diffusion-xl-base-1.0"
     )
@@ -37,31 +38,29 @@ def generate_image(prompt, slug):
     }
 
     try:
-        response = requests.post(
+        response = transport.post(
             HF_API_URL,
+            provider="huggingface",
             headers=headers,
             json=payload,
-            timeout=60
+            timeout=60,
+            stream=True
         )
 
-        if response.status_code == 200:
-            import base64
-            result = response.json()
+        if response is None:
+            print("⚠️ HF rate limit: no slot within the timeout")
+        elif response.status_code == 200:
+            files = ingest(response, "generated_image", "png", limit=1)
 
-            if "generated_image" in result:
-                img_b64 = result["generated_image"]
-                img_bytes = base64.b64decode(img_b64)
-
-                path = f"outputs/images/{slug}.png"
-                os.makedirs("outputs/images", exist_ok=True)
-
-                with open(path, "wb") as f:
-                    f.write(img_bytes)
+            if files:
+                tmp, ext = files[0]
+                path = output_file("images", f"{slug}.{ext}")
+                os.replace(tmp, path)
 
                 print("🖼️ HuggingFace image saved:", path)
                 return path
             else:
-                print("⚠️ HF response missing image:", result)
+                print("⚠️ HF response missing image")
 
         else:
             print("⚠️ HF Image Generation Failed:", response.text)
@@ -80,7 +79,7 @@ def use_stock_image(slug):
     """
 
     src = "assets/placeholder.jpg"
-    dst = f"outputs/images/{slug}.jpg"
+    dst = output_file("images", f"{slug}.jpg")
 
     if os.path.exists(src):
         with open(src, "rb") as f_src:
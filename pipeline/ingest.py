@@ -0,0 +1,215 @@
+# pipeline/ingest.py
+"""
+Streaming Image Ingestion
+- Responses are read in fixed-size chunks and written straight to temp files
+- JSON-wrapped images ({"generated_image": b64} / {"images": [b64, ...]})
+  are base64-decoded incrementally, never held as one string
+- Raw image/* bodies are copied through as-is
+- Temp files live under the output root so callers can os.replace() them
+  into place atomically
+Peak memory per download is O(CHUNK_SIZE), independent of image size.
+"""
+
+import os
+import re
+import uuid
+import binascii
+
+from .paths import output_dir
+
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", str(64 * 1024)))
+TMP_DIR = os.path.join(".cache", "tmp")  # relative to the output root
+
+CONTENT_TYPE_EXT = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+def temp_path(ext="bin"):
+    return os.path.join(output_dir(TMP_DIR), f"{uuid.uuid4().hex}.{ext}.part")
+
+
+def discard(path):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class B64JsonExtractor:
+    """
+    Incremental parser that finds `"key": "<b64>"` or `"key": ["<b64>", ...]`
+    in a JSON byte stream and decodes each string into its own file.
+    Everything else in the document is skipped without being buffered.
+    """
+
+    def __init__(self, key, limit=None):
+        self._pattern = re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:')
+        self._keep = len(key) + 64
+        self._limit = limit
+        self._state = "seek"
+        self._seek_buf = b""
+        self._pending = b""        # undecoded base64 (< 4 chars after each push)
+        self._escape = False
+        self._sink = None
+        self._sink_path = None
+        self.paths = []
+
+    @property
+    def done(self):
+        return self._state == "done"
+
+    def feed(self, data):
+        pos = 0
+        while pos < len(data) and self._state != "done":
+            if self._state == "seek":
+                buf = self._seek_buf + data[pos:]
+                m = self._pattern.search(buf)
+                if not m:
+                    self._seek_buf = buf[-self._keep:]
+                    return
+                self._seek_buf = b""
+                data, pos = buf, m.end()
+                self._state = "value"
+
+            elif self._state in ("value", "array"):
+                c = data[pos:pos + 1]
+                pos += 1
+                if c in b" \t\r\n,":
+                    continue
+                if c == b'"':
+                    self._open()
+                    self._return = "done" if self._state == "value" else "array"
+                    self._state = "string"
+                elif c == b"[" and self._state == "value":
+                    self._state = "array"
+                else:  # null / number / end of array
+                    self._state = "done"
+
+            elif self._state == "string":
+                pos = self._feed_string(data, pos)
+
+    def _feed_string(self, data, pos):
+        n = len(data)
+        while pos < n:
+            if self._escape:
+                self._escape = False
+                if data[pos:pos + 1] == b"/":
+                    self._push(b"/")
+                pos += 1  # \n, \r ... are line breaks inside wrapped base64
+                continue
+
+            quote = data.find(b'"', pos)
+            backslash = data.find(b"\\", pos)
+            end = n if quote == -1 else quote
+
+            if backslash != -1 and backslash < end:
+                self._push(data[pos:backslash])
+                self._escape = True
+                pos = backslash + 1
+                continue
+
+            self._push(data[pos:end])
+            if quote == -1:
+                return n
+            self._close()
+            return quote + 1
+        return pos
+
+    def _push(self, chunk):
+        if not chunk:
+            return
+        buf = self._pending + chunk
+        cut = len(buf) - len(buf) % 4
+        if cut:
+            self._sink.write(binascii.a2b_base64(buf[:cut]))
+        self._pending = buf[cut:]
+
+    def _open(self):
+        self._sink_path = temp_path()
+        self._sink = open(self._sink_path, "wb")
+        self._pending = b""
+
+    def _close(self):
+        if self._pending:
+            self._sink.write(binascii.a2b_base64(self._pending + b"=" * (-len(self._pending) % 4)))
+            self._pending = b""
+        self._sink.close()
+        self.paths.append(self._sink_path)
+        self._sink = self._sink_path = None
+
+        if self._limit and len(self.paths) >= self._limit:
+            self._state = "done"
+        else:
+            self._state = self._return
+
+    def abort(self):
+        if self._sink:
+            self._sink.close()
+            discard(self._sink_path)
+        for path in self.paths:
+            discard(path)
+        self.paths = []
+
+
+def _content_type(response):
+    return (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+
+def stream_raw(response, ext=None, cancel=None):
+    """
+    Copy a binary body to a temp file. Returns (path, ext), or None when
+    cancel (threading.Event) is set before the body is complete.
+    """
+    ext = ext or CONTENT_TYPE_EXT.get(_content_type(response), "bin")
+    path = temp_path(ext)
+    try:
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if cancel is not None and cancel.is_set():
+                    discard(path)
+                    return None
+                f.write(chunk)
+    except BaseException:
+        discard(path)
+        raise
+    return path, ext
+
+
+def stream_json_images(response, key, limit=None, cancel=None):
+    """Decode the base64 image(s) under `key` into temp files. Returns [path, ...] ([] if cancelled)."""
+    extractor = B64JsonExtractor(key, limit=limit)
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if cancel is not None and cancel.is_set():
+                extractor.abort()
+                return []
+            extractor.feed(chunk)
+            if extractor.done:
+                break
+    except BaseException:
+        extractor.abort()
+        raise
+    return extractor.paths
+
+
+def ingest(response, key, ext="png", limit=None, cancel=None):
+    """
+    [(temp path, ext), ...] from a provider response, whether it is a raw
+    image/* body or JSON with base64 image(s) under `key`. The caller owns
+    the temp files and must os.replace() or discard() them. Empty if
+    cancel is set while reading.
+    """
+    try:
+        content_type = _content_type(response)
+        if content_type.startswith("image/"):
+            raw = stream_raw(response, cancel=cancel)
+            return [raw] if raw else []
+        return [(path, ext) for path in stream_json_images(response, key, limit, cancel)]
+    finally:
+        response.close()
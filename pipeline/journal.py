@@ -0,0 +1,116 @@
+# pipeline/journal.py
+"""
+Append-only JSONL Index
+- A persistent dict where each change is one appended line, so updates
+  cost O(1) instead of rewriting a whole JSON file
+- Replayed on load; a torn last line from a crash is ignored
+- Compacted (atomic rewrite of live entries) once dead lines dominate
+"""
+
+import os
+import json
+import threading
+
+COMPACT_MIN_LINES = 1000
+COMPACT_RATIO = 2.0  # compact when lines > ratio × live entries
+
+
+class JournalIndex:
+    def __init__(self, path, compact_min_lines=COMPACT_MIN_LINES, compact_ratio=COMPACT_RATIO):
+        self.path = path
+        self.compact_min_lines = compact_min_lines
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._data = None
+        self._lines = 0
+        self._fh = None
+
+    # ---------------- load / persist
+
+    def _load(self):
+        if self._data is not None:
+            return
+        data, lines = {}, 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        continue  # torn write
+                    lines += 1
+                    if op.get("d"):
+                        data.pop(op["k"], None)
+                    else:
+                        data[op["k"]] = op.get("v")
+        except OSError:
+            pass
+        self._data, self._lines = data, lines
+
+    def _append(self, op):
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps(op, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self._fh.flush()
+        self._lines += 1
+
+        if self._lines > self.compact_min_lines and self._lines > self.compact_ratio * len(self._data):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with one line per live entry."""
+        with self._lock:
+            self._load()
+            self.close()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for k, v in self._data.items():
+                    f.write(json.dumps({"k": k, "v": v}, separators=(",", ":"), ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            self._lines = len(self._data)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    # ---------------- dict-like API
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._load()
+            return self._data.get(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            self._load()
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._data)
+
+    def set(self, key, value):
+        with self._lock:
+            self._load()
+            if key in self._data and self._data[key] == value:
+                return
+            self._data[key] = value
+            self._append({"k": key, "v": value})
+
+    def delete(self, key):
+        with self._lock:
+            self._load()
+            if key in self._data:
+                del self._data[key]
+                self._append({"k": key, "d": 1})
+
+    def items(self, prefix=None):
+        """Snapshot of (key, value) pairs, optionally only keys starting with prefix."""
+        with self._lock:
+            self._load()
+            return [(k, v) for k, v in self._data.items() if prefix is None or k.startswith(prefix)]
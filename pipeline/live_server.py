@@ -0,0 +1,321 @@
+# pipeline/live_server.py
+"""
+Live Dashboard Server (stdlib only)
+- Serves the output root over HTTP: / redirects to the dashboard; artifacts,
+  images and thumbnails get ETag / Last-Modified validation and byte Range
+  support. Derivatives (content-addressed paths) are cached as immutable,
+  everything else revalidates. Dot-directories (.store, .cache) are private
+- GET /events streams pipeline events (pipeline/events.py) as Server-Sent
+  Events: stage progress, batch items, provider / stage latencies and QC
+  failures. Last-Event-ID resumes after a reconnect
+- Each client reads the shared event ring at its own pace on its own
+  thread. A slow client only falls behind (and is told how many events it
+  missed); the pipeline never waits for it. Socket writes time out after
+  LIVE_WRITE_TIMEOUT and at most LIVE_MAX_CLIENTS streams are open at once
+
+    python run_all.py --serve            # serve while the pipeline runs
+    python -m pipeline.live_server       # serve an existing outputs/ folder
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+
+from . import events
+from .paths import output_path, set_output_root
+
+LIVE_HOST = os.getenv("LIVE_HOST", "127.0.0.1")
+LIVE_PORT = int(os.getenv("LIVE_PORT", "8700"))
+LIVE_MAX_CLIENTS = int(os.getenv("LIVE_MAX_CLIENTS", "16"))
+LIVE_WRITE_TIMEOUT = float(os.getenv("LIVE_WRITE_TIMEOUT", "10"))
+
+HEARTBEAT = 15.0   # seconds between keep-alive comments on an idle stream
+POLL = 0.1         # how often a stream checks the event ring
+CHUNK = 64 * 1024
+
+DASHBOARD = "dashboard/dashboard.html"
+IMMUTABLE_PREFIXES = ("derivatives/",)  # paths contain the content hash
+
+MIME = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".jsonl": "application/x-ndjson; charset=utf-8",
+    ".ndjson": "application/x-ndjson; charset=utf-8",
+    ".md": "text/markdown; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".xml": "application/xml; charset=utf-8",
+    ".gz": "application/gzip",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".svg": "image/svg+xml",
+}
+
+
+# ============================================================
+# HTTP HELPERS
+# ============================================================
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, None when it can't
+    be satisfied, False when it should be ignored (other units, multiple
+    ranges, garbage) and the whole file served.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return False
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return False
+    try:
+        if not first:  # suffix: the last N bytes
+            n = int(last)
+            return (max(size - n, 0), size - 1) if n > 0 and size else None
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return False
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_for(st):
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def not_modified(headers, etag, mtime):
+    """Conditional GET: If-None-Match wins over If-Modified-Since."""
+    inm = headers.get("If-None-Match")
+    if inm is not None:
+        tags = [t.strip() for t in inm.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    ims = headers.get("If-Modified-Since")
+    if ims:
+        try:
+            return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def sse(kind, data, seq=None):
+    head = f"id: {seq}\n" if seq is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+_encoded = {}  # seq -> SSE bytes, shared so N clients encode each event once
+
+
+def encoded(seq, ts, kind, data):
+    frame = _encoded.get(seq)
+    if frame is None:
+        frame = _encoded[seq] = sse(kind, dict(data, ts=ts), seq)
+        if len(_encoded) > 2 * events.EVENT_BUFFER:
+            for old in [k for k in list(_encoded) if k <= seq - events.EVENT_BUFFER]:
+                _encoded.pop(old, None)
+    return frame
+
+
+# ============================================================
+# HANDLER
+# ============================================================
+
+class LiveHandler(BaseHTTPRequestHandler):
+    server_version = "CalycoLive/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive: a page loads many thumbnails
+
+    def log_message(self, fmt, *args):
+        pass  # the pipeline's own output is noisy enough
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def _handle(self, head):
+        path = unquote(urlsplit(self.path).path)
+        if path == "/events":
+            return self._events()
+        if path in ("", "/"):
+            self.send_response(302)
+            self.send_header("Location", "/" + DASHBOARD)
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+        self._file(path.lstrip("/"), head)
+
+    # ---------------- static files
+
+    def _file(self, rel, head):
+        root = self.server.root
+        full = os.path.realpath(os.path.join(root, rel))
+        private = any(part.startswith(".") for part in rel.split("/"))
+        if private or not full.startswith(root + os.sep) or not os.path.isfile(full):
+            return self.send_error(404)
+
+        st = os.stat(full)
+        etag = etag_for(st)
+        cache = ("public, max-age=31536000, immutable" if rel.startswith(IMMUTABLE_PREFIXES)
+                 else "no-cache")
+
+        if not_modified(self.headers, etag, st.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache)
+            return self.end_headers()
+
+        size, status = st.st_size, 200
+        start, end = 0, st.st_size - 1
+        rng = self.headers.get("Range")
+        if rng and self.headers.get("If-Range", etag) == etag:
+            parsed = parse_range(rng, size)
+            if parsed is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+            if parsed:
+                (start, end), status = parsed, 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", MIME.get(os.path.splitext(full)[1].lower(), "application/octet-stream"))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+        self.send_header("Cache-Control", cache)
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        remaining = end - start + 1
+        with open(full, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(CHUNK, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    # ---------------- server-sent events
+
+    def _events(self):
+        if not self.server.clients.acquire(blocking=False):
+            return self.send_error(503, "Too many live clients")
+        self.close_connection = True  # the stream ends when the socket does
+        try:
+            self.request.settimeout(LIVE_WRITE_TIMEOUT)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+
+            last_id = self.headers.get("Last-Event-ID", "")
+            # New clients get whatever the ring still holds (the run so far)
+            seq = int(last_id) if last_id.isdigit() else max(events.last_seq() - events.EVENT_BUFFER, 0)
+            self.wfile.write(b"retry: 2000\n\n")
+            last_write = time.monotonic()
+
+            while not self.server.stopping:
+                batch, missed = events.since(seq)
+                out = [sse("dropped", {"missed": missed})] if missed else []
+                for event in batch:
+                    out.append(encoded(*event))
+                    seq = event[0]
+                now = time.monotonic()
+                if out or now - last_write >= HEARTBEAT:
+                    self.wfile.write(b"".join(out) or b": ping\n\n")
+                    last_write = now
+                time.sleep(POLL)
+        except OSError:
+            pass  # client went away or stopped reading
+        finally:
+            self.server.clients.release()
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class LiveServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, root=None):
+        super().__init__(address, LiveHandler)
+        self.root = os.path.realpath(root or output_path())
+        self.stopping = False
+        self.clients = threading.BoundedSemaphore(LIVE_MAX_CLIENTS)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{'127.0.0.1' if host in ('0.0.0.0', '') else host}:{port}/"
+
+
+def start_live_server(host=LIVE_HOST, port=LIVE_PORT, root=None):
+    """Serve the output root on a daemon thread and start publishing events."""
+    from .dashboard import OUTPUT_DIR, write_shell
+    from .paths import output_dir
+
+    shell = os.path.join(output_dir(OUTPUT_DIR), "dashboard.html")
+    if not os.path.exists(shell):
+        write_shell(shell)  # live panel works before the first dashboard build
+
+    server = LiveServer((host, port), root)
+    server.thread = threading.Thread(target=server.serve_forever, name="live-server", daemon=True)
+    server.thread.start()
+    events.enable()
+    return server
+
+
+def stop_live_server(server):
+    events.disable()
+    server.stopping = True
+    server.shutdown()
+    server.server_close()
+
+
+def serve_until_interrupted(server):
+    """Keep serving after the run (Ctrl+C to stop)."""
+    print(f"📡 Still serving {server.url} — press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_live_server(server)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard and artifacts over HTTP.")
+    parser.add_argument("--host", default=LIVE_HOST, help="Bind address (default: $LIVE_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=LIVE_PORT, help="Port (default: $LIVE_PORT or 8700)")
+    parser.add_argument("--output-root", default=None,
+                        help="Where artifacts live (default: $CALYCO_OUTPUT_ROOT or outputs)")
+    args = parser.parse_args(argv)
+
+    if args.output_root:
+        set_output_root(args.output_root)
+    server = start_live_server(args.host, args.port)
+    print(f"📡 Serving {output_path()} at {server.url}")
+    serve_until_interrupted(server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+# pipeline/markdown_outline.py
+"""
+Streaming Markdown Outline
+- MarkdownParser.feed(chunk) / finish(): one pass, line by line as chunks
+  arrive (a partial last line waits for the next chunk)
+- Emits the heading tree (ATX headings need the space after the #s, so
+  "#FFF" and hashtags are not headings; setext underlines count too),
+  paragraph boundaries as line ranges, the first paragraph as a plain-text
+  excerpt, link / image counts, and the count and density of every trend
+  keyword from outputs/raw/google_trends.json
+- Fenced code blocks are skipped
+- outline(text) / outline_file(path) cache the result by content hash in
+  outputs/.cache/markdown.jsonl; QC, JSON-LD and the dashboards all read
+  it, so each document is parsed once. Pool workers (collect_outlines())
+  hand new outlines to their parent instead of appending to the journal.
+  outline(text, persist=False) (single-document QC) only uses the
+  in-memory cache of recent outlines and never touches the filesystem
+"""
+
+import os
+import re
+import json
+import threading
+import functools
+from collections import OrderedDict
+
+from .brand_rules import canonical, compile_phrases, normalize
+from .build_cache import build_cache, stage_key, hash_bytes, file_digest
+from .journal import JournalIndex
+from .paths import output_path
+
+# Bump when the parser output changes — part of the outline cache key.
+OUTLINE_VERSION = "1"
+
+CACHE_PATH = os.path.join(".cache", "markdown.jsonl")    # relative to the output root
+TRENDS_PATH = os.path.join("raw", "google_trends.json")  # relative to the output root
+EXCERPT_CHARS = 160  # meta-description length
+RECENT_OUTLINES = 256  # outlines also kept in memory, by outline key
+
+_ATX = re.compile(r" {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT = re.compile(r" {0,3}(=+|-+)[ \t]*$")
+_BREAK = re.compile(r" {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)|<(https?://[^>\s]+)>")
+_BLOCK_MARKER = re.compile(r" {0,3}(?:>[ \t]?|[-*+][ \t]+|\d{1,9}[.)][ \t]+)+")
+_EMPHASIS = re.compile(r"[*_`]+")
+_WORD = re.compile(r"\w+")
+
+
+def plain_text(line):
+    """Inline markdown removed: images dropped, links reduced to their text."""
+    if "[" in line or "<" in line:
+        line = _IMAGE.sub("", line)
+        line = _LINK.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(2), line)
+    if _BLOCK_MARKER.match(line):
+        line = _BLOCK_MARKER.sub("", line, count=1)
+    if "*" in line or "_" in line or "`" in line:
+        line = _EMPHASIS.sub("", line)
+    return " ".join(line.split())
+
+
+def _excerpt(text, limit=EXCERPT_CHARS):
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0].rstrip(",;:.-–—")
+    return cut + "…"
+
+
+def heading_tree(headings):
+    """[{"level", "title", "children"}, ...] from [(level, title, line), ...]."""
+    root = {"level": 0, "children": []}
+    stack = [root]
+    for level, title, _ in headings:
+        while stack[-1]["level"] >= level:
+            stack.pop()
+        node = {"level": level, "title": title, "children": []}
+        stack[-1]["children"].append(node)
+        stack.append(node)
+    return root["children"]
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+@functools.lru_cache(maxsize=16)
+def _keyword_matcher(keywords):
+    """({canonical keyword: keyword}, compiled pattern or None), per keyword set."""
+    by_canonical = {canonical(k): k for k in keywords if canonical(k)}
+    return by_canonical, compile_phrases(by_canonical.values()) if by_canonical else None
+
+
+class MarkdownParser:
+    def __init__(self, keywords=()):
+        self.keywords, self._pattern = _keyword_matcher(tuple(keywords))
+        self._buffer = ""
+        self._line = 0
+        self._fence = None
+        self._para = []           # plain text of the open paragraph's lines
+        self._para_start = 0
+        self._para_end = 0
+        self.headings = []        # [(level, title, line), ...]
+        self.paragraphs = []      # [(first line, end line (exclusive), words), ...]
+        self.excerpt = ""
+        self.words = 0
+        self.links = 0
+        self.images = 0
+        self.keyword_counts = dict.fromkeys(self.keywords.values(), 0)
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._feed_line(line)
+
+    def finish(self):
+        """Flush the last line and open paragraph; returns result()."""
+        if self._buffer:
+            self._feed_line(self._buffer)
+            self._buffer = ""
+        self._close_paragraph()
+        return self.result()
+
+    # ---------------- blocks
+
+    def _feed_line(self, line):
+        n = self._line
+        self._line += 1
+        line = line.rstrip("\r")
+
+        fence = _FENCE.match(line)
+        if self._fence:
+            if fence and fence.group(1)[0] == self._fence[0] and len(fence.group(1)) >= len(self._fence):
+                self._fence = None
+            return
+        if fence:
+            self._close_paragraph()
+            self._fence = fence.group(1)
+            return
+
+        if not line.strip():
+            self._close_paragraph()
+            return
+
+        setext = _SETEXT.match(line)
+        if setext and self._para:
+            title = " ".join(self._para)
+            self._para = []
+            self._heading(1 if setext.group(1)[0] == "=" else 2, title, self._para_start)
+            return
+
+        atx = _ATX.match(line)
+        if atx:
+            self._close_paragraph()
+            self._count_inline(line)
+            self._heading(len(atx.group(1)), plain_text(atx.group(2) or ""), n)
+            return
+
+        if _BREAK.match(line):
+            self._close_paragraph()
+            return
+
+        self._count_inline(line)
+        if not self._para:
+            self._para_start = n
+        self._para_end = n + 1
+        self._para.append(plain_text(line))
+
+    def _count_inline(self, line):
+        if "[" in line or "<" in line:
+            self.images += len(_IMAGE.findall(line))
+            self.links += len(_LINK.findall(_IMAGE.sub("", line)))
+
+    def _heading(self, level, title, line):
+        if title:
+            self.headings.append((level, title, line))
+            self._count_words(title)
+
+    def _close_paragraph(self):
+        if not self._para:
+            return
+        text = " ".join(t for t in self._para if t)
+        self._para = []
+        if not text:
+            return
+        words = self._count_words(text)
+        self.paragraphs.append((self._para_start, self._para_end, words))
+        if not self.excerpt:
+            self.excerpt = _excerpt(text)
+
+    def _count_words(self, text):
+        folded = normalize(text)[0]
+        words = len(_WORD.findall(folded))
+        self.words += words
+        if self._pattern is not None:
+            for m in self._pattern.finditer(folded):
+                matched = m.group()
+                keyword = self.keywords.get(matched) or self.keywords.get(canonical(matched))
+                if keyword is not None:
+                    self.keyword_counts[keyword] += 1
+        return words
+
+    # ---------------- result
+
+    def result(self):
+        density = {}
+        for keyword, count in self.keyword_counts.items():
+            share = count * len(canonical(keyword).split()) / self.words if self.words else 0.0
+            density[keyword] = {"count": count, "density": round(100 * share, 2)}
+        return {
+            "title": next((t for level, t, _ in self.headings if level == 1), None),
+            "headings": [list(h) for h in self.headings],
+            "tree": heading_tree(self.headings),
+            "paragraphs": [list(p) for p in self.paragraphs],
+            "excerpt": self.excerpt,
+            "words": self.words,
+            "links": self.links,
+            "images": self.images,
+            "keywords": density,
+        }
+
+
+def parse_markdown(text, keywords=()):
+    """Outline of a whole document (uncached)."""
+    parser = MarkdownParser(keywords)
+    parser.feed(text)
+    return parser.finish()
+
+
+# ============================================================
+# TREND KEYWORDS
+# ============================================================
+
+_keywords = {}  # path -> ((size, mtime_ns), keywords)
+
+
+def trend_keywords():
+    """Keywords from outputs/raw/google_trends.json (empty until trends are scraped)."""
+    path = output_path(TRENDS_PATH)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ()
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _keywords.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            keywords = tuple(data.get("keywords") or (t["keyword"] for t in data.get("trends", [])))
+        except (OSError, ValueError, KeyError, AttributeError):
+            keywords = ()
+        cached = _keywords[path] = (stamp, keywords)
+    return cached[1]
+
+
+# ============================================================
+# CACHED OUTLINES (content hash + keywords)
+# ============================================================
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def outline_cache():
+    """Append-only {outline key: outline} index under the output root."""
+    global _cache
+    path = output_path(CACHE_PATH)
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            if _cache is not None:
+                _cache.close()
+            _cache = JournalIndex(path)
+        return _cache
+
+
+def outline_key(text_digest, keywords):
+    return stage_key(OUTLINE_VERSION, sorted(keywords), text_digest)
+
+
+_collected = None  # {outline key: outline} parsed in a pool worker, not yet stored
+
+
+def collect_outlines():
+    """
+    Pool workers: keep reading the cache but hold new outlines back for
+    collected_outlines(), so only the parent process appends to the journal.
+    """
+    global _collected
+    _collected = {}
+
+
+def collected_outlines():
+    """Outlines parsed since the last call in a collecting worker (then cleared)."""
+    global _collected
+    if not _collected:
+        return {}
+    out, _collected = _collected, {}
+    return out
+
+
+def store_outlines(entries):
+    """Store outlines a worker sent back (from collected_outlines())."""
+    cache = outline_cache()
+    for key, result in entries.items():
+        cache.set(key, result)
+
+
+_recent = OrderedDict()  # outline key -> outline, most recent last
+_recent_lock = threading.Lock()
+
+
+def _recent_get(key):
+    with _recent_lock:
+        result = _recent.get(key)
+        if result is not None:
+            _recent.move_to_end(key)
+        return result
+
+
+def _recent_put(key, result):
+    with _recent_lock:
+        _recent[key] = result
+        _recent.move_to_end(key)
+        while len(_recent) > RECENT_OUTLINES:
+            _recent.popitem(last=False)
+
+
+def _store(key, result):
+    _recent_put(key, result)
+    if _collected is not None:
+        _collected[key] = result
+    else:
+        outline_cache().set(key, result)
+
+
+def _cached(digest, keywords, parse, persist=True):
+    key = outline_key(digest, keywords)
+    result = _recent_get(key)
+    if result is not None:
+        return result
+    if persist and build_cache.enabled:
+        result = outline_cache().get(key)
+    if result is None and _collected is not None:
+        result = _collected.get(key)
+    if result is None:
+        result = parse()
+        if persist:
+            _store(key, result)
+            return result
+    _recent_put(key, result)
+    return result
+
+
+def outline(text, keywords=None, persist=True):
+    """
+    Outline of text, parsed once per content hash. persist=False skips the
+    journal (memory only), for callers that must not write under the output root.
+    """
+    keywords = trend_keywords() if keywords is None else keywords
+    return _cached(hash_bytes(text.encode("utf-8")), keywords, lambda: parse_markdown(text, keywords), persist)
+
+
+def outline_file(path, keywords=None):
+    """Outline of a markdown file; an unchanged file is not even read."""
+    keywords = trend_keywords() if keywords is None else keywords
+
+    def parse():
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_markdown(f.read(), keywords)
+
+    return _cached(file_digest(path), keywords, parse)
+
+
+def remember(text, result, keywords):
+    """Cache an outline produced while streaming text (MarkdownParser.finish())."""
+    _store(outline_key(hash_bytes(text.encode("utf-8")), keywords), result)
@@ -0,0 +1,295 @@
+# pipeline/minhash.py
+"""
+Competitor Wording Index (MinHash + LSH)
+- Competitor paragraphs are shingled into overlapping SHINGLE_WORDS-word
+  windows and reduced to NUM_PERM-value MinHash signatures; the share of
+  equal signature positions estimates the Jaccard similarity of two
+  paragraphs' shingle sets
+- Signatures are cut into BANDS bands (LSH). A stored paragraph is a
+  candidate only if a whole band matches the query's, found by binary
+  search in sorted key tables, so queries never compare pairwise
+- Persisted under outputs/.store/minhash/: signatures in an append-only
+  binary file, paragraph metadata in a JournalIndex. add() appends a small
+  sorted run of band keys; runs are merged LSM-style (a run is merged into
+  the previous one once it is at least half its size), so adds stay cheap
+  and a query binary-searches O(log n) runs
+- overlaps(paragraphs) is what QC runs on every blog / web copy
+"""
+
+import os
+import re
+import zlib
+import threading
+import functools
+
+from .brand_rules import normalize
+from .build_cache import hash_bytes
+from .journal import JournalIndex
+from .paths import output_path
+
+# numpy is imported on first use only.
+
+INDEX_DIR = os.path.join(".store", "minhash")  # relative to the output root
+NUM_PERM = 128
+BANDS = 32                  # 32 bands × 4 rows: candidates from Jaccard ≈ 0.42 up
+SHINGLE_WORDS = int(os.getenv("MINHASH_SHINGLE_WORDS", "5"))
+MIN_WORDS = max(8, SHINGLE_WORDS)  # shorter paragraphs are neither indexed nor queried
+SIGNATURE_BATCH = 256       # paragraphs hashed per vectorized step
+SEED = 1
+
+COMPETITOR_OVERLAP = float(os.getenv("COMPETITOR_OVERLAP", "0.5"))  # estimated Jaccard
+
+_WORD = re.compile(r"\w+")
+_params = None
+
+
+def _parameters():
+    """(a, b, row mix, band salt) — fixed by SEED so signatures persist."""
+    global _params
+    if _params is None:
+        import numpy as np
+
+        rng = np.random.default_rng(SEED)
+        draw = lambda n: rng.integers(0, 2 ** 64, size=n, dtype=np.uint64, endpoint=False)
+        _params = (draw(NUM_PERM) | np.uint64(1), draw(NUM_PERM),
+                   draw(NUM_PERM // BANDS) | np.uint64(1), draw(BANDS))
+    return _params
+
+
+# ============================================================
+# SHINGLES / SIGNATURES
+# ============================================================
+
+def words(paragraph):
+    return _WORD.findall(normalize(paragraph)[0])
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _word_hash(word):
+    return zlib.crc32(word.encode("utf-8"))
+
+
+def shingles(tokens):
+    """Distinct 32-bit hashes of the SHINGLE_WORDS-word windows in tokens."""
+    import numpy as np
+
+    n = len(tokens) - SHINGLE_WORDS + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint32)
+    h = np.fromiter((_word_hash(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    acc = np.zeros(n, dtype=np.uint64)
+    mix = np.uint64(0x9E3779B97F4A7C15)
+    for j in range(SHINGLE_WORDS):
+        acc = acc * mix + h[j:j + n]
+    return np.unique((acc >> np.uint64(32)).astype(np.uint32))
+
+
+def signatures(shingle_sets):
+    """(n, NUM_PERM) uint32 MinHash signatures for non-empty shingle sets."""
+    import numpy as np
+
+    a, b, _, _ = _parameters()
+    out = np.empty((len(shingle_sets), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(shingle_sets), SIGNATURE_BATCH):
+        group = shingle_sets[start:start + SIGNATURE_BATCH]
+        flat = np.concatenate(group).astype(np.uint64)
+        offsets = np.cumsum([0] + [len(s) for s in group[:-1]])
+        # multiply-add-shift universal hashing: one permutation per row
+        hashed = (a[:, None] * flat[None, :] + b[:, None]) >> np.uint64(32)
+        out[start:start + len(group)] = np.minimum.reduceat(hashed, offsets, axis=1).T
+    return out
+
+
+def _band_keys(sigs):
+    """(n, BANDS) uint64: one hash per band, salted so bands never collide."""
+    import numpy as np
+
+    _, _, row_mix, band_salt = _parameters()
+    rows = sigs.reshape(len(sigs), BANDS, NUM_PERM // BANDS).astype(np.uint64)
+    return (rows * row_mix).sum(axis=2, dtype=np.uint64) + band_salt
+
+
+# ============================================================
+# PERSISTENT INDEX
+# ============================================================
+
+class CompetitorIndex:
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.RLock()
+        self._dir = None
+        self._journal = None
+        self._sigs = None       # (capacity, NUM_PERM) uint32; the first len(_row_ids) are live
+        self._runs = []         # [(sorted band keys, signature row of each key), ...]
+        self._row_ids = []      # row -> paragraph digest
+
+    def _directory(self):
+        # Parameters are part of the path: changing them starts a fresh index
+        root = self._path or output_path(INDEX_DIR)
+        return os.path.join(root, f"p{NUM_PERM}-b{BANDS}-w{SHINGLE_WORDS}")
+
+    def _sig_path(self, directory=None):
+        return os.path.join(directory or self._dir, "signatures.u32")
+
+    # ---------------- load
+
+    def _load(self):
+        import numpy as np
+
+        directory = self._directory()
+        if self._dir == directory:
+            return
+        if self._journal is not None:
+            self._journal.close()
+
+        self._dir = directory
+        self._journal = JournalIndex(os.path.join(directory, "paragraphs.jsonl"))
+        try:
+            raw = np.fromfile(self._sig_path(), dtype=np.uint32)
+        except OSError:
+            raw = np.empty(0, dtype=np.uint32)
+        rows = len(raw) // NUM_PERM  # a torn last row is dropped
+        self._sigs = raw[:rows * NUM_PERM].reshape(rows, NUM_PERM)
+        self._runs = []
+
+        # Signatures are written before metadata, so an orphan row stays None
+        self._row_ids = [None] * rows
+        for digest, entry in self._journal.items():
+            if entry["row"] < rows:
+                self._row_ids[entry["row"]] = digest
+
+        if rows:
+            self._runs.append(self._run(self._sigs, 0))
+
+    @staticmethod
+    def _run(sigs, first):
+        """Sorted (band keys, signature rows) for sigs stored from row `first`."""
+        import numpy as np
+
+        keys = _band_keys(sigs).ravel()
+        order = np.argsort(keys, kind="stable")
+        rows = np.repeat(np.arange(first, first + len(sigs), dtype=np.int64), BANDS)
+        return keys[order], rows[order]
+
+    def _push_run(self, run):
+        import numpy as np
+
+        self._runs.append(run)
+        while len(self._runs) > 1 and 2 * len(self._runs[-1][0]) >= len(self._runs[-2][0]):
+            (k1, r1), (k2, r2) = self._runs.pop(), self._runs.pop()
+            keys = np.concatenate([k2, k1])
+            order = np.argsort(keys, kind="stable")
+            self._runs.append((keys[order], np.concatenate([r2, r1])[order]))
+
+    def _append_sigs(self, sigs):
+        import numpy as np
+
+        n = len(self._row_ids)
+        if n + len(sigs) > len(self._sigs):
+            grown = np.empty((max(2 * len(self._sigs), n + len(sigs), 1024), NUM_PERM), dtype=np.uint32)
+            grown[:n] = self._sigs[:n]
+            self._sigs = grown
+        self._sigs[n:n + len(sigs)] = sigs
+
+    def _known(self, digest):
+        entry = self._journal.get(digest)
+        return entry is not None and entry["row"] < len(self._row_ids)
+
+    # ---------------- writes
+
+    def add(self, paragraphs, url=None, brand=None):
+        """Index competitor paragraphs; already-indexed text is skipped. Returns the number added."""
+        with self._lock:
+            self._load()
+            new, seen = [], set()
+            for paragraph in paragraphs:
+                tokens = words(paragraph)
+                if len(tokens) < MIN_WORDS:
+                    continue
+                digest = hash_bytes(" ".join(tokens).encode("utf-8"))
+                if digest in seen or self._known(digest):
+                    continue
+                seen.add(digest)
+                new.append((digest, paragraph, shingles(tokens)))
+            if not new:
+                return 0
+
+            sigs = signatures([s for _, _, s in new])
+            first = len(self._row_ids)
+
+            os.makedirs(self._dir, exist_ok=True)
+            with open(self._sig_path(), "ab") as f:
+                f.truncate(first * NUM_PERM * 4)  # drop a torn row from a crash
+                f.write(sigs.tobytes())
+            for i, (digest, paragraph, _) in enumerate(new):
+                self._journal.set(digest, {"row": first + i, "url": url, "brand": brand,
+                                           "excerpt": paragraph[:200]})
+            self._append_sigs(sigs)
+            self._row_ids.extend(d for d, _, _ in new)
+            self._push_run(self._run(sigs, first))
+            return len(new)
+
+    # ---------------- queries
+
+    def overlaps(self, paragraphs, threshold=COMPETITOR_OVERLAP):
+        """
+        [{"paragraph", "jaccard", "url", "brand", "excerpt"}, ...]: the best
+        indexed match at or above threshold (estimated Jaccard) for each
+        query paragraph, most similar first. `paragraph` indexes paragraphs.
+        """
+        import numpy as np
+
+        with self._lock:
+            self._load()
+            if not self._row_ids:
+                return []
+
+            queries = []
+            for i, paragraph in enumerate(paragraphs):
+                tokens = words(paragraph)
+                if len(tokens) >= MIN_WORDS:
+                    queries.append((i, shingles(tokens)))
+            if not queries:
+                return []
+
+            sigs = signatures([s for _, s in queries])
+            keys = _band_keys(sigs)
+            hits = [[] for _ in queries]
+            for run_keys, run_rows in self._runs:
+                lo = np.searchsorted(run_keys, keys, side="left")
+                hi = np.searchsorted(run_keys, keys, side="right")
+                for q in np.flatnonzero((hi > lo).any(axis=1)):
+                    hits[q].extend(run_rows[l:h] for l, h in zip(lo[q], hi[q]) if h > l)
+
+            found = []
+            for q, (i, _) in enumerate(queries):
+                if not hits[q]:
+                    continue
+                candidates = np.unique(np.concatenate(hits[q]))
+                estimates = (self._sigs[candidates] == sigs[q]).mean(axis=1)
+                best = int(np.argmax(estimates))
+                digest = self._row_ids[candidates[best]]
+                if estimates[best] < threshold or digest is None:
+                    continue
+                entry = self._journal.get(digest)
+                found.append({"paragraph": i, "jaccard": round(float(estimates[best]), 3),
+                              "url": entry["url"], "brand": entry["brand"],
+                              "excerpt": entry["excerpt"]})
+            return sorted(found, key=lambda m: -m["jaccard"])
+
+    def version(self):
+        """Changes whenever paragraphs are added (part of the QC cache key)."""
+        directory = self._directory()
+        try:
+            size = os.path.getsize(self._sig_path(directory))
+        except OSError:
+            size = 0
+        return f"{os.path.basename(directory)}:{size // (NUM_PERM * 4)}"
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._row_ids)
+
+
+competitor_index = CompetitorIndex()
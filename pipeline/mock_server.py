@@ -0,0 +1,288 @@
+# pipeline/mock_server.py
+"""
+Local Provider Stand-ins (stdlib only)
+- HuggingFace router:   POST /hf/...               → {"generated_image": b64} or raw image
+- Automatic1111:        POST /sdapi/v1/txt2img     → {"images": [b64, ...]}
+- Stock image host:     GET  /stock/<name>         → image/jpeg
+Fault injection: latency + jitter, 5xx errors, HF 503 "model loading",
+429 rate limits and oversized payloads. txt2img can simulate a single GPU
+(fixed per-call overhead + per-image cost, one job at a time).
+
+    python -m pipeline.mock_server --port 8765 --latency-ms 300 --loading-rate 0.1
+"""
+
+import json
+import time
+import base64
+import random
+import argparse
+import functools
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PLACEHOLDER_IMAGE = "assets/placeholder.jpg"
+
+
+class MockOptions:
+    def __init__(
+        self,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        error_rate=0.0,
+        loading_rate=0.0,
+        loading_estimate=2.0,
+        rate_limit_rate=0.0,
+        payload_bytes=0,
+        hf_format="json",
+        per_image_ms=0.0,
+        sd_overhead_ms=0.0,
+        seed=None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.loading_rate = loading_rate
+        self.loading_estimate = loading_estimate
+        self.rate_limit_rate = rate_limit_rate
+        self.payload_bytes = payload_bytes
+        self.hf_format = hf_format
+        self.per_image_ms = per_image_ms
+        self.sd_overhead_ms = sd_overhead_ms
+        self.gpu = threading.Lock()  # A1111 runs one txt2img job at a time
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random()
+
+    def delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        secs = max(0.0, self.latency_ms + jitter) / 1000.0
+        if secs:
+            time.sleep(secs)
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+
+def _load_image():
+    try:
+        with open(PLACEHOLDER_IMAGE, "rb") as f:
+            return f.read()
+    except OSError:
+        # Smallest valid-looking JPEG header + filler
+        return b"\xff\xd8\xff\xe0" + b"\x00" * 1020 + b"\xff\xd9"
+
+
+@functools.lru_cache(maxsize=4)
+def make_image(size):
+    """Placeholder JPEG padded to `size` bytes (decoders ignore trailing data)."""
+    img = _load_image()
+    if size and size > len(img):
+        img += b"\x00" * (size - len(img))
+    return img
+
+
+@functools.lru_cache(maxsize=4)
+def make_image_b64(size):
+    return base64.b64encode(make_image(size)).decode()
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128  # benchmarks open many connections at once
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CalycoMock/1.0"
+
+    def log_message(self, fmt, *args):  # keep benchmark output clean
+        pass
+
+    @property
+    def opts(self):
+        return self.server.opts
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout / hedged loser) — expected
+
+    def _faults(self, provider):
+        """Apply latency and maybe answer with an injected failure."""
+        opts = self.opts
+        opts.delay()
+
+        r = opts.roll()
+        if r < opts.error_rate:
+            opts.count(f"{provider}.error")
+            self._send(500, {"error": "injected failure"})
+            return True
+        r -= opts.error_rate
+
+        if r < opts.rate_limit_rate:
+            opts.count(f"{provider}.429")
+            self._send(429, {"error": "rate limited"}, headers={"Retry-After": "1"})
+            return True
+        r -= opts.rate_limit_rate
+
+        if provider == "hf" and r < opts.loading_rate:
+            opts.count("hf.503")
+            self._send(503, {
+                "error": "Model stabilityai/stable-diffusion-xl-base-1.0 is currently loading",
+                "estimated_time": opts.loading_estimate,
+            })
+            return True
+
+        opts.count(f"{provider}.ok")
+        return False
+
+    def do_POST(self):
+        payload = self._read_json()
+
+        if self.path.startswith("/hf"):
+            if self._faults("hf"):
+                return
+            img = make_image(self.opts.payload_bytes)
+            if self.opts.hf_format == "raw":
+                self._send(200, img, content_type="image/png")
+            else:
+                self._send(200, {"generated_image": make_image_b64(self.opts.payload_bytes)})
+            return
+
+        if self.path.startswith("/sdapi/v1/txt2img"):
+            if self._faults("sd"):
+                return
+            n = max(1, int(payload.get("batch_size") or 1)) * max(1, int(payload.get("n_iter") or 1))
+            if payload.get("script_name") == "prompts from file or textbox":
+                prompts = [p for p in str((payload.get("script_args") or [""])[-1]).splitlines() if p.strip()]
+                n *= max(1, len(prompts))
+            self.opts.count("sd.images", n)
+            gpu_ms = self.opts.sd_overhead_ms + n * self.opts.per_image_ms
+            if gpu_ms:
+                with self.opts.gpu:  # simulated GPU time, one job at a time
+                    time.sleep(gpu_ms / 1000.0)
+            b64 = make_image_b64(self.opts.payload_bytes)
+            self._send(200, {"images": [b64] * n, "parameters": payload, "info": "{}"})
+            return
+
+        self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        if self.path.startswith("/stock/"):
+            if self._faults("stock"):
+                return
+            self._send(200, make_image(self.opts.payload_bytes), content_type="image/jpeg")
+            return
+
+        if self.path == "/stats":
+            with self.opts.lock:
+                self._send(200, dict(self.opts.counts))
+            return
+
+        self._send(404, {"error": "not found"})
+
+
+def start_mock_server(host="127.0.0.1", port=0, **options):
+    """
+    Start the mock in a daemon thread. Returns (server, urls) where urls
+    holds ready-to-use hf_url / local_sd_url / stock_images values for
+    ai_generator.configure_providers() or the matching env vars.
+    """
+    server = _Server((host, port), _Handler)
+    server.daemon_threads = True
+    server.opts = MockOptions(**options)
+
+    thread = threading.Thread(target=server.serve_forever, name="mock-server", daemon=True)
+    thread.start()
+
+    base = f"http://{host}:{server.server_address[1]}"
+    urls = {
+        "base": base,
+        "hf_url": f"{base}/hf/models/stabilityai/stable-diffusion-xl-base-1.0",
+        "local_sd_url": f"{base}/sdapi/v1/txt2img",
+        "stock_images": {
+            "interior": [f"{base}/stock/interior-{i}.jpg" for i in range(3)],
+            "colors": [f"{base}/stock/colors-{i}.jpg" for i in range(2)],
+        },
+    }
+    return server, urls
+
+
+def provider_env(urls, stock_path):
+    """Env vars that point a child pipeline process at the mock."""
+    with open(stock_path, "w") as f:
+        json.dump(urls["stock_images"], f)
+    return {
+        "HF_API_URL": urls["hf_url"],
+        "LOCAL_SD_URL": urls["local_sd_url"],
+        "STOCK_IMAGES_PATH": stock_path,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-ins for HF, A1111 and stock hosts.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--loading-rate", type=float, default=0.0,
+                        help="Fraction of HF calls answered with 503 'model loading'")
+    parser.add_argument("--loading-estimate", type=float, default=2.0,
+                        help="estimated_time (s) reported in 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of calls answered with 429")
+    parser.add_argument("--payload-bytes", type=int, default=0,
+                        help="Pad images to this size to simulate large outputs")
+    parser.add_argument("--hf-format", choices=("json", "raw"), default="json")
+    parser.add_argument("--per-image-ms", type=float, default=0.0,
+                        help="Extra txt2img latency per generated image (simulated GPU time)")
+    parser.add_argument("--sd-overhead-ms", type=float, default=0.0,
+                        help="Fixed txt2img cost per call (model/sampler setup)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server, urls = start_mock_server(
+        args.host, args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, loading_rate=args.loading_rate,
+        loading_estimate=args.loading_estimate, rate_limit_rate=args.rate_limit_rate,
+        payload_bytes=args.payload_bytes, hf_format=args.hf_format,
+        per_image_ms=args.per_image_ms, sd_overhead_ms=args.sd_overhead_ms, seed=args.seed,
+    )
+
+    print(f"🧪 Mock providers listening on {urls['base']}")
+    print(f"   HF_API_URL={urls['hf_url']}")
+    print(f"   LOCAL_SD_URL={urls['local_sd_url']}")
+    print(f"   stock: {urls['base']}/stock/<name>.jpg")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
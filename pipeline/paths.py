@@ -0,0 +1,39 @@
+# pipeline/paths.py
+"""
+Output Locations
+- Single configurable output root (CALYCO_OUTPUT_ROOT, default "outputs")
+- Directories are created on first write, never at import time
+"""
+
+import os
+
+_output_root = os.getenv("CALYCO_OUTPUT_ROOT", "outputs")
+
+
+def output_root():
+    return _output_root
+
+
+def set_output_root(path):
+    """Redirect every artifact the pipeline writes (call before running)."""
+    global _output_root
+    _output_root = str(path)
+
+
+def output_path(*parts):
+    """Path under the output root. Does not touch the filesystem."""
+    return os.path.join(_output_root, *parts)
+
+
+def output_dir(*parts):
+    """Directory under the output root, created if missing."""
+    path = output_path(*parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def output_file(*parts):
+    """File path under the output root with its parent directory created."""
+    path = output_path(*parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
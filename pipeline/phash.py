@@ -0,0 +1,269 @@
+# pipeline/phash.py
+"""
+Perceptual Hash Index
+- 64-bit aHash / dHash / pHash per image (Pillow + NumPy)
+- Every image generate_image ships is recorded by slug in an append-only
+  index (outputs/.store/phash.jsonl), so duplicates are caught across runs
+- Lookups go through a multi-index hash table on pHash: Hamming-radius
+  queries probe a few buckets instead of scanning the whole index
+- find_similar() / claim() report other slugs whose image is within
+  PHASH_THRESHOLD bits (pHash and dHash both) among the PHASH_RECENT most
+  recently recorded images
+"""
+
+import os
+import itertools
+import threading
+
+from .build_cache import file_digest
+from .journal import JournalIndex
+from .paths import output_path
+
+# numpy and Pillow are imported inside image_hashes() only.
+
+INDEX_PATH = os.path.join(".store", "phash.jsonl")  # relative to the output root
+HASH_SIZE = 8           # 8×8 bits = 64-bit hashes
+PHASH_HIGHFREQ = 4      # pHash DCT runs on a 32×32 downscale
+
+PHASH_THRESHOLD = int(os.getenv("PHASH_THRESHOLD", "6"))   # bits out of 64
+PHASH_RECENT = int(os.getenv("PHASH_RECENT", "1000"))      # 0 = compare against all
+
+
+# ============================================================
+# HASHES
+# ============================================================
+
+def _bits_to_int(bits):
+    import numpy as np
+
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+_dct_matrix = {}
+
+
+def _dct(n):
+    """Orthonormal DCT-II matrix (n×n), so dct2(x) = D @ x @ D.T."""
+    import numpy as np
+
+    if n not in _dct_matrix:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        d = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        d[0] /= np.sqrt(2.0)
+        _dct_matrix[n] = d
+    return _dct_matrix[n]
+
+
+def image_hashes(path):
+    """{"a", "d", "p"}: 64-bit average / difference / DCT hashes of an image."""
+    import numpy as np
+    from PIL import Image
+
+    n = HASH_SIZE
+    with Image.open(path) as im:
+        im.draft("L", (n * PHASH_HIGHFREQ, n * PHASH_HIGHFREQ))  # JPEG: decode downscaled
+        gray = im.convert("L")
+
+        small = np.asarray(gray.resize((n, n), Image.LANCZOS), dtype=np.float64)
+        wide = np.asarray(gray.resize((n + 1, n), Image.LANCZOS), dtype=np.float64)
+        big = np.asarray(gray.resize((n * PHASH_HIGHFREQ, n * PHASH_HIGHFREQ), Image.LANCZOS),
+                         dtype=np.float64)
+
+    d = _dct(n * PHASH_HIGHFREQ)
+    low = (d @ big @ d.T)[:n, :n]
+
+    return {
+        "a": _bits_to_int(small > small.mean()),
+        "d": _bits_to_int(wide[:, 1:] > wide[:, :-1]),
+        "p": _bits_to_int(low > np.median(low)),
+    }
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# ============================================================
+# MULTI-INDEX HASH TABLE
+# ============================================================
+
+class MultiIndexHash:
+    """
+    Hamming-radius search over 64-bit hashes (Norouzi et al.'s multi-index
+    hashing). Each hash is split into `chunks` substrings, each with its
+    own exact-match table. If two hashes are within r bits, at least one
+    substring differs in at most r // chunks bits (pigeonhole), so a query
+    only probes those few neighbouring buckets per table and verifies the
+    candidates, instead of comparing against every stored hash.
+    """
+
+    def __init__(self, bits=64, chunks=4):
+        self.chunks = chunks
+        self.width = bits // chunks
+        self._mask = (1 << self.width) - 1
+        self._tables = [{} for _ in range(chunks)]
+        self._flips = {}
+        self.size = 0
+
+    def _parts(self, value):
+        return [(value >> (i * self.width)) & self._mask for i in range(self.chunks)]
+
+    def _neighbour_masks(self, radius):
+        """XOR masks for every substring within `radius` bits (0 included)."""
+        masks = self._flips.get(radius)
+        if masks is None:
+            masks = [0]
+            for k in range(1, radius + 1):
+                for combo in itertools.combinations(range(self.width), k):
+                    masks.append(sum(1 << b for b in combo))
+            self._flips[radius] = masks
+        return masks
+
+    def add(self, value, item):
+        self.size += 1
+        for table, part in zip(self._tables, self._parts(value)):
+            table.setdefault(part, []).append((value, item))
+
+    def search(self, value, radius):
+        """[(distance, item), ...] for every item within radius of value."""
+        found, seen = [], set()
+        masks = self._neighbour_masks(radius // self.chunks)
+        for table, part in zip(self._tables, self._parts(value)):
+            for mask in masks:
+                for candidate in table.get(part ^ mask, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    dist = hamming(value, candidate[0])
+                    if dist <= radius:
+                        found.append((dist, candidate[1]))
+        return found
+
+
+# ============================================================
+# PERSISTENT INDEX
+# ============================================================
+
+def _pack(hashes):
+    return {k: f"{v:016x}" for k, v in hashes.items()}
+
+
+def _unpack(entry):
+    return {k: int(entry[k], 16) for k in ("a", "d", "p")}
+
+
+class PerceptualIndex:
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_path = None
+        self._table = None
+        self._seq = 0
+        self._by_digest = {}  # file digest -> hashes, so identical blobs hash once
+
+    # ---------------- load
+
+    def _load(self):
+        path = self._path or output_path(INDEX_PATH)
+        if self._journal is not None and self._journal_path == path:
+            return
+        if self._journal is not None:
+            self._journal.close()
+
+        self._journal, self._journal_path = JournalIndex(path), path
+        self._table, self._seq, self._by_digest = MultiIndexHash(), 0, {}
+        for slug, entry in self._journal.items():
+            hashes = _unpack(entry)
+            self._table.add(hashes["p"], (slug, entry["seq"]))
+            self._seq = max(self._seq, entry["seq"])
+            if entry.get("sha"):
+                self._by_digest[entry["sha"]] = hashes
+
+    def _rebuild(self):
+        """Drop superseded table items once they outnumber live ones."""
+        self._table = MultiIndexHash()
+        for slug, entry in self._journal.items():
+            self._table.add(int(entry["p"], 16), (slug, entry["seq"]))
+
+    # ---------------- hashing
+
+    def hashes(self, path):
+        digest = file_digest(path)
+        with self._lock:
+            self._load()
+            cached = self._by_digest.get(digest)
+        if cached is None:
+            cached = image_hashes(path)
+            with self._lock:
+                self._by_digest[digest] = cached
+        return digest, cached
+
+    # ---------------- queries
+
+    def find_similar(self, hashes, threshold=PHASH_THRESHOLD, exclude=None, recent=PHASH_RECENT):
+        """[(distance, slug), ...] nearest first, pHash and dHash both within threshold."""
+        with self._lock:
+            self._load()
+            oldest = self._seq - recent if recent else 0
+            matches = []
+            for dist, (slug, seq) in self._table.search(hashes["p"], threshold):
+                entry = self._journal.get(slug)
+                if slug == exclude or entry is None or entry["seq"] != seq or seq <= oldest:
+                    continue  # self, superseded, or outside the recent window
+                if hamming(hashes["d"], int(entry["d"], 16)) <= threshold:
+                    matches.append((dist, slug))
+            return sorted(matches)
+
+    def get(self, slug):
+        with self._lock:
+            self._load()
+            return self._journal.get(slug)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._journal)
+
+    # ---------------- writes
+
+    def add(self, slug, hashes, digest=None, provider=None):
+        with self._lock:
+            self._load()
+            old = self._journal.get(slug)
+            if old and old.get("sha") == digest and digest:
+                return  # same image re-recorded (e.g. an unchanged re-run)
+
+            self._seq += 1
+            entry = dict(_pack(hashes), sha=digest, seq=self._seq, provider=provider)
+            self._journal.set(slug, entry)
+            self._table.add(hashes["p"], (slug, self._seq))
+            if self._table.size > 2 * len(self._journal) + 64:
+                self._rebuild()
+
+    def claim(self, slug, hashes, digest=None, provider=None, force=False, **kw):
+        """
+        Record slug's image unless it is a near-duplicate of another recent
+        one; check and insert are atomic, so concurrent slugs can't both
+        claim the same picture. Returns the matches (recorded anyway if force).
+        """
+        with self._lock:
+            matches = self.find_similar(hashes, exclude=slug, **kw)
+            if force or not matches:
+                self.add(slug, hashes, digest, provider)
+            return matches
+
+    def duplicates(self, threshold=PHASH_THRESHOLD):
+        """{slug: [(distance, other slug), ...]} for every indexed near-duplicate."""
+        with self._lock:
+            self._load()
+            report = {}
+            for slug, entry in self._journal.items():
+                matches = self.find_similar(_unpack(entry), threshold, exclude=slug, recent=0)
+                if matches:
+                    report[slug] = matches
+            return report
+
+
+phash_index = PerceptualIndex()
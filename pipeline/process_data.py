@@ -1,13 +1,15 @@
 import json
 
+from pipeline.paths import output_path
+
 def load_raw_data():
-    with open("outputs/raw/google_trends.json") as f1:
+    with open(output_path("raw", "google_trends.json")) as f1:
         trends = json.load(f1)
 
-    with open("outputs/raw/news.json") as f2:
+    with open(output_path("raw", "news.json")) as f2:
         news = json.load(f2)
 
-    with open("outputs/raw/competitor_pages.json") as f3:
+    with open(output_path("raw", "competitor_pages.json")) as f3:
         competitors = json.load(f3)
 
     return {
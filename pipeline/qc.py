@@ -1,73 +1,250 @@
 # pipeline/qc.py
 """
 Quality Control Module
-- Readability scoring (textstat)
-- SEO structure checks
-- Brand safety rules for Calyco
+- Readability scoring (Flesch Reading Ease, textstat-compatible)
+- SEO structure checks (markdown outline: real headings only, trend
+  keyword density)
+- Every check reads one shared TextAnalysis (text_analysis.analyze), so
+  the text is tokenized once per document
+- Brand safety rules for Calyco (compiled from docs/brand_rules.md)
+- Competitor wording: paragraphs near-duplicating scraped competitor copy
+  (MinHash/LSH index, minhash.py)
+- IncrementalQC: the same brand scan plus word/heading counts over a
+  stream of chunks, for aborting a draft while it is still generating
+- run_quality_checks(text) keeps recent results in memory only and never
+  writes under the output root; qc_runner.py runs the checks over every
+  artifact on a process pool and persists results by content hash +
+  ruleset version (outputs/.cache/qc.jsonl)
 """
 
+import os
 import re
-import textstat
+import threading
+from collections import OrderedDict
 
+from .brand_rules import load_rules, normalize
+from .build_cache import build_cache, stage_key, hash_bytes
+from .journal import JournalIndex
+from .markdown_outline import MarkdownParser, trend_keywords
+from .minhash import competitor_index
+from .paths import output_path
+from .text_analysis import TextAnalysis, analyze
+from .tracing import span
 
-def check_readability(text: str) -> float:
+# Bump when any check below changes — part of the QC cache key.
+QC_VERSION = "5"
+
+CACHE_PATH = os.path.join(".cache", "qc.jsonl")  # relative to the output root
+RECENT_RESULTS = 256  # run_quality_checks() results kept in memory
+
+# The docs/brand_rules.md rule the competitor index enforces
+DUPLICATE_COMPETITOR_RULE = "Duplicate competitor wording"
+
+
+def _analysis(text):
+    return text if isinstance(text, TextAnalysis) else analyze(text)
+
+
+def check_readability(text) -> float:
     """Return a readability score (Flesch Reading Ease 0–100)."""
-    try:
-        return textstat.flesch_reading_ease(text)
-    except:
-        return 60.0  # fallback default
+    return _analysis(text).flesch_reading_ease()
+
+
+class BrandViolation(ValueError):
+    """Raised when generated content contains a banned phrase."""
 
+    def __init__(self, slug, violations):
+        super().__init__(f"{slug}: banned phrase(s) {', '.join(violations)}")
+        self.slug = slug
+        self.violations = violations
 
-def enforce_brand_rules(text: str):
+
+def enforce_brand_rules(text):
     """
-    Detect banned words such as:
-    - AI-generated
+    Prohibited phrases from docs/brand_rules.md found in text, such as:
+    - AI generated
     - ChatGPT
     - LLM
+    One pass of the compiled matcher over the analysis' folded text; see
+    brand_rules.load_rules().scan() for offsets.
     """
-    violations = []
-    banned_words = [
-        "ai-generated",
-        "ai generated",
-        "chatgpt",
-        "llm",
-        "machine-generated",
-        "artificial intelligence generated"
-    ]
-
-    for w in banned_words:
-        if w.lower() in text.lower():
-            violations.append(w)
+    return load_rules().violations_folded(_analysis(text).folded)
 
-    return violations
 
+class IncrementalQC:
+    """
+    Brand scan, word count and markdown outline fed one chunk at a time.
+    Phrases split across chunk boundaries are still found: a tail of the
+    normalized text is carried over, and a match touching the end of the
+    window waits for the next chunk (or finish()) so its right word
+    boundary is known.
+    """
 
-def check_seo_structure(text: str):
+    def __init__(self, rules=None):
+        self.rules = rules or load_rules()
+        self._keep = 2 * self.rules.max_len + 1
+        self._tail = ""
+        self._in_word = False
+        self.keywords = trend_keywords()
+        self.markdown = MarkdownParser(self.keywords)
+        self.outline = None
+        self.violations = []
+        self.chars = 0
+        self.words = 0
+
+    def feed(self, chunk):
+        """Scan the next chunk; returns any violations first seen in it."""
+        if not chunk:
+            return []
+        self.chars += len(chunk)
+
+        words = len(chunk.split())
+        if self._in_word and not chunk[0].isspace():
+            words -= 1  # continues the previous chunk's last word
+        self.words += words
+        self._in_word = not chunk[-1].isspace()
+
+        self.markdown.feed(chunk)
+
+        window = self._tail + normalize(chunk)[0]
+        new = self._scan(window, final=False)
+        self._tail = window[-self._keep:]
+        return new
+
+    @property
+    def headings(self):
+        return len(self.markdown.headings)
+
+    def finish(self):
+        """
+        Scan what is left at the end of the stream; returns new violations.
+        The completed markdown outline is then in self.outline.
+        """
+        new = self._scan(self._tail, final=True)
+        self._tail = ""
+        self.outline = self.markdown.finish()
+        return new
+
+    def _scan(self, window, final):
+        carried = len(self._tail) == self._keep  # window starts mid-text
+        new = []
+        for m in self.rules.pattern.finditer(window):
+            if carried and m.start() == 0:
+                continue  # left boundary unknown; seen in the previous window
+            if m.end() == len(window) and not final:
+                continue  # right boundary unknown until the next chunk
+            rule = self.rules.rule_for(m.group())
+            if rule not in self.violations and rule not in new:
+                new.append(rule)
+        self.violations.extend(new)
+        return new
+
+
+def check_seo_structure(text):
     """
     Basic SEO checks:
     - At least 2 headings
     - Minimum word count
     """
+    analysis = _analysis(text)
     issues = []
 
-    if text.count("#") < 2:
+    if len(analysis.headings) < 2:
         issues.append("Content missing headings (H2/H3).")
 
-    if len(text.split()) < 300:
+    if analysis.words < 300:
         issues.append("Content too short (<300 words).")
 
     return issues
 
 
-def run_quality_checks(text: str):
-    """Return a dictionary of all QC checks."""
+def check_text(text: str, persist=False):
+    """
+    All QC checks for text, uncached (what pool workers run). persist=True
+    lets the markdown outline go to the journal (corpus runs only).
+    """
+    with span("qc.analyze", cat="qc"):
+        analysis = TextAnalysis(text, persist=persist)
+    with span("qc.readability", cat="qc"):
+        readability = check_readability(analysis)
+    with span("qc.brand_rules", cat="qc"):
+        violations = enforce_brand_rules(analysis)
+    with span("qc.seo_structure", cat="qc"):
+        seo_issues = check_seo_structure(analysis)
+    with span("qc.competitor_overlap", cat="qc"):
+        overlaps = competitor_index.overlaps(analysis.paragraphs)
+    if overlaps:
+        violations.append(DUPLICATE_COMPETITOR_RULE)
+
     return {
-        "readability_score": check_readability(text),
-        "brand_violations": enforce_brand_rules(text),
-        "seo_issues": check_seo_structure(text)
+        "readability_score": readability,
+        "brand_violations": violations,
+        "seo_issues": seo_issues,
+        "competitor_overlaps": overlaps,
+        "keywords": analysis.outline["keywords"],
     }
 
 
+# ============================================================
+# RESULT CACHE (content hash + ruleset version)
+# ============================================================
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def result_cache():
+    """Append-only {qc_key: result} index under the output root."""
+    global _cache
+    path = output_path(CACHE_PATH)
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            if _cache is not None:
+                _cache.close()
+            _cache = JournalIndex(path)
+        return _cache
+
+
+def ruleset_digest():
+    """Everything a result depends on besides the text: brand rules, competitor index, trend keywords."""
+    return stage_key(load_rules().digest, competitor_index.version(), sorted(trend_keywords()))
+
+
+def qc_key(text_digest, rules_digest=None):
+    return stage_key(QC_VERSION, rules_digest or ruleset_digest(), text_digest)
+
+
+_recent = OrderedDict()  # qc_key -> result, most recent last
+_recent_lock = threading.Lock()
+
+
+def run_quality_checks(text: str):
+    """
+    Return a dictionary of all QC checks. Recent results are cached in
+    memory by content hash; nothing is written to disk (run_corpus_qc does).
+    """
+    with span("qc", cat="qc", chars=len(text)) as s:
+        key = qc_key(hash_bytes(text.encode("utf-8")))
+
+        with _recent_lock:
+            cached = _recent.get(key) if build_cache.enabled else None
+            if cached:
+                _recent.move_to_end(key)
+        if cached:
+            s.set(outcome="cached")
+            return cached
+
+        result = check_text(text)
+        if result["brand_violations"] or result["seo_issues"]:
+            s.set(outcome="issues")
+
+        with _recent_lock:
+            _recent[key] = result
+            while len(_recent) > RECENT_RESULTS:
+                _recent.popitem(last=False)
+        return result
+
+
 if __name__ == "__main__":
     sample = "This is a demo content piece for QC testing."
     print(run_quality_checks(sample))
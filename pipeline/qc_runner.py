@@ -0,0 +1,255 @@
+# pipeline/qc_runner.py
+"""
+Corpus QC Runner
+- Scans every generated artifact: web copy, blogs, social posts, ads
+- Unchanged files (same size + mtime) are answered from the QC result cache
+  without being read; everything else is checked on a process pool, in
+  chunks, by workers that read the files themselves. Workers inherit the
+  output root; the outlines they parse are sent back and stored by the
+  parent, the only process writing the markdown cache
+- Results are cached by content hash + ruleset version (qc.result_cache);
+  the ruleset covers the brand rules and the competitor index
+- Reports: outputs/qc/<kind>/<slug>.json per artifact, outputs/qc/<kind>_qc.json
+  per kind and outputs/qc/summary.json overall
+"""
+
+import os
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from .build_cache import build_cache, hash_bytes
+from .journal import JournalIndex
+from . import events
+from .markdown_outline import collect_outlines, collected_outlines, store_outlines
+from .paths import output_path, output_file, output_root, set_output_root
+from .qc import QC_VERSION, check_text, qc_key, result_cache, ruleset_digest
+from .tracing import span
+
+REPORT_DIR = "qc"  # relative to the output root
+STAT_INDEX_PATH = os.path.join(".cache", "qc_files.jsonl")
+
+QC_WORKERS = int(os.getenv("QC_WORKERS", str(os.cpu_count() or 2)))
+QC_CHUNK = int(os.getenv("QC_CHUNK", "64"))      # documents per pool task
+INLINE_BELOW = 2 * QC_CHUNK                       # smaller runs skip the pool
+
+# kind -> (folder under the output root, file extension)
+SOURCES = {
+    "web_copy": ("web_copy", ".json"),
+    "blog": ("blogs", ".md"),
+    "social": ("social", ".json"),
+    "ads": ("ads", ".json"),
+}
+
+
+# ============================================================
+# DOCUMENTS
+# ============================================================
+
+def document_text(kind, path):
+    """The text QC should see for one artifact file."""
+    with open(path, "r", encoding="utf-8") as f:
+        if kind == "blog":
+            return f.read()
+        data = json.load(f)
+
+    if kind == "web_copy":
+        return data.get("body", "")
+    key = "posts" if kind == "social" else "ads"
+    items = data.get(key, []) if isinstance(data, dict) else data
+    return "\n".join(str(i) for i in items)
+
+
+def collect_documents():
+    """[(doc id, kind, path, stat), ...] for every artifact on disk."""
+    docs = []
+    for kind, (folder, ext) in SOURCES.items():
+        try:
+            entries = os.scandir(output_path(folder))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(ext):
+                    st = entry.stat()
+                    slug = entry.name[:-len(ext)]
+                    docs.append((f"{kind}/{slug}", kind, entry.path, (st.st_size, st.st_mtime_ns)))
+    return sorted(docs)
+
+
+# ============================================================
+# WORKER (runs in a separate process)
+# ============================================================
+
+def _check_chunk(chunk):
+    """
+    [(doc id, text digest, result or error), ...] for one chunk of documents.
+    The result is None when the text still hashes to `cached` (a rewritten
+    but unchanged file whose result the caller already has).
+    """
+    out = []
+    for doc_id, kind, path, cached in chunk:
+        try:
+            text = document_text(kind, path)
+            digest = hash_bytes(text.encode("utf-8"))
+            out.append((doc_id, digest, None if digest == cached else check_text(text, persist=True)))
+        except (OSError, ValueError) as e:
+            out.append((doc_id, None, {"error": f"{type(e).__name__}: {e}"}))
+    return out
+
+
+def _init_worker(root, cache_enabled):
+    """
+    Spawned workers start from the environment defaults: point them at the
+    parent's output root and cache setting, and keep their markdown outlines
+    for the parent to store (one writer per journal).
+    """
+    set_output_root(root)
+    build_cache.enabled = cache_enabled
+    collect_outlines()
+
+
+def _check_chunk_in_worker(chunk):
+    return _check_chunk(chunk), collected_outlines()
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def _chunks(items, n):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def _check_all(todo, workers):
+    """Yield _check_chunk results for todo, on a spawn pool when it pays off."""
+    tasks = list(_chunks(todo, QC_CHUNK))
+    if workers <= 1 or len(todo) < INLINE_BELOW:
+        for task in tasks:
+            yield _check_chunk(task)
+        return
+
+    # spawn, not fork: the pipeline runs this from worker threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(output_root(), build_cache.enabled)) as pool:
+        for fut in as_completed([pool.submit(_check_chunk_in_worker, t) for t in tasks]):
+            results, outlines = fut.result()
+            store_outlines(outlines)
+            yield results
+
+
+def _write_json(path, data):
+    path = output_file(path)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _summarize(kind, results):
+    brand, seo = {}, {}
+    scores = [r["readability_score"] for r in results.values() if "readability_score" in r]
+    for r in results.values():
+        for rule in r.get("brand_violations", []):
+            brand[rule] = brand.get(rule, 0) + 1
+        for issue in r.get("seo_issues", []):
+            seo[issue] = seo.get(issue, 0) + 1
+    return {
+        "kind": kind,
+        "documents": len(results),
+        "clean": sum(1 for r in results.values()
+                     if not r.get("brand_violations") and not r.get("seo_issues") and "error" not in r),
+        "errors": sorted(d for d, r in results.items() if "error" in r),
+        "brand_violations": brand,
+        "brand_violation_documents": sorted(d for d, r in results.items() if r.get("brand_violations")),
+        "seo_issues": seo,
+        "competitor_overlap_documents": sorted(d for d, r in results.items() if r.get("competitor_overlaps")),
+        "readability": {
+            "mean": round(sum(scores) / len(scores), 2) if scores else None,
+            "min": min(scores) if scores else None,
+            "max": max(scores) if scores else None,
+        },
+    }
+
+
+def run_corpus_qc(workers=None):
+    """
+    QC every artifact under the output root and write the reports.
+    Returns the overall summary (also written to outputs/qc/summary.json).
+    """
+    workers = QC_WORKERS if workers is None else workers
+    start = time.perf_counter()
+
+    with span("qc.corpus", cat="qc") as s:
+        rules_digest = ruleset_digest()
+        cache = result_cache()
+        stats = JournalIndex(output_path(STAT_INDEX_PATH))  # doc id -> {stat, digest}
+
+        docs = collect_documents()
+        results, digests, fresh, todo = {}, {}, set(), []
+
+        stat_of = {}
+        for doc_id, kind, path, stat in docs:
+            known = stats.get(doc_id) if build_cache.enabled else None
+            cached = known and cache.get(qc_key(known["digest"], rules_digest))
+            if cached is not None and tuple(known["stat"]) == stat:
+                results[doc_id], digests[doc_id] = cached, known["digest"]
+                continue
+            # Re-read; if the text turns out unchanged the cached result is reused
+            stat_of[doc_id] = stat
+            todo.append((doc_id, kind, path, known["digest"] if cached else None))
+
+        for chunk in _check_all(todo, workers):
+            for doc_id, digest, result in chunk:
+                if result is None:
+                    result = cache.get(qc_key(digest, rules_digest))
+                else:
+                    fresh.add(doc_id)
+                    if result.get("brand_violations") or "error" in result:
+                        events.publish("qc", document=doc_id, error=result.get("error"),
+                                       violations=result.get("brand_violations", []))
+                results[doc_id], digests[doc_id] = result, digest
+                if digest:
+                    cache.set(qc_key(digest, rules_digest), result)
+                    stats.set(doc_id, {"stat": list(stat_of[doc_id]), "digest": digest})
+
+        # Per-artifact reports: rewritten only when re-checked or missing
+        for doc_id, result in results.items():
+            report = os.path.join(REPORT_DIR, f"{doc_id}.json")
+            if doc_id in fresh or not os.path.exists(output_path(report)):
+                _write_json(report, {
+                    "document": doc_id,
+                    "digest": digests[doc_id],
+                    "qc_version": QC_VERSION,
+                    "rules": rules_digest,
+                    "result": result,
+                })
+
+        by_kind = {kind: {} for kind in SOURCES}
+        for doc_id, result in results.items():
+            by_kind[doc_id.split("/", 1)[0]][doc_id] = result
+
+        kinds = {}
+        for kind, kind_results in by_kind.items():
+            kinds[kind] = _summarize(kind, kind_results)
+            _write_json(os.path.join(REPORT_DIR, f"{kind}_qc.json"), kinds[kind])
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "generated": datetime.utcnow().isoformat(),
+            "qc_version": QC_VERSION,
+            "rules": rules_digest,
+            "documents": len(results),
+            "checked": len(fresh),
+            "cached": len(results) - len(fresh),
+            "elapsed": round(elapsed, 3),
+            "kinds": kinds,
+        }
+        _write_json(os.path.join(REPORT_DIR, "summary.json"), summary)
+        stats.close()
+
+        s.set(documents=len(results), checked=len(fresh), workers=workers if len(todo) >= INLINE_BELOW else 1)
+        return summary
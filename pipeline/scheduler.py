@@ -0,0 +1,183 @@
+# pipeline/scheduler.py
+"""
+Stage Scheduler
+- Declarative stage graph with explicit dependencies
+- Runs independent stages concurrently on a bounded thread pool
+- Per-stage failure isolation (a failed stage only skips its dependents)
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from . import events
+from .tracing import span
+
+DEFAULT_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+
+class StageFailed(Exception):
+    """Raised by results.get() when a stage failed or was skipped."""
+
+
+class Stage:
+    """
+    A single unit of pipeline work.
+
+    fn receives one keyword argument per dependency, holding that
+    dependency's return value.
+    """
+
+    def __init__(self, name, fn, deps=(), label=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.label = label or name
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)})"
+
+
+class StageResults:
+    """Outcome of a scheduler run: values, errors, skips and timings."""
+
+    def __init__(self):
+        self.values = {}
+        self.errors = {}
+        self.skipped = set()
+        self.timings = {}
+
+    @property
+    def ok(self):
+        return not self.errors and not self.skipped
+
+    def get(self, name):
+        if name in self.values:
+            return self.values[name]
+        if name in self.errors:
+            raise StageFailed(f"Stage '{name}' failed: {self.errors[name]}")
+        raise StageFailed(f"Stage '{name}' was skipped")
+
+
+def _validate(stages):
+    by_name = {}
+    for s in stages:
+        if s.name in by_name:
+            raise ValueError(f"Duplicate stage name: {s.name}")
+        by_name[s.name] = s
+
+    for s in stages:
+        for d in s.deps:
+            if d not in by_name:
+                raise ValueError(f"Stage '{s.name}' depends on unknown stage '{d}'")
+
+    # Kahn's algorithm — detect cycles up front instead of deadlocking
+    indegree = {s.name: len(s.deps) for s in stages}
+    dependents = {s.name: [] for s in stages}
+    for s in stages:
+        for d in s.deps:
+            dependents[d].append(s.name)
+
+    ready = [n for n, k in indegree.items() if k == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for m in dependents[n]:
+            indegree[m] -= 1
+            if indegree[m] == 0:
+                ready.append(m)
+
+    if seen != len(stages):
+        raise ValueError("Stage graph contains a cycle")
+
+    return by_name, dependents
+
+
+def run_stages(stages, max_workers=None):
+    """
+    Execute a stage graph.
+
+    Each stage starts as soon as all of its dependencies have succeeded,
+    so wall-clock time tracks the slowest branch rather than the sum of
+    all stages. A stage that raises is recorded in results.errors and
+    every stage downstream of it is skipped; unrelated branches keep
+    running.
+    """
+    by_name, dependents = _validate(stages)
+    max_workers = max_workers or DEFAULT_WORKERS
+
+    results = StageResults()
+    remaining = {s.name: set(s.deps) for s in stages}
+    running = {}
+
+    def _run(stage, kwargs):
+        start = time.perf_counter()
+        try:
+            with span(stage.name, cat="stage"):
+                return stage.fn(**kwargs)
+        finally:
+            results.timings[stage.name] = time.perf_counter() - start
+
+    def _skip_downstream(name):
+        stack = list(dependents[name])
+        while stack:
+            m = stack.pop()
+            if m in results.skipped or m not in remaining:
+                continue
+            results.skipped.add(m)
+            del remaining[m]
+            print(f"⏭️ Skipping stage '{m}' (upstream '{name}' failed)")
+            events.publish("stage", name=m, label=by_name[m].label, status="skipped")
+            stack.extend(dependents[m])
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+
+        def _submit_ready():
+            for name in [n for n, deps in remaining.items() if not deps]:
+                stage = by_name[name]
+                del remaining[name]
+                kwargs = {d: results.values[d] for d in stage.deps}
+                print(f"▶️ Stage started: {stage.label}")
+                events.publish("stage", name=name, label=stage.label, status="started")
+                running[pool.submit(_run, stage, kwargs)] = name
+
+        _submit_ready()
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    results.values[name] = fut.result()
+                except Exception as e:
+                    results.errors[name] = e
+                    print(f"🚨 Stage '{name}' failed: {e}")
+                    events.publish("stage", name=name, label=by_name[name].label, status="failed",
+                                   error=f"{type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    _skip_downstream(name)
+                    continue
+
+                print(f"✅ Stage finished: {by_name[name].label} "
+                      f"({results.timings.get(name, 0.0):.2f}s)")
+                events.publish("stage", name=name, label=by_name[name].label, status="finished",
+                               seconds=round(results.timings.get(name, 0.0), 3))
+                for m in dependents[name]:
+                    if m in remaining:
+                        remaining[m].discard(name)
+
+            _submit_ready()
+
+    return results
+
+
+def print_summary(results):
+    print("\n⏱️ Stage timings:")
+    for name, secs in sorted(results.timings.items(), key=lambda kv: -kv[1]):
+        status = "failed" if name in results.errors else "ok"
+        print(f"   {name:<24} {secs:7.2f}s  {status}")
+    for name in sorted(results.skipped):
+        print(f"   {name:<24} {'-':>7}   skipped")
@@ -1,7 +1,40 @@
 import json, os
 
-OUTPUT_PATH = "outputs/raw/competitors.json"
-os.makedirs("outputs/raw", exist_ok=True)
+from pipeline.paths import output_file
+
+OUTPUT_PATH = os.path.join("raw", "competitors.json")  # relative to the output root
+
+# Fetch competitor pages and index their paragraphs (pipeline/minhash.py)
+# so QC can flag copy that duplicates their wording. Network access is
+# opt-in: COMPETITOR_FETCH=1 enables it, the default writes sample titles only.
+COMPETITOR_FETCH = os.getenv("COMPETITOR_FETCH", "0") == "1"
+COMPETITOR_TIMEOUT = float(os.getenv("COMPETITOR_TIMEOUT", "15"))
+
+
+def page_paragraphs(html):
+    """Visible <p>/<li> text of a page, one string per element."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    return [t for t in (el.get_text(" ", strip=True) for el in soup.find_all(["p", "li"])) if t]
+
+
+def index_competitor_page(url, brand):
+    """Fetch one page into the competitor index; returns paragraphs added (0 on failure)."""
+    from pipeline import transport
+    from pipeline.minhash import competitor_index
+
+    try:
+        response = transport.get(url, provider="competitor", timeout=COMPETITOR_TIMEOUT, retries=1)
+    except Exception as e:
+        print(f"⚠️ Competitor page unavailable ({url}): {type(e).__name__}")
+        return 0
+    if response is None or response.status_code != 200:
+        return 0
+    return competitor_index.add(page_paragraphs(response.text), url=url, brand=brand)
+
 
 def scrape_competitors():
     competitors = [
@@ -17,10 +50,15 @@ def scrape_competitors():
         }
     ]
 
-    with open(OUTPUT_PATH, "w") as f:
+    if COMPETITOR_FETCH:
+        for c in competitors:
+            c["indexed_paragraphs"] = index_competitor_page(c["url"], c["brand"])
+
+    path = output_file(OUTPUT_PATH)
+    with open(path, "w") as f:
         json.dump(competitors, f, indent=4)
 
-    print("Competitor pages scraped →", OUTPUT_PATH)
+    print("Competitor pages scraped →", path)
 
 if __name__ == "__main__":
     scrape_competitors()
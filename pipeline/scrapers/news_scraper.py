@@ -1,7 +1,8 @@
 import json, os
 
-OUTPUT_PATH = "outputs/raw/news.json"
-os.makedirs("outputs/raw", exist_ok=True)
+from pipeline.paths import output_file
+
+OUTPUT_PATH = os.path.join("raw", "news.json")  # relative to the output root
 
 def scrape_news():
     news = [
@@ -17,10 +18,11 @@ def scrape_news():
         }
     ]
 
-    with open(OUTPUT_PATH, "w") as f:
+    path = output_file(OUTPUT_PATH)
+    with open(path, "w") as f:
         json.dump(news, f, indent=4)
 
-    print("Industry news scraped →", OUTPUT_PATH)
+    print("Industry news scraped →", path)
 
 if __name__ == "__main__":
     scrape_news()
@@ -1,16 +1,18 @@
 # pipeline/scrapers/social_scraper.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import json, time, os
+import json, time
 
-os.makedirs("outputs/raw", exist_ok=True)
+from pipeline.paths import output_file
 
 def scrape_instagram_profile(profile):
     """
     Scrapes minimal Instagram HTML preview for a given profile.
     (Demo-only extraction)
     """
+    # Selenium is heavy — only pay for it when actually scraping
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     options.add_argument("--headless")
     driver = webdriver.Chrome(options=options)
@@ -20,7 +22,7 @@ def scrape_instagram_profile(profile):
 
     posts_html = driver.page_source[:2000]
 
-    output_path = f"outputs/raw/{profile}_social.json"
+    output_path = output_file("raw", f"{profile}_social.json")
     with open(output_path, "w") as f:
         json.dump({"profile": profile, "html_sample": posts_html}, f, indent=4)
 
@@ -1,9 +1,9 @@
-import requests
 import json
 import os
 
-OUTPUT_PATH = "outputs/raw/google_trends.json"
-os.makedirs("outputs/raw", exist_ok=True)
+from pipeline.paths import output_file
+
+OUTPUT_PATH = os.path.join("raw", "google_trends.json")  # relative to the output root
 
 def scrape_google_trends():
     # Free alternative Google Trends endpoint example
@@ -18,10 +18,11 @@ def scrape_google_trends():
             "regions": ["India", "USA"]
         })
 
-    with open(OUTPUT_PATH, "w") as f:
+    path = output_file(OUTPUT_PATH)
+    with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
-    print("Google Trends scraped →", OUTPUT_PATH)
+    print("Google Trends scraped →", path)
 
 if __name__ == "__main__":
     scrape_google_trends()
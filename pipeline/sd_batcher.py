@@ -0,0 +1,211 @@
+# pipeline/sd_batcher.py
+"""
+Batched txt2img for the local Stable Diffusion (AUTOMATIC1111) backend
+- Concurrent image requests with compatible settings are coalesced
+- Identical prompts → one call with batch_size=N
+- Distinct prompts → one call through A1111's "prompts from file or textbox" script
+- images[] is streamed to temp files and split back to the waiting callers
+  (grid image dropped)
+- Batch size via LOCAL_SD_BATCH; the flush window adapts to traffic
+- At most LOCAL_SD_MAX_INFLIGHT calls at once (A1111 runs one job at a
+  time); later batches wait their turn
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from . import transport
+from .ingest import ingest, discard
+
+LOCAL_SD_BATCH = int(os.getenv("LOCAL_SD_BATCH", "4"))
+LOCAL_SD_MAX_INFLIGHT = int(os.getenv("LOCAL_SD_MAX_INFLIGHT", "1"))  # concurrent txt2img calls
+
+# Flush window bounds (seconds). The window grows while partial batches keep
+# arriving and shrinks when batches fill up or requests come in alone, so a
+# single slug is never held back for long.
+MIN_WAIT = float(os.getenv("LOCAL_SD_BATCH_MIN_WAIT", "0.02"))
+MAX_WAIT = float(os.getenv("LOCAL_SD_BATCH_MAX_WAIT", "0.5"))
+CANCEL_POLL = 0.1  # how often a waiting caller checks its cancel event
+
+PROMPT_SCRIPT = "prompts from file or textbox"
+
+
+class _Job:
+    __slots__ = ("prompt", "deadline", "future")
+
+    def __init__(self, prompt, deadline):
+        self.prompt = prompt
+        self.deadline = deadline
+        self.future = Future()
+
+
+def _split_images(files, n):
+    """A1111 prepends a grid image to multi-image results unless disabled."""
+    if len(files) == n + 1:
+        discard(files[0][0])
+        files = files[1:]
+    for path, _ in files[n:]:
+        discard(path)
+    return [path for path, _ in files[:n]]
+
+
+def build_payload(prompts, params):
+    """txt2img payload for a group of prompts sharing `params`."""
+    payload = dict(params, do_not_save_grid=True, do_not_save_samples=True)
+
+    if len(set(prompts)) == 1:
+        payload.update(prompt=prompts[0], batch_size=len(prompts), n_iter=1)
+    else:
+        payload.update(
+            prompt="",
+            batch_size=1,
+            n_iter=1,
+            script_name=PROMPT_SCRIPT,
+            # checkbox_iterate, checkbox_iterate_batch, prompt_position, prompt_txt
+            script_args=[False, False, "start", "\n".join(" ".join(p.split()) for p in prompts)],
+        )
+    return payload
+
+
+class SDBatcher:
+    def __init__(self, url_getter, batch_size=None, max_inflight=None):
+        self.url_getter = url_getter
+        self.batch_size = max(1, batch_size or LOCAL_SD_BATCH)
+        self._calls = ThreadPoolExecutor(
+            max_workers=max(1, max_inflight or LOCAL_SD_MAX_INFLIGHT), thread_name_prefix="sd-batch-call"
+        )
+        self.wait = MIN_WAIT
+        self._groups = {}           # params key -> [job, ...]
+        self._opened = {}           # params key -> time the group's window opened
+        self._params = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self.calls = 0
+        self.images = 0
+
+    def submit(self, prompt, params, timeout):
+        """Queue one prompt; the Future resolves to a PNG temp file or None."""
+        key = json.dumps(params, sort_keys=True)
+        job = _Job(prompt, time.monotonic() + timeout)
+
+        with self._cond:
+            self._ensure_thread()
+            self._groups.setdefault(key, []).append(job)
+            self._opened.setdefault(key, time.monotonic())
+            self._params[key] = params
+            self._cond.notify()
+        return job.future
+
+    def generate(self, prompt, params, timeout, cancel=None):
+        """Temp file for prompt, or None on failure, timeout or once cancel is set."""
+        future = self.submit(prompt, params, timeout)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    return future.result(timeout=max(0.0, min(remaining, CANCEL_POLL)))
+                except FutureTimeout:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    if remaining <= CANCEL_POLL:
+                        print("ℹ️ Local SD batch timed out → skipping")
+                        break
+        except Exception as e:
+            if cancel is None or not cancel.is_set():
+                print("ℹ️ Local SD batch failed → skipping:", e)
+            return None
+        # Nobody will collect the file once the batch does finish
+        future.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+        return None
+
+    # ---------------- collector
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="sd-batcher", daemon=True)
+            self._thread.start()
+
+    def _take_ready(self):
+        """Pop one group that is full or whose window has expired."""
+        now = time.monotonic()
+        wake = None
+        for key, jobs in self._groups.items():
+            due = self._opened[key] + self.wait
+            if len(jobs) >= self.batch_size or now >= due:
+                batch = jobs[:self.batch_size]
+                rest = jobs[self.batch_size:]
+                if rest:
+                    self._groups[key] = rest
+                    self._opened[key] = now
+                else:
+                    del self._groups[key]
+                    del self._opened[key]
+                return self._params[key], batch, None
+            wake = due if wake is None else min(wake, due)
+        return None, None, wake
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                params, batch, wake = self._take_ready()
+                while batch is None:
+                    self._cond.wait(None if wake is None else max(0.0, wake - time.monotonic()))
+                    params, batch, wake = self._take_ready()
+
+            # Call outside the lock so new requests keep queueing meanwhile;
+            # the executor caps how many calls reach A1111 at once.
+            self._calls.submit(self._run, params, batch)
+
+    def _adapt(self, n):
+        with self._cond:  # _take_ready() reads self.wait under the same lock
+            if n >= self.batch_size or n == 1:
+                self.wait = max(MIN_WAIT, self.wait / 2)
+            else:
+                self.wait = min(MAX_WAIT, self.wait * 1.5)
+
+    def _run(self, params, batch):
+        self._adapt(len(batch))
+        timeout = max(job.deadline for job in batch) - time.monotonic()
+        if timeout <= 0:
+            for job in batch:
+                job.future.set_result(None)
+            return
+
+        prompts = [job.prompt for job in batch]
+        try:
+            response = transport.post(
+                self.url_getter(), provider="local_sd",
+                json=build_payload(prompts, params), timeout=timeout, stream=True,
+            )
+            if response is None or response.status_code != 200:
+                if response is not None:
+                    response.close()
+                raise RuntimeError(f"txt2img returned {getattr(response, 'status_code', 'no response')}")
+
+            images = _split_images(ingest(response, "images", "png"), len(batch))
+            self.calls += 1
+            self.images += len(images)
+
+            for i, job in enumerate(batch):
+                job.future.set_result(images[i] if i < len(images) else None)
+
+        except Exception as e:
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher(url_getter):
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SDBatcher(url_getter)
+        return _batcher
@@ -1,8 +1,9 @@
 # pipeline/seo_generator.py
 """
 SEO Generator Module for Calyco Demo Content Engine
-- Generates JSON-LD schema
-- Generates sitemap entries
+- Generates JSON-LD schema (description / wordCount / keywords from the
+  cached markdown outline when the content has none)
+- Records sitemap URLs (pipeline/sitemap.py publishes the sharded sitemap)
 - Provides a wrapper class SEOGenerator for use in the pipeline
 """
 
@@ -10,101 +11,119 @@ import os
 import json
 from datetime import datetime
 
-# Ensure directories exist
-os.makedirs("outputs/blogs/jsonld", exist_ok=True)
-os.makedirs("outputs/web_copy/jsonld", exist_ok=True)
+from .build_cache import build_cache, stage_key, file_digest
+from .derivatives import ensure_derivatives, largest
+from .markdown_outline import outline, trend_keywords
+from .paths import output_path, output_file
+from .sitemap import sitemap, SITEMAP_PATH
+from .tracing import span
 
-SITEMAP_PATH = "outputs/sitemap.xml"
+# Bump when the JSON-LD shape changes — part of the SEO cache key.
+SCHEMA_VERSION = "3"
+
+SITE_URL = "https://calycopaints.com"
 
 
 # ============================================================
 # JSON-LD GENERATORS
 # ============================================================
 
-def generate_jsonld_article(slug, title, desc):
-    return {
+def jsonld_image(manifest):
+    """
+    schema.org `image` from a derivative manifest: the largest variant of
+    each format, biggest first, so crawlers get a sized, compressed file.
+    """
+    if not manifest:
+        return None
+    formats = dict.fromkeys(v["format"] for v in manifest["variants"])
+    return [
+        {
+            "@type": "ImageObject",
+            "contentUrl": f"{SITE_URL}/{v['path']}",
+            "width": v["width"],
+            "height": v["height"],
+            "thumbnailUrl": f"{SITE_URL}/{manifest['thumbnail']['path']}",
+        }
+        for v in (largest(manifest, fmt) for fmt in formats)
+    ]
+
+
+def generate_jsonld_article(slug, title, desc, image=None, word_count=None, keywords=None):
+    data = {
         "@context": "https://schema.org",
         "@type": "Article",
         "headline": title,
         "description": desc,
         "author": {"@type": "Organization", "name": "Calyco"},
         "publisher": {"@type": "Organization", "name": "Calyco"},
-        "mainEntityOfPage": f"https://calycopaints.com/blog/{slug}",
+        "mainEntityOfPage": f"{SITE_URL}/blog/{slug}",
         "datePublished": datetime.utcnow().strftime("%Y-%m-%d")
     }
+    if word_count:
+        data["wordCount"] = word_count
+    if keywords:
+        data["keywords"] = ", ".join(keywords)
+    if image:
+        data["image"] = image
+    return data
 
 
-def generate_jsonld_web_copy(slug, title, desc, product_type="Product"):
-    return {
+def generate_jsonld_web_copy(slug, title, desc, product_type="Product", image=None):
+    data = {
         "@context": "https://schema.org",
         "@type": product_type,
         "name": title,
         "description": desc,
         "brand": {"@type": "Brand", "name": "Calyco"},
-        "mainEntityOfPage": f"https://calycopaints.com/{slug}",
+        "mainEntityOfPage": f"{SITE_URL}/{slug}",
         "datePublished": datetime.utcnow().strftime("%Y-%m-%d")
     }
+    if image:
+        data["image"] = image
+    return data
 
 
 # ============================================================
 # WRITE JSON-LD TO FILE
 # ============================================================
 
-def write_jsonld_for_article(slug, title, desc):
-    data = generate_jsonld_article(slug, title, desc)
-    path = f"outputs/blogs/jsonld/{slug}.json"
+def write_jsonld_for_article(slug, title, desc, image=None, word_count=None, keywords=None):
+    data = generate_jsonld_article(slug, title, desc, image, word_count, keywords)
+    path = output_file("blogs", "jsonld", f"{slug}.json")
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
     return path
 
 
-def write_jsonld_for_web_copy(slug, title, desc, product_type="Product"):
-    data = generate_jsonld_web_copy(slug, title, desc, product_type)
-    path = f"outputs/web_copy/jsonld/{slug}.json"
+def write_jsonld_for_web_copy(slug, title, desc, product_type="Product", image=None):
+    data = generate_jsonld_web_copy(slug, title, desc, product_type, image)
+    path = output_file("web_copy", "jsonld", f"{slug}.json")
     with open(path, "w") as f:
         json.dump(data, f, indent=2)
     return path
 
 
 # ============================================================
-# SITEMAP HANDLING
+# SITEMAP HANDLING (pipeline/sitemap.py: indexed, sharded, gzipped)
 # ============================================================
 
-def init_sitemap():
-    if not os.path.exists(SITEMAP_PATH):
-        with open(SITEMAP_PATH, "w") as f:
-            f.write(
-                '<?xml version="1.0" encoding="UTF-8"?>\n'
-                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-            )
-
+def sitemap_path():
+    """The sitemap index (outputs/sitemap.xml)."""
+    return output_path(SITEMAP_PATH)
 
-def append_sitemap_entry(slug, is_blog=True):
-    init_sitemap()
 
+def append_sitemap_entry(slug, is_blog=True, digest=None):
+    """Record the page's URL; lastmod only moves when digest changes."""
     url = (
-        f"https://calycopaints.com/blog/{slug}"
-        if is_blog else f"https://calycopaints.com/{slug}"
+        f"{SITE_URL}/blog/{slug}"
+        if is_blog else f"{SITE_URL}/{slug}"
     )
-
-    entry = f"""  <url>
-    <loc>{url}</loc>
-    <lastmod>{datetime.utcnow().strftime("%Y-%m-%d")}</lastmod>
-    <changefreq>weekly</changefreq>
-    <priority>0.8</priority>
-  </url>\n"""
-
-    with open(SITEMAP_PATH, "a") as f:
-        f.write(entry)
+    return sitemap.update(url, digest or url)
 
 
 def finalize_sitemap():
-    with open(SITEMAP_PATH, "r") as f:
-        content = f.read()
-
-    if not content.strip().endswith("</urlset>"):
-        with open(SITEMAP_PATH, "a") as f:
-            f.write("</urlset>\n")
+    """Rewrite the shards that changed, then the index."""
+    return sitemap.publish()
 
 
 # ============================================================
@@ -123,27 +142,57 @@ class SEOGenerator:
         Accepts generated content dictionary with keys:
         - slug
         - title
-        - description
+        - description (optional): defaults to the body's first paragraph
+        - body (optional): markdown, read through the cached outline
         - type: 'blog' or 'web'
+        - image (optional): source image path; its derivatives fill `image`
         """
         slug = content.get("slug", "untitled")
-        title = content.get("title", "")
-        desc = content.get("description", "")
         is_blog = content.get("type") == "blog"
 
-        if is_blog:
-            print(f"📄 Creating JSON-LD schema for blog: {slug}")
-            write_jsonld_for_article(slug, title, desc)
-        else:
-            print(f"📦 Creating JSON-LD schema for web page: {slug}")
-            write_jsonld_for_web_copy(slug, title, desc)
-
-        append_sitemap_entry(slug, is_blog=is_blog)
+        with span("seo.schema", cat="seo", slug=slug) as s:
+            # Upstream hash: everything the page is built from except the
+            # generation timestamp.
+            upstream = {k: v for k, v in content.items() if k != "timestamp"}
+            stage = f"jsonld:{'blog' if is_blog else 'web'}:{slug}"
+            key = stage_key(SCHEMA_VERSION, upstream, file_digest(content.get("image")),
+                            sorted(trend_keywords()))
+
+            if build_cache.lookup(stage, key) is not None:
+                print(f"♻️ JSON-LD unchanged: {slug}")
+                s.set(outcome="cached")
+                return
+
+            doc = outline(content.get("body") or "")
+            title = content.get("title") or doc["title"] or ""
+            desc = content.get("description") or doc["excerpt"]
+
+            image = None
+            if content.get("image"):
+                image = jsonld_image(ensure_derivatives(content["image"]))
+
+            if is_blog:
+                print(f"📄 Creating JSON-LD schema for blog: {slug}")
+                keywords = [k for k, v in doc["keywords"].items() if v["count"]]
+                path = write_jsonld_for_article(slug, title, desc, image=image,
+                                                word_count=doc["words"], keywords=keywords)
+            else:
+                print(f"📦 Creating JSON-LD schema for web page: {slug}")
+                path = write_jsonld_for_web_copy(slug, title, desc, image=image)
+
+            # lastmod follows the page content, not schema / keyword changes
+            append_sitemap_entry(slug, is_blog=is_blog,
+                                 digest=stage_key(upstream, file_digest(content.get("image"))))
+            build_cache.record(stage, key, {"path": path}, outputs=[path])
+            s.set(bytes=os.path.getsize(path))
 
     def generate_sitemap(self):
-        print("🗺️ Finalizing sitemap.xml ...")
-        finalize_sitemap()
-        print("Sitemap updated ✔")
+        with span("seo.sitemap", cat="seo") as s:
+            print("🗺️ Publishing sitemap ...")
+            result = finalize_sitemap()
+            s.set(bytes=os.path.getsize(sitemap_path()), **result)
+            print(f"Sitemap updated ✔ ({result['urls']} URLs, {result['shards']} shards, "
+                  f"{result['written']} rewritten)")
 
 
 # ============================================================
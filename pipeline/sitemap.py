@@ -0,0 +1,222 @@
+# pipeline/sitemap.py
+"""
+Sitemap Engine
+- Every URL lives in an on-disk index (outputs/.store/sitemap.jsonl):
+  loc -> lastmod, content hash, shard. Re-recording unchanged content is a
+  no-op, so lastmod only moves when the page really changed
+- URLs are assigned to shards once, filling each up to the protocol limits
+  (50,000 URLs / 50 MB uncompressed), and shards are written gzipped to
+  outputs/sitemaps/sitemap-NNNN.xml.gz
+- outputs/sitemap.xml is the sitemap index listing every shard
+- publish() rewrites only shards whose URLs changed since the last publish
+  (tracked in outputs/.store/sitemap_shards.jsonl, so it survives a crash),
+  each written to a temp file and moved into place atomically
+"""
+
+import os
+import gzip
+import threading
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from .journal import JournalIndex
+from .paths import output_path
+
+INDEX_PATH = os.path.join(".store", "sitemap.jsonl")        # relative to the output root
+SHARDS_PATH = os.path.join(".store", "sitemap_shards.jsonl")
+SITEMAP_PATH = "sitemap.xml"   # the sitemap index
+SHARD_DIR = "sitemaps"
+
+MAX_URLS = 50000               # per shard, sitemaps.org limits
+MAX_BYTES = 50 * 1024 * 1024   # per shard, uncompressed
+
+_URLSET_OPEN = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+_URLSET_CLOSE = "</urlset>\n"
+_ENVELOPE = len(_URLSET_OPEN) + len(_URLSET_CLOSE)
+
+
+def url_xml(loc, entry):
+    return (f"  <url>\n"
+            f"    <loc>{escape(loc)}</loc>\n"
+            f"    <lastmod>{entry['lastmod']}</lastmod>\n"
+            f"    <changefreq>{entry['changefreq']}</changefreq>\n"
+            f"    <priority>{entry['priority']}</priority>\n"
+            f"  </url>\n")
+
+
+def _size(loc, entry):
+    return len(url_xml(loc, entry).encode("utf-8"))
+
+
+def shard_name(shard):
+    return f"sitemap-{shard:04d}.xml.gz"
+
+
+def _publish(path, data):
+    """Write bytes to path atomically."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Sitemap:
+    def __init__(self, root=None, site_url=None, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self._root = root
+        self.site_url = site_url
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._loaded_root = None
+        self._urls = None      # JournalIndex: loc -> {lastmod, hash, shard, changefreq, priority}
+        self._shards = None    # JournalIndex: shard -> {urls, bytes, lastmod, dirty}
+        self._members = {}     # shard -> set of locs
+        self._bytes = {}       # shard -> uncompressed size
+        self._dirty = set()
+
+    def _path(self, *parts):
+        return os.path.join(self._root, *parts) if self._root else output_path(*parts)
+
+    def _load(self):
+        root = self._root or output_path()
+        if self._loaded_root == root:
+            return
+        if self._urls is not None:
+            self._urls.close()
+            self._shards.close()
+
+        self._loaded_root = root
+        self._urls = JournalIndex(self._path(INDEX_PATH))
+        self._shards = JournalIndex(self._path(SHARDS_PATH))
+        self._members, self._bytes = {}, {}
+        for loc, entry in self._urls.items():
+            shard = entry["shard"]
+            self._members.setdefault(shard, set()).add(loc)
+            self._bytes[shard] = self._bytes.get(shard, _ENVELOPE) + _size(loc, entry)
+        self._dirty = {int(k) for k, v in self._shards.items() if v.get("dirty")}
+
+    # ---------------- updates
+
+    def _assign(self, size):
+        """Shard for a new URL: the last one while it is under both limits."""
+        last = max(self._members, default=0)
+        if (len(self._members.get(last, ())) < self.max_urls
+                and self._bytes.get(last, _ENVELOPE) + size <= self.max_bytes):
+            return last
+        return last + 1
+
+    def _mark(self, shard):
+        if shard not in self._dirty:
+            self._dirty.add(shard)
+            self._shards.set(str(shard), dict(self._shards.get(str(shard)) or {}, dirty=True))
+
+    def update(self, loc, digest, changefreq="weekly", priority="0.8", lastmod=None):
+        """
+        Record loc with its content hash. Returns True if the sitemap
+        changed; lastmod moves only when the content (or metadata) did.
+        """
+        with self._lock:
+            self._load()
+            old = self._urls.get(loc)
+            if old and old["hash"] == digest and old["changefreq"] == changefreq \
+                    and old["priority"] == priority:
+                return False
+
+            entry = {
+                "lastmod": lastmod or datetime.utcnow().strftime("%Y-%m-%d"),
+                "hash": digest,
+                "changefreq": changefreq,
+                "priority": priority,
+            }
+            size = _size(loc, entry)
+            if old:
+                shard = entry["shard"] = old["shard"]
+                self._bytes[shard] += size - _size(loc, old)
+            else:
+                shard = entry["shard"] = self._assign(size)
+                self._members.setdefault(shard, set()).add(loc)
+                self._bytes[shard] = self._bytes.get(shard, _ENVELOPE) + size
+
+            self._mark(shard)  # before the entry, so a crash in between still republishes
+            self._urls.set(loc, entry)
+            return True
+
+    def remove(self, loc):
+        with self._lock:
+            self._load()
+            old = self._urls.get(loc)
+            if old is None:
+                return False
+            shard = old["shard"]
+            self._members[shard].discard(loc)
+            self._bytes[shard] -= _size(loc, old)
+            self._mark(shard)
+            self._urls.delete(loc)
+            return True
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._urls)
+
+    def get(self, loc):
+        with self._lock:
+            self._load()
+            return self._urls.get(loc)
+
+    # ---------------- publishing
+
+    def _shard_url(self, shard):
+        from .seo_generator import SITE_URL
+
+        return f"{self.site_url or SITE_URL}/{SHARD_DIR}/{shard_name(shard)}"
+
+    def _write_shard(self, shard):
+        locs = sorted(self._members.get(shard, ()))
+        entries = [(loc, self._urls.get(loc)) for loc in locs]
+        body = "".join([_URLSET_OPEN] + [url_xml(loc, e) for loc, e in entries] + [_URLSET_CLOSE])
+        path = os.path.join(self._path(SHARD_DIR), shard_name(shard))
+        if locs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _publish(path, gzip.compress(body.encode("utf-8"), mtime=0))
+        elif os.path.exists(path):
+            os.remove(path)  # every URL removed; dropped from the index too
+        self._shards.set(str(shard), {
+            "urls": len(locs),
+            "bytes": len(body.encode("utf-8")),
+            "lastmod": max((e["lastmod"] for _, e in entries), default=None),
+            "dirty": False,
+        })
+
+    def _write_index(self):
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+        for key, meta in sorted(self._shards.items(), key=lambda kv: int(kv[0])):
+            if not meta.get("urls"):
+                continue
+            parts.append(f"  <sitemap>\n    <loc>{escape(self._shard_url(int(key)))}</loc>\n"
+                         f"    <lastmod>{meta['lastmod']}</lastmod>\n  </sitemap>\n")
+        parts.append("</sitemapindex>\n")
+        path = self._path(SITEMAP_PATH)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        _publish(path, "".join(parts).encode("utf-8"))
+
+    def publish(self):
+        """Rewrite changed shards, then the index. Returns {"urls", "shards", "written"}."""
+        with self._lock:
+            self._load()
+            written = sorted(self._dirty)
+            for shard in written:
+                self._write_shard(shard)
+            if written or not os.path.exists(self._path(SITEMAP_PATH)):
+                self._write_index()
+            self._dirty = set()
+            return {
+                "urls": len(self._urls),
+                "shards": sum(1 for _, m in self._shards.items() if m.get("urls")),
+                "written": len(written),
+            }
+
+
+sitemap = Sitemap()
@@ -0,0 +1,124 @@
+# pipeline/text_analysis.py
+"""
+Single-Pass Text Analysis
+- analyze(text) tokenizes once and returns a TextAnalysis that every QC
+  check consumes: word / sentence / syllable counts, the NFKC case-folded
+  text and its word tokens, and the markdown outline (headings,
+  paragraphs, keywords; markdown_outline.outline, cached by content hash
+  in memory — TextAnalysis(text, persist=True) also uses the journal)
+- Tokenization, sentence splitting and syllable counting follow textstat
+  (CMU dict when the NLTK corpus is installed, Pyphen otherwise), so the
+  Flesch Reading Ease matches textstat.flesch_reading_ease
+- Syllables are memoized per word; analyses are memoized per text
+"""
+
+import re
+import functools
+from collections import Counter
+
+from .brand_rules import normalize
+from .markdown_outline import outline, plain_text
+
+# nltk / pyphen are imported on the first syllable lookup only.
+
+# textstat's punctuation removal: drop everything but word chars, spaces and
+# contraction apostrophes ("don't" stays one word, "'quoted'" loses them)
+_PUNCT = re.compile(r"[^\w\s']|'(?![tsd]|ve|ll|re)")
+_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+
+FRE_BASE = 206.835
+FRE_SENTENCE_LENGTH = 1.015
+FRE_SYLLABLES_PER_WORD = 84.6
+
+
+# ============================================================
+# SYLLABLES
+# ============================================================
+
+_cmudict = None
+_pyphen = None
+
+
+def _dictionaries():
+    """(cmudict or {}, Pyphen or None), loaded once. Never downloads."""
+    global _cmudict, _pyphen
+    if _cmudict is None:
+        try:
+            import nltk
+            nltk.data.find("corpora/cmudict")
+            _cmudict = nltk.corpus.cmudict.dict()
+        except (ImportError, LookupError, OSError):
+            _cmudict = {}
+        try:
+            import pyphen
+            _pyphen = pyphen.Pyphen(lang="en_US")
+        except ImportError:
+            _pyphen = None
+    return _cmudict, _pyphen
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def syllables(word):
+    """Syllables in one lowercase, punctuation-free word."""
+    cmu, hyphenator = _dictionaries()
+    phones = cmu.get(word)
+    if phones:
+        return sum(1 for p in phones[0] if p[-1].isdigit())
+    if hyphenator is not None:
+        return len(hyphenator.positions(word)) + 1
+    return max(1, len(re.findall(r"[aeiouy]+", word)))
+
+
+# ============================================================
+# ANALYSIS
+# ============================================================
+
+class TextAnalysis:
+    __slots__ = ("text", "folded", "tokens", "words", "sentences", "syllables",
+                 "outline", "headings", "paragraphs")
+
+    def __init__(self, text, persist=False):
+        self.text = text
+        self.folded = normalize(text)[0]
+
+        # Word tokens (textstat's list_words on the folded text)
+        self.tokens = _PUNCT.sub("", self.folded).split()
+        self.words = len(self.tokens)
+
+        self.syllables = sum(syllables(t) * n for t, n in Counter(self.tokens).items())
+
+        # Sentences: textstat ignores fragments of two words or fewer
+        if text:
+            found = _SENTENCE.findall(text)
+            short = sum(1 for s in found if len(_PUNCT.sub("", s).split()) <= 2)
+            self.sentences = max(1, len(found) - short)
+        else:
+            self.sentences = 0
+
+        # Markdown structure from the shared (cached) outline
+        self.outline = outline(text, persist=persist)
+        lines = text.split("\n")
+        self.headings = [(level, title) for level, title, _ in self.outline["headings"]]
+        self.paragraphs = [" ".join(plain_text(l) for l in lines[start:end])
+                           for start, end, _ in self.outline["paragraphs"]]
+
+    @property
+    def words_per_sentence(self):
+        return self.words / self.sentences if self.sentences else 0.0
+
+    @property
+    def syllables_per_word(self):
+        return self.syllables / self.words if self.words else 0.0
+
+    def flesch_reading_ease(self):
+        if not self.words_per_sentence or not self.syllables_per_word:
+            return 0.0
+        return (FRE_BASE
+                - FRE_SENTENCE_LENGTH * self.words_per_sentence
+                - FRE_SYLLABLES_PER_WORD * self.syllables_per_word)
+
+
+@functools.lru_cache(maxsize=64)
+def analyze(text):
+    """TextAnalysis for text (the last few are memoized)."""
+    return TextAnalysis(text)
@@ -0,0 +1,326 @@
+# pipeline/text_model.py
+"""
+Batched Text Generation
+- text_model_batch(prompts, **params) → [text, ...]
+- Concurrent identical prompts (same model + params) share one in-flight call
+- Distinct prompts are grouped into backend calls of up to TEXT_MODEL_BATCH,
+  flushed when full or after a short window; at most TEXT_MODEL_MAX_INFLIGHT
+  calls run at once, later batches wait their turn
+- Results are memoized in outputs/.cache/text_memo.jsonl, keyed by model,
+  prompt and parameters, so re-runs never call the backend twice
+- Backends are pluggable: "stub" (local stand-in, default) or "gemini";
+  register_backend() adds more
+- text_model_stream() yields chunks as a streaming backend produces them;
+  a consumer that stops early (e.g. a QC abort) leaves nothing memoized
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .build_cache import stage_key
+from .journal import JournalIndex
+from .paths import output_path
+from .tracing import span
+
+# google.generativeai is imported by GeminiBackend only.
+
+TEXT_MODEL_BACKEND = os.getenv("TEXT_MODEL_BACKEND", "stub")
+TEXT_MODEL_BATCH = int(os.getenv("TEXT_MODEL_BATCH", "8"))
+TEXT_MODEL_WAIT = float(os.getenv("TEXT_MODEL_WAIT", "0.02"))       # flush window, seconds
+TEXT_MODEL_TIMEOUT = float(os.getenv("TEXT_MODEL_TIMEOUT", "120"))
+TEXT_MODEL_MAX_INFLIGHT = int(os.getenv("TEXT_MODEL_MAX_INFLIGHT", "2"))  # concurrent backend calls
+TEXT_MODEL_MEMO = os.getenv("TEXT_MODEL_MEMO", "1") != "0"
+
+MEMO_PATH = os.path.join(".cache", "text_memo.jsonl")  # relative to the output root
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class StubBackend:
+    """Local stand-in: fixed placeholder text, optional simulated latency."""
+
+    model = "stub-1"
+
+    TEXT = (
+        "Generated content (placeholder).\n"
+        "Replace with Mistral/OSS text model if required."
+    )
+
+    def __init__(self, latency=None, per_prompt=None, chunk_delay=None):
+        self.latency = float(os.getenv("TEXT_MODEL_STUB_LATENCY", "0") if latency is None else latency)
+        self.per_prompt = float(os.getenv("TEXT_MODEL_STUB_PER_PROMPT", "0") if per_prompt is None else per_prompt)
+        self.chunk_delay = float(os.getenv("TEXT_MODEL_STUB_CHUNK_DELAY", "0") if chunk_delay is None else chunk_delay)
+        self.calls = 0
+
+    def generate_batch(self, prompts, params):
+        self.calls += 1
+        time.sleep(self.latency + self.per_prompt * len(prompts))
+        return [self.TEXT for _ in prompts]
+
+    def stream(self, prompt, params):
+        self.calls += 1
+        time.sleep(self.latency)
+        for piece in re.findall(r"\S+\s*", self.TEXT):
+            time.sleep(self.chunk_delay)
+            yield piece
+
+
+class GeminiBackend:
+    """
+    Google Gemini via google-generativeai (GEMINI_API_KEY / GOOGLE_API_KEY).
+    The API has no multi-prompt call, so a batch is fanned out on a small
+    thread pool — one round trip of wall time for the whole group.
+    """
+
+    def __init__(self, model=None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+        self.model = model or os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+        self._client = genai.GenerativeModel(self.model)
+        self._pool = ThreadPoolExecutor(max_workers=TEXT_MODEL_BATCH, thread_name_prefix="gemini")
+
+    def _one(self, prompt, params):
+        response = self._client.generate_content(prompt, generation_config=params or None)
+        return response.text
+
+    def generate_batch(self, prompts, params):
+        return list(self._pool.map(lambda p: self._one(p, params), prompts))
+
+    def stream(self, prompt, params):
+        response = self._client.generate_content(prompt, generation_config=params or None, stream=True)
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+
+BACKENDS = {
+    "stub": StubBackend,
+    "gemini": GeminiBackend,
+}
+
+
+def register_backend(name, factory):
+    """Make `factory()` selectable as TEXT_MODEL_BACKEND=name."""
+    BACKENDS[name] = factory
+
+
+# ============================================================
+# BATCHER
+# ============================================================
+
+class _Job:
+    __slots__ = ("prompt", "key", "future")
+
+    def __init__(self, prompt, key):
+        self.prompt = prompt
+        self.key = key
+        self.future = Future()
+
+
+class TextBatcher:
+    def __init__(self, backend, batch_size=None, wait=None, memo=None, max_inflight=None):
+        self.backend = backend
+        self.batch_size = max(1, batch_size or TEXT_MODEL_BATCH)
+        self._calls = ThreadPoolExecutor(
+            max_workers=max(1, max_inflight or TEXT_MODEL_MAX_INFLIGHT), thread_name_prefix="text-batch-call"
+        )
+        self.wait = TEXT_MODEL_WAIT if wait is None else wait
+        self.memo = memo
+        self._groups = {}           # params key -> [job, ...]
+        self._opened = {}           # params key -> time the group's window opened
+        self._params = {}
+        self._in_flight = {}        # memo key -> Future (coalesces identical prompts)
+        self._cond = threading.Condition()
+        self._thread = None
+        self.counts = {
+            "prompts": 0, "memo_hits": 0, "coalesced": 0, "calls": 0, "generated": 0,
+            "streamed": 0, "aborted": 0, "wasted_chars": 0,
+        }
+
+    def key(self, prompt, params):
+        return stage_key(self.backend.model, prompt, params)
+
+    def submit(self, prompt, params):
+        """Future resolving to the text for prompt."""
+        key = self.key(prompt, params)
+        with self._cond:
+            self.counts["prompts"] += 1
+
+            if self.memo is not None:
+                hit = self.memo.get(key)
+                if hit is not None:
+                    self.counts["memo_hits"] += 1
+                    future = Future()
+                    future.set_result(hit)
+                    return future
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.counts["coalesced"] += 1
+                return future
+
+            job = _Job(prompt, key)
+            self._in_flight[key] = job.future
+            group = json.dumps(params, sort_keys=True)
+            self._groups.setdefault(group, []).append(job)
+            self._opened.setdefault(group, time.monotonic())
+            self._params[group] = params
+            self._ensure_thread()
+            self._cond.notify()
+            return job.future
+
+    def generate(self, prompts, params, timeout=TEXT_MODEL_TIMEOUT):
+        futures = [self.submit(p, params) for p in prompts]
+        deadline = time.monotonic() + timeout
+        return [f.result(timeout=max(0.0, deadline - time.monotonic())) for f in futures]
+
+    def stream(self, prompt, params):
+        """
+        Generator of text chunks for one prompt. Memo hits and backends
+        without stream() come back as a single chunk. Closing the generator
+        early counts the draft as aborted and memoizes nothing.
+        """
+        key = self.key(prompt, params)
+        hit = self.memo.get(key) if self.memo is not None else None
+        if hit is not None:
+            with self._cond:
+                self.counts["prompts"] += 1
+                self.counts["memo_hits"] += 1
+            yield hit
+            return
+        if not hasattr(self.backend, "stream"):
+            yield self.generate([prompt], params)[0]
+            return
+
+        parts, complete = [], False
+        try:
+            for chunk in self.backend.stream(prompt, params):
+                parts.append(chunk)
+                yield chunk
+            complete = True
+        finally:
+            with self._cond:
+                self.counts["prompts"] += 1
+                self.counts["streamed"] += 1
+                if not complete:
+                    self.counts["aborted"] += 1
+                    self.counts["wasted_chars"] += sum(map(len, parts))
+        if self.memo is not None:
+            self.memo.set(key, "".join(parts))
+
+    # ---------------- collector
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="text-batcher", daemon=True)
+            self._thread.start()
+
+    def _take_ready(self):
+        """Pop one group that is full or whose window has expired."""
+        now = time.monotonic()
+        wake = None
+        for group, jobs in self._groups.items():
+            due = self._opened[group] + self.wait
+            if len(jobs) >= self.batch_size or now >= due:
+                batch, rest = jobs[:self.batch_size], jobs[self.batch_size:]
+                if rest:
+                    self._groups[group] = rest
+                    self._opened[group] = now
+                else:
+                    del self._groups[group]
+                    del self._opened[group]
+                return self._params[group], batch, None
+            wake = due if wake is None else min(wake, due)
+        return None, None, wake
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                params, batch, wake = self._take_ready()
+                while batch is None:
+                    self._cond.wait(None if wake is None else max(0.0, wake - time.monotonic()))
+                    params, batch, wake = self._take_ready()
+
+            # Call outside the lock so new prompts keep queueing meanwhile;
+            # the executor caps how many calls reach the backend at once.
+            self._calls.submit(self._run, params, batch)
+
+    def _run(self, params, batch):
+        try:
+            with span("text_model.batch", cat="provider", model=self.backend.model, prompts=len(batch)):
+                texts = self.backend.generate_batch([job.prompt for job in batch], params)
+            if len(texts) != len(batch):
+                raise RuntimeError(f"backend returned {len(texts)} texts for {len(batch)} prompts")
+        except Exception as e:
+            with self._cond:
+                for job in batch:
+                    self._in_flight.pop(job.key, None)
+            for job in batch:
+                job.future.set_exception(e)
+            return
+
+        with self._cond:
+            self.counts["calls"] += 1
+            self.counts["generated"] += len(batch)
+            for job, text in zip(batch, texts):
+                if self.memo is not None:
+                    self.memo.set(job.key, text)
+                self._in_flight.pop(job.key, None)
+        for job, text in zip(batch, texts):
+            job.future.set_result(text)
+
+
+# ============================================================
+# MODULE API
+# ============================================================
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            memo = JournalIndex(output_path(MEMO_PATH)) if TEXT_MODEL_MEMO else None
+            _batcher = TextBatcher(BACKENDS[TEXT_MODEL_BACKEND](), memo=memo)
+        return _batcher
+
+
+def set_backend(backend, **kw):
+    """Swap in a backend instance (e.g. in a script); resets the batcher."""
+    global _batcher
+    with _batcher_lock:
+        memo = JournalIndex(output_path(MEMO_PATH)) if TEXT_MODEL_MEMO else None
+        _batcher = TextBatcher(backend, memo=memo, **kw)
+        return _batcher
+
+
+def model_id():
+    """Identifies the active model — part of downstream build-cache keys."""
+    return get_batcher().backend.model
+
+
+def text_model_batch(prompts, timeout=TEXT_MODEL_TIMEOUT, **params):
+    """Texts for prompts, in order (memoized, coalesced and batched)."""
+    return get_batcher().generate(list(prompts), params, timeout)
+
+
+def text_model(prompt, **params):
+    return text_model_batch([prompt], **params)[0]
+
+
+def text_model_stream(prompt, **params):
+    """Chunks of the text for prompt, as they are generated."""
+    return get_batcher().stream(prompt, params)
+
+
+def stats():
+    return dict(get_batcher().counts)
@@ -0,0 +1,334 @@
+# pipeline/tracing.py
+"""
+Stage Tracing
+- span() / traced() record start, duration, bytes written and outcome
+- write_trace() emits Chrome trace JSON (chrome://tracing, ui.perfetto.dev).
+  Raw events are spooled to a temp file every SPOOL_EVERY spans and
+  streamed into the trace at the end, so memory stays flat however many
+  items a batch runs; only per-span aggregates are kept in memory
+- summary() / print_summary() give p50/p95 per span name
+- Opt-in per-stage profiling: PIPELINE_PROFILE="qc,image.*" (fnmatch patterns)
+  with PIPELINE_PROFILE_MODE=cprofile (default) or sample
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import fnmatch
+import tempfile
+import cProfile
+import threading
+import functools
+from collections import deque, defaultdict, Counter
+from contextlib import contextmanager
+
+from . import events
+from .paths import output_path, output_dir
+
+# Relative to the output root
+TRACE_PATH = os.path.join("trace", "trace.json")
+PROFILE_DIR = os.path.join("trace", "profiles")
+
+ENABLED = os.getenv("TRACE", "1") != "0"
+MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "200000"))  # later events are counted, not written
+MAX_SAMPLES_PER_SPAN = 10000
+SPOOL_EVERY = 1024  # events held in memory before they are appended to the spool
+
+PROFILE_PATTERNS = [p.strip() for p in os.getenv("PIPELINE_PROFILE", "").split(",") if p.strip()]
+PROFILE_MODE = os.getenv("PIPELINE_PROFILE_MODE", "cprofile")
+SAMPLE_INTERVAL = float(os.getenv("PIPELINE_PROFILE_INTERVAL", "0.005"))
+
+# Span categories forwarded to live clients (pipeline/events.py); the
+# per-check QC spans are too fine-grained to be worth streaming
+LIVE_CATS = {"stage", "item", "provider", "image", "seo", "dashboard"}
+
+_lock = threading.Lock()
+_events = []           # recorded since the last spool
+_spool_lock = threading.Lock()
+_spool = None          # temp file of earlier events, one JSON object per line
+_spooled = 0
+_dropped = 0
+_durations = defaultdict(lambda: deque(maxlen=MAX_SAMPLES_PER_SPAN))
+_outcomes = defaultdict(Counter)
+_bytes = Counter()
+_thread_names = {}
+_t0 = time.perf_counter()
+_profile_seq = 0
+
+
+# ============================================================
+# SPANS
+# ============================================================
+
+class Span:
+    """Handle yielded by span(); call set() to attach bytes/outcome/args."""
+
+    __slots__ = ("name", "cat", "args")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **kwargs):
+        self.args.update(kwargs)
+        return self
+
+
+def _record(s, start, end):
+    tid = threading.get_ident()
+    outcome = s.args.setdefault("outcome", "ok")
+    nbytes = s.args.get("bytes") or 0
+
+    with _lock:
+        if tid not in _thread_names:
+            _thread_names[tid] = threading.current_thread().name
+        _events.append({
+            "name": s.name,
+            "cat": s.cat,
+            "ph": "X",
+            "ts": (start - _t0) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": s.args,
+        })
+        _durations[s.name].append(end - start)
+        _outcomes[s.name][outcome] += 1
+        _bytes[s.name] += nbytes
+        batch = None
+        if len(_events) >= SPOOL_EVERY:
+            batch, _events[:] = list(_events), []
+
+    if batch:
+        _spool_events(batch)
+
+    if events.enabled and s.cat in LIVE_CATS:
+        data = {k: v for k, v in s.args.items() if isinstance(v, (str, int, float, bool))}
+        data.update(name=s.name, cat=s.cat, ms=round((end - start) * 1000, 2))
+        events.publish("span", **data)
+
+
+def _spool_events(batch):
+    """Append events to the spool file (up to MAX_EVENTS in total)."""
+    global _spool, _spooled, _dropped
+    with _spool_lock:
+        keep = batch[:max(0, MAX_EVENTS - _spooled)]
+        _dropped += len(batch) - len(keep)
+        if not keep:
+            return
+        if _spool is None:
+            _spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        _spool.write("".join(json.dumps(e, default=str) + "\n" for e in keep))
+        _spooled += len(keep)
+
+
+@contextmanager
+def span(name, cat="stage", **args):
+    """
+    Time a block. Exceptions are recorded as outcome='error' and re-raised.
+
+        with span("image.huggingface", cat="provider", slug=slug) as s:
+            ...
+            s.set(bytes=size, outcome="miss")
+    """
+    s = Span(name, cat, args)
+    if not ENABLED:
+        yield s
+        return
+
+    profiler = _start_profile(name)
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.args["outcome"] = "error"
+        s.args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        end = time.perf_counter()
+        if profiler:
+            profiler.stop()
+        _record(s, start, end)
+
+
+def traced(name=None, cat="stage"):
+    """Decorator form of span()."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            with span(label, cat=cat):
+                return fn(*a, **kw)
+        return inner
+    return wrap
+
+
+# ============================================================
+# OPT-IN PROFILING
+# ============================================================
+
+def _profile_path(name, ext):
+    global _profile_seq
+    with _lock:
+        _profile_seq += 1
+        seq = _profile_seq
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+    return os.path.join(output_dir(PROFILE_DIR), f"{safe}-{os.getpid()}-{seq}.{ext}")
+
+
+class _CProfileHook:
+    def __init__(self, name):
+        self.name = name
+        self.prof = cProfile.Profile()
+        self.prof.enable()
+
+    def stop(self):
+        self.prof.disable()
+        self.prof.dump_stats(_profile_path(self.name, "prof"))
+
+
+class _SamplingHook:
+    """
+    Samples the span's thread stack every SAMPLE_INTERVAL seconds and
+    writes collapsed stacks (.folded — flamegraph.pl / speedscope format).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.tid = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"sampler-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.tid)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        with open(_profile_path(self.name, "folded"), "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _start_profile(name):
+    if not PROFILE_PATTERNS:
+        return None
+    if not any(fnmatch.fnmatch(name, p) for p in PROFILE_PATTERNS):
+        return None
+    try:
+        return _SamplingHook(name) if PROFILE_MODE == "sample" else _CProfileHook(name)
+    except ValueError:
+        # Another profiler is already active (cProfile is one-at-a-time on 3.12+)
+        return None
+
+
+# ============================================================
+# OUTPUT
+# ============================================================
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    idx = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[idx]
+
+
+def summary():
+    """Per span name: count, p50/p95/max seconds, total bytes and outcomes."""
+    with _lock:
+        snapshot = {k: sorted(v) for k, v in _durations.items()}
+        outcomes = {k: dict(v) for k, v in _outcomes.items()}
+        nbytes = dict(_bytes)
+
+    rows = []
+    for name, values in snapshot.items():
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1] if values else 0.0,
+            "total": sum(values),
+            "bytes": nbytes.get(name, 0),
+            "outcomes": outcomes.get(name, {}),
+        })
+    rows.sort(key=lambda r: -r["total"])
+    return rows
+
+
+def print_summary(rows=None):
+    rows = summary() if rows is None else rows
+    if not rows:
+        return
+
+    print("\n⏱️ Trace summary (seconds):")
+    print(f"   {'span':<28} {'n':>6} {'p50':>8} {'p95':>8} {'max':>8} {'bytes':>12}  outcomes")
+    for r in rows:
+        outcomes = ", ".join(f"{k}={v}" for k, v in sorted(r["outcomes"].items()))
+        print(
+            f"   {r['name']:<28} {r['count']:>6} {r['p50']:>8.3f} {r['p95']:>8.3f} "
+            f"{r['max']:>8.3f} {r['bytes']:>12}  {outcomes}"
+        )
+
+
+def write_trace(path=None):
+    """Write Chrome trace JSON plus a sibling *.summary.json; return the path."""
+    path = path or output_path(TRACE_PATH)
+    with _lock:
+        batch, _events[:] = list(_events), []
+        threads = dict(_thread_names)
+    _spool_events(batch)
+
+    pid = os.getpid()
+    meta = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+        for tid, tname in threads.items()
+    ]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f, _spool_lock:
+        f.write('{"traceEvents":[')
+        f.write(",".join(json.dumps(m) for m in meta))
+        if _spool is not None:
+            _spool.seek(0)
+            for i, line in enumerate(_spool):
+                f.write("," if meta or i else "")
+                f.write(line.rstrip("\n"))
+            _spool.seek(0, os.SEEK_END)
+        f.write('],"displayTimeUnit":"ms"}')
+    if _dropped:
+        print(f"⚠️ Trace: {_dropped} events past TRACE_MAX_EVENTS were not written")
+
+    with open(os.path.splitext(path)[0] + ".summary.json", "w") as f:
+        json.dump(summary(), f, indent=2)
+
+    print("🧭 Trace written →", path)
+    return path
+
+
+def reset():
+    global _spool, _spooled, _dropped
+    with _spool_lock:
+        if _spool is not None:
+            _spool.close()
+        _spool, _spooled, _dropped = None, 0, 0
+    with _lock:
+        _events.clear()
+        _durations.clear()
+        _outcomes.clear()
+        _bytes.clear()
@@ -0,0 +1,239 @@
+# pipeline/transport.py
+"""
+Shared HTTP Transport
+- One pooled keep-alive requests.Session per host (no handshake per image)
+- Retries with jittered exponential backoff on 5xx / connection errors
+- Honors 429 Retry-After and HuggingFace 503 {"estimated_time": ...}
+- Token-bucket rate limit per provider, sized for free-tier quotas
+Every wait stays inside the caller's timeout, so the image deadline and
+hedging in ai_generator keep working. A cancel event (threading.Event)
+stops a call at its next wait or retry, e.g. once a hedged race has a winner.
+"""
+
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+# `requests` is imported lazily (see _session) to keep `import pipeline` cheap.
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "20"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# ============================================================
+# RATE LIMITS (requests per minute, burst). 0 = unlimited.
+# ============================================================
+
+def _rate(env, default):
+    return float(os.getenv(env, str(default)))
+
+
+RATE_LIMITS = {
+    "huggingface": (_rate("HF_RATE_PER_MIN", 30), 5),     # HF serverless free tier
+    "local_sd": (_rate("LOCAL_SD_RATE_PER_MIN", 0), 1),   # your own GPU
+    "stock": (_rate("STOCK_RATE_PER_MIN", 120), 10),      # Pexels / Unsplash hotlinks
+}
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst=1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline=None, cancel=None):
+        """Take one token, sleeping as needed. False if deadline passes or cancel is set first."""
+        if self.rate <= 0:
+            return True
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            if _sleep(wait, cancel):
+                return False
+
+
+_buckets = {}
+_sessions = {}
+_lock = threading.Lock()
+_stats = {}
+
+
+def _sleep(seconds, cancel=None):
+    """Sleep; True if cancel was set meanwhile (returns early)."""
+    if cancel is None:
+        time.sleep(seconds)
+        return False
+    return cancel.wait(seconds)
+
+
+def _bucket(provider):
+    with _lock:
+        if provider not in _buckets:
+            per_minute, burst = RATE_LIMITS.get(provider, (0, 1))
+            _buckets[provider] = TokenBucket(per_minute, burst)
+        return _buckets[provider]
+
+
+def _session(url):
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount(host, adapter)
+            _sessions[host] = session
+        return session
+
+
+def _count(provider, key, amount=1):
+    with _lock:
+        row = _stats.setdefault(provider, {"requests": 0, "retries": 0, "throttled_s": 0.0})
+        row[key] += amount
+
+
+def stats():
+    """{provider: {"requests", "retries", "throttled_s"}} since start-up."""
+    with _lock:
+        return {k: dict(v) for k, v in _stats.items()}
+
+
+def configure_rate_limit(provider, per_minute, burst=1):
+    """Override a provider's quota (0 disables limiting)."""
+    with _lock:
+        RATE_LIMITS[provider] = (per_minute, burst)
+        _buckets.pop(provider, None)
+
+
+# ============================================================
+# RETRY POLICY
+# ============================================================
+
+def backoff(attempt):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _server_wait(response):
+    """Seconds the server asked us to wait (Retry-After / HF estimated_time), or None."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    if response.status_code == 503:
+        try:
+            estimated = response.json().get("estimated_time")
+            if estimated is not None:
+                return float(estimated)
+        except (ValueError, AttributeError):
+            pass
+
+    return None
+
+
+def _cancelled(cancel):
+    return cancel is not None and cancel.is_set()
+
+
+def _refused(error):
+    """Nothing listening (e.g. local SD not started) — retrying won't help."""
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, ConnectionRefusedError) or "Connection refused" in str(reason)
+
+
+def request(method, url, provider="default", timeout=60, retries=None, cancel=None, **kwargs):
+    """
+    requests.request() over a pooled session with rate limiting and retries.
+
+    `timeout` is the budget for the whole call including waits and retries.
+    Returns the last response (callers still check status_code) or raises
+    the last connection error. Returns None if the rate limiter could not
+    grant a slot within the budget, or once `cancel` is set (checked before
+    each attempt, during waits and when a response arrives).
+    """
+    import requests
+
+    deadline = time.monotonic() + timeout
+    retries = MAX_RETRIES if retries is None else retries
+    session = _session(url)
+    bucket = _bucket(provider)
+
+    attempt = 0
+    while True:
+        t0 = time.monotonic()
+        if not bucket.acquire(deadline, cancel):
+            _count(provider, "throttled_s", time.monotonic() - t0)
+            if not _cancelled(cancel):
+                print(f"⏳ {provider}: rate limit budget exhausted")
+            return None
+        _count(provider, "throttled_s", time.monotonic() - t0)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or _cancelled(cancel):
+            return None
+
+        _count(provider, "requests")
+        response = None
+        try:
+            response = session.request(method, url, timeout=remaining, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if _cancelled(cancel):
+                return None
+            if attempt >= retries or _refused(e):
+                raise
+            error = e
+            wait = backoff(attempt)
+        else:
+            if _cancelled(cancel):
+                response.close()
+                return None
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            server_wait = _server_wait(response)
+            wait = backoff(attempt) if server_wait is None else server_wait + random.uniform(0, BACKOFF_BASE)
+
+        if time.monotonic() + wait >= deadline:
+            # Not worth waiting — let the caller fall through to the next provider.
+            if response is not None:
+                return response
+            raise error
+
+        if response is not None:
+            response.close()  # hand the connection back to the pool
+        _count(provider, "retries")
+        if _sleep(wait, cancel):
+            return None
+        attempt += 1
+
+
+def get(url, provider="default", timeout=60, **kwargs):
+    return request("GET", url, provider=provider, timeout=timeout, **kwargs)
+
+
+def post(url, provider="default", timeout=60, **kwargs):
+    return request("POST", url, provider=provider, timeout=timeout, **kwargs)
@@ -1,41 +1,137 @@
+import argparse
+
 from pipeline.scrapers.news_scraper import scrape_news
+from pipeline.scrapers.trends_scraper import scrape_google_trends
+from pipeline.scrapers.competitor_scraper import scrape_competitors
 from pipeline.ai_generator import (
     generate_web_copy,
     generate_blog,
     generate_social_posts,
     generate_ads
 )
-from pipeline.qc import run_quality_checks
+from pipeline.qc_runner import run_corpus_qc
+from pipeline.seo_generator import SEOGenerator
 from pipeline.dashboard import build_dashboard
+from pipeline.derivatives import build_derivatives
+from pipeline.scheduler import Stage, run_stages, print_summary, DEFAULT_WORKERS
+from pipeline.build_cache import build_cache
+from pipeline.image_cache import image_cache
+from pipeline import tracing
+from pipeline.live_server import LIVE_PORT, start_live_server, serve_until_interrupted
+from pipeline.paths import set_output_root, output_path
+
+
+# ============================================================
+# STAGE FUNCTIONS
+# ============================================================
+
+def run_qc(**_):
+    print("\n🔎 Running Quality Checks...")
+    summary = run_corpus_qc()
+    print(f"🔎 QC: {summary['documents']} documents ({summary['checked']} checked, "
+          f"{summary['cached']} cached) → {output_path('qc')}")
+    return summary
+
+
+def run_derivatives(web_copy, blog, social):
+    images = [web_copy.get("image"), blog.get("image"), social.get("image")]
+    built = build_derivatives(images)
+    print(f"🖼️ Derivatives ready for {sum(1 for m in built.values() if m)} images")
+    return built
+
+
+def run_seo(web_copy, blog, qc, derivatives):
+    seo = SEOGenerator()
+    seo.generate_schema({**web_copy, "type": "web"})
+    seo.generate_schema({**blog, "type": "blog"})
+    seo.generate_sitemap()
+
+
+def run_dashboard(**_):
+    print("\n📊 Building dashboard...")
+    build_dashboard()
+
+
+# ============================================================
+# STAGE GRAPH
+# scrape → generate (fan-out) → QC / derivatives → SEO → dashboard
+# ============================================================
+
+SCRAPE = ("scrape_news", "scrape_trends", "scrape_competitors")
+
+STAGES = [
+    Stage("scrape_news", scrape_news, label="📰 Scrape industry news"),
+    Stage("scrape_trends", scrape_google_trends, label="📈 Scrape Google Trends"),
+    Stage("scrape_competitors", scrape_competitors, label="🏷️ Scrape competitors"),
+
+    Stage("web_copy", lambda **_: generate_web_copy(), SCRAPE, label="✍️ Web copy"),
+    Stage("blog", lambda **_: generate_blog(), SCRAPE, label="📝 Blog"),
+    Stage("social", lambda **_: generate_social_posts(), SCRAPE, label="📣 Social posts"),
+    Stage("ads", lambda **_: generate_ads(), SCRAPE, label="💡 Ad snippets"),
+
+    Stage("qc", run_qc, ("web_copy", "blog", "social", "ads"), label="🔎 Quality checks"),
+    Stage("derivatives", run_derivatives, ("web_copy", "blog", "social"), label="🖼️ Image derivatives"),
+    Stage("seo", run_seo, ("web_copy", "blog", "qc", "derivatives"), label="🗺️ SEO"),
+    Stage("dashboard", run_dashboard, ("seo", "social", "ads"), label="📊 Dashboard"),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Calyco content pipeline.")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="Max stages running concurrently (default: $PIPELINE_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Ignore the incremental build cache and regenerate everything"
+    )
+    parser.add_argument(
+        "--trace", default=None,
+        help="Chrome trace output path (default: <output root>/trace/trace.json)"
+    )
+    parser.add_argument(
+        "--output-root", default=None,
+        help="Where artifacts are written (default: $CALYCO_OUTPUT_ROOT or outputs)"
+    )
+    parser.add_argument(
+        "--serve", nargs="?", type=int, const=LIVE_PORT, default=None, metavar="PORT",
+        help="Serve the dashboard with live progress during and after the run "
+             "(default port: $LIVE_PORT or 8700)"
+    )
+    args = parser.parse_args(argv)
 
-print("🚀 Running Calyco Free-Tier Demo Pipeline...\n")
+    if args.output_root:
+        set_output_root(args.output_root)
 
-# 1. Scrape basic industry news (local demo)
-scrape_news()
+    server = start_live_server(port=args.serve) if args.serve is not None else None
+    if server:
+        print(f"📡 Live dashboard → {server.url}")
 
-# 2. Web copy
-print("✍️ Generating web copy...")
-web_copy = generate_web_copy()
+    if args.rebuild:
+        build_cache.enabled = False
 
-# 3. Blog
-print("\n📝 Generating blog...")
-blog = generate_blog()
+    print("🚀 Running Calyco Free-Tier Demo Pipeline...\n")
 
-# 4. Social posts
-print("\n📣 Generating social content...")
-social = generate_social_posts()
+    results = run_stages(STAGES, max_workers=args.workers)
+    build_cache.flush()
+    image_cache.flush()
+    print_summary(results)
+    tracing.print_summary()
+    tracing.write_trace(args.trace)
+    print(f"♻️ Build cache: {build_cache.hits} hits, {build_cache.misses} misses")
+    print(f"🖼️ Image cache: {image_cache.hits} hits, {image_cache.misses} misses, "
+          f"{image_cache.evictions} evicted")
 
-# 5. Ads
-print("\n💡 Generating ad snippets...")
-ads = generate_ads()
+    if results.ok:
+        print("\n🎉 Pipeline Complete — Free Image + Full Automation Ready!")
+    else:
+        print("\n⚠️ Pipeline finished with failures:", ", ".join(sorted(results.errors)))
 
-# 6. QC
-print("\n🔎 Running Quality Checks...")
-qc_web = run_quality_checks(web_copy["body"])
-qc_blog = run_quality_checks(blog["body"])
+    if server:
+        serve_until_interrupted(server)
+    return 0 if results.ok else 1
 
-# 7. Dashboard
-print("\n📊 Building dashboard...")
-build_dashboard()
 
-print("\n🎉 Pipeline Complete — Free Image + Full Automation Ready!")
+if __name__ == "__main__":
+    raise SystemExit(main())
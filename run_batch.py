@@ -0,0 +1,94 @@
+import argparse
+
+from pipeline.batch import run_manifest
+from pipeline.build_cache import build_cache
+from pipeline.dashboard import build_dashboard
+from pipeline.image_cache import image_cache
+from pipeline.live_server import LIVE_PORT, start_live_server, serve_until_interrupted
+from pipeline.qc_runner import run_corpus_qc
+from pipeline import tracing, transport, text_model
+from pipeline.paths import set_output_root
+from pipeline.scheduler import DEFAULT_WORKERS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate content for every item in a JSONL/CSV manifest."
+    )
+    parser.add_argument("manifest", help="Path to a .jsonl or .csv manifest")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="Items processed concurrently (default: $PIPELINE_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "--in-flight", type=int, default=None,
+        help="Max items read ahead of completion (default: 2 × workers)"
+    )
+    parser.add_argument(
+        "--results", default=None,
+        help="Where per-item results are streamed (default: <output root>/batch/results.jsonl)"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Ignore the incremental build cache and regenerate everything"
+    )
+    parser.add_argument(
+        "--trace", default=None,
+        help="Chrome trace output path (default: <output root>/trace/trace.json)"
+    )
+    parser.add_argument(
+        "--output-root", default=None,
+        help="Where artifacts are written (default: $CALYCO_OUTPUT_ROOT or outputs)"
+    )
+    parser.add_argument(
+        "--serve", nargs="?", type=int, const=LIVE_PORT, default=None, metavar="PORT",
+        help="Serve the dashboard with live item progress during and after the run "
+             "(default port: $LIVE_PORT or 8700)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.output_root:
+        set_output_root(args.output_root)
+
+    server = start_live_server(port=args.serve) if args.serve is not None else None
+    if server:
+        print(f"📡 Live dashboard → {server.url}")
+
+    if args.rebuild:
+        build_cache.enabled = False
+
+    print(f"🚀 Running batch manifest → {args.manifest}\n")
+
+    counts = run_manifest(args.manifest, args.results, args.workers, args.in_flight)
+    qc = run_corpus_qc()
+    if server:
+        build_dashboard()  # incremental; what the served page shows after the run
+    build_cache.flush()
+    image_cache.flush()
+    tracing.print_summary()
+    tracing.write_trace(args.trace)
+
+    print(
+        f"\n📦 Batch complete: {counts['ok']} ok, {counts['error']} failed "
+        f"in {counts['elapsed']:.1f}s ({counts['items_per_sec']:.1f} items/s)"
+    )
+    print(f"🖼️ Image cache: {image_cache.hits} hits, {image_cache.misses} misses, "
+          f"{image_cache.evictions} evicted")
+    for provider, h in sorted(transport.stats().items()):
+        print(f"🌐 {provider}: {h['requests']} requests, {h['retries']} retries, "
+              f"{h['throttled_s']:.1f}s waiting on rate limits")
+    t = text_model.stats()
+    print(f"📝 Text model: {t['prompts']} prompts → {t['calls']} calls "
+          f"({t['memo_hits']} memoized, {t['coalesced']} coalesced)")
+    if t["aborted"]:
+        print(f"🛑 {t['aborted']} of {t['streamed']} streamed drafts aborted by QC "
+              f"({t['wasted_chars']} chars generated before the stop)")
+    print(f"🔎 QC reports: {qc['documents']} documents ({qc['checked']} checked, {qc['cached']} cached)")
+    print("Results →", counts["results_path"])
+    if server:
+        serve_until_interrupted(server)
+    return 0 if counts["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
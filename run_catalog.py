@@ -0,0 +1,54 @@
+import argparse
+
+from pipeline import tracing
+from pipeline.catalog import run_catalog, CATALOG_WORKERS, CATALOG_CHUNK
+from pipeline.paths import set_output_root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Emit schema.org JSON-LD for every row of a CSV/JSONL product catalog."
+    )
+    parser.add_argument("catalog", help="Path to a .jsonl or .csv catalog (one row per SKU)")
+    parser.add_argument(
+        "--workers", type=int, default=CATALOG_WORKERS,
+        help="Worker processes (default: $CATALOG_WORKERS or CPU count; 1 runs inline)"
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=CATALOG_CHUNK,
+        help="Rows per worker task (default: $CATALOG_CHUNK or 1000)"
+    )
+    parser.add_argument(
+        "--ndjson-only", action="store_true",
+        help="Skip the per-slug files and only write catalog.ndjson"
+    )
+    parser.add_argument(
+        "--trace", default=None,
+        help="Chrome trace output path (default: <output root>/trace/trace.json)"
+    )
+    parser.add_argument(
+        "--output-root", default=None,
+        help="Where artifacts are written (default: $CALYCO_OUTPUT_ROOT or outputs)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.output_root:
+        set_output_root(args.output_root)
+
+    print(f"🛒 Building catalog JSON-LD → {args.catalog}\n")
+
+    counts = run_catalog(args.catalog, args.workers, args.chunk, files=not args.ndjson_only)
+    tracing.write_trace(args.trace)
+
+    print(
+        f"📦 Catalog complete: {counts['documents']} documents, {counts['errors']} rejected "
+        f"in {counts['elapsed']:.1f}s ({counts['docs_per_sec']:.0f} docs/s)"
+    )
+    print("NDJSON →", counts["ndjson_path"])
+    if counts["errors"]:
+        print("Rejected rows →", counts["errors_path"])
+    return 0 if counts["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Brand-rule matcher benchmark: compiled trie regex vs the old per-phrase scan.
+Run from project root: python scripts/bench_brand_rules.py [--mb 1,5] [--rules 300]
+
+The rules are docs/brand_rules.md plus synthetic multi-word phrases; the
+corpus is random vocabulary with a few phrases planted in it.
+
+  naive     old enforce_brand_rules: lower() + substring test per phrase
+  alt       one regex, plain alternation of every phrase
+  trie      BrandRules: one regex built from the phrase prefix trie
+"""
+
+import os, sys, time, random, argparse, statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.brand_rules import BrandRules, load_rules, canonical
+
+VOCAB = (
+    "paint wall colour finish coverage washable matte satin emulsion primer "
+    "interior exterior durable modern low voc eco friendly brush roller coat "
+    "room home ceiling texture shade palette warm cool neutral bold"
+).split()
+
+
+def synthetic_rules(n, rng):
+    stems = ["auto", "gen", "bot", "synth", "neuro", "robo", "deep", "meta", "cyber", "algo"]
+    rules = set()
+    while len(rules) < n:
+        words = [rng.choice(stems) + rng.choice(VOCAB) for _ in range(rng.randint(1, 3))]
+        rules.add(" ".join(words))
+    return sorted(rules)
+
+
+def corpus(mb, phrases, rng):
+    words, size = [], 0
+    while size < mb * 1024 * 1024:
+        w = rng.choice(phrases) if rng.random() < 0.0005 else rng.choice(VOCAB)
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)
+
+
+def naive(phrases, text):
+    return [p for p in phrases if p.lower() in text.lower()]
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return statistics.median(times)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", default="1,5")
+    ap.add_argument("--rules", type=int, default=300)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    phrases = list(load_rules().rules.values()) + synthetic_rules(args.rules, rng)
+
+    t = time.perf_counter()
+    rules = BrandRules(phrases)
+    compile_ms = (time.perf_counter() - t) * 1000
+
+    import re
+    alt = re.compile(r"(?<!\w)(?:" + "|".join(
+        re.escape(canonical(p)).replace(r"\ ", r"[\s\-]+") for p in phrases) + r")(?!\w)")
+
+    print(f"{len(rules)} rules, compiled in {compile_ms:.1f} ms\n")
+    print(f"{'MB':>4} {'naive s':>8} {'alt s':>7} {'trie s':>7} {'trie MB/s':>10} {'matches':>8}")
+    for mb in (float(x) for x in args.mb.split(",")):
+        text = corpus(mb, phrases, rng)
+        matches = len(rules.scan(text))
+        t_naive = timed(lambda: naive(phrases, text), args.runs)
+        t_alt = timed(lambda: sum(1 for _ in alt.finditer(text.lower())), args.runs)
+        t_trie = timed(lambda: rules.scan(text), args.runs)
+        print(f"{mb:>4g} {t_naive:>8.3f} {t_alt:>7.3f} {t_trie:>7.3f} {mb / t_trie:>10.1f} {matches:>8}")
+
+
+if __name__ == "__main__":
+    main()
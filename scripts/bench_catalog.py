@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Catalog JSON-LD benchmark: docs/sec and peak RSS vs catalog size.
+Run from project root: python scripts/bench_catalog.py [--sizes 1000,10000,100000 --workers 1,4]
+
+Writes a synthetic JSONL catalog (SKUs across shades × finishes × sizes,
+with every 20th row a blog Article), then for each size and worker count
+runs a fresh child process through run_catalog() and reports docs/sec and
+the parent's peak RSS, which should stay flat as the catalog grows
+("ndjson" skips the per-slug files, i.e. serializer throughput). The
+"per-call" row times the old path: write_jsonld_for_web_copy() per SKU
+(pretty-printed, one open/dump per call) on the smallest size.
+"""
+
+import os, sys, json, time, random, argparse, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench_memory import peak_rss_mb  # noqa: E402
+
+SHADES = ["Ivory Mist", "Coastal Blue", "Terracotta", "Sage Leaf", "Charcoal", "Blush Pink"]
+FINISHES = ["Matte", "Satin", "Gloss", "Eggshell"]
+SIZES = ["1L", "4L", "10L", "20L"]
+
+
+def write_catalog(path, n):
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        for i in range(n):
+            if i % 20 == 0:
+                row = {"type": "blog", "title": f"Choosing paint for room {i}",
+                       "description": "How to pick an interior wall paint that lasts."}
+            else:
+                row = {"sku": f"CAL-{i:07d}", "name": "Calyco Interior Emulsion",
+                       "shade": rng.choice(SHADES), "finish": rng.choice(FINISHES),
+                       "size": rng.choice(SIZES), "price": round(rng.uniform(299, 4999), 2),
+                       "availability": rng.choice(["in_stock", "out_of_stock", "preorder"]),
+                       "category": "Interior Paint",
+                       "description": "Washable, low-VOC emulsion with rich coverage.",
+                       "image": f"https://calycopaints.com/images/{i}.webp"}
+            f.write(json.dumps(row) + "\n")
+
+
+def child(catalog, workers, root, files="1"):
+    from pipeline.paths import set_output_root
+    from pipeline.catalog import run_catalog
+
+    set_output_root(root)
+    counts = run_catalog(catalog, workers=workers, files=files == "1")
+    print(json.dumps({"docs": counts["documents"], "errors": counts["errors"],
+                      "docs_per_sec": counts["docs_per_sec"], "rss_mb": peak_rss_mb()}))
+
+
+def per_call(catalog, root):
+    from pipeline.paths import set_output_root
+    from pipeline.seo_generator import write_jsonld_for_web_copy
+
+    set_output_root(root)
+    rows = [json.loads(line) for line in open(catalog)]
+    t = time.perf_counter()
+    for row in rows:
+        write_jsonld_for_web_copy(row.get("sku") or row["title"], row.get("name") or row["title"],
+                                  row["description"])
+    print(json.dumps({"docs": len(rows), "errors": 0,
+                      "docs_per_sec": len(rows) / (time.perf_counter() - t), "rss_mb": peak_rss_mb()}))
+
+
+def run_child(*args):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *map(str, args)],
+                         check=True, capture_output=True, text=True, cwd=ROOT).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--workers", default="1,4")
+    ap.add_argument("--child", nargs="+")
+    args = ap.parse_args()
+
+    if args.child:
+        if args.child[0] == "per-call":
+            return per_call(*args.child[1:])
+        return child(args.child[0], int(args.child[1]), *args.child[2:])
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(f"{'mode':<10} {'rows':>8} {'docs':>8} {'docs/s':>9} {'RSS MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            catalog = os.path.join(tmp, f"catalog-{n}.jsonl")
+            write_catalog(catalog, n)
+            if n == sizes[0]:
+                r = run_child("per-call", catalog, os.path.join(tmp, "out-per-call"))
+                print(f"{'per-call':<10} {n:>8} {r['docs']:>8} {r['docs_per_sec']:>9.0f} {r['rss_mb']:>8.1f}")
+            for w in (int(x) for x in args.workers.split(",")):
+                r = run_child(catalog, w, os.path.join(tmp, f"out-{n}-{w}"))
+                print(f"{f'bulk w={w}':<10} {n:>8} {r['docs']:>8} {r['docs_per_sec']:>9.0f} {r['rss_mb']:>8.1f}")
+            r = run_child(catalog, 1, os.path.join(tmp, f"out-{n}-ndjson"), 0)
+            print(f"{'ndjson':<10} {n:>8} {r['docs']:>8} {r['docs_per_sec']:>9.0f} {r['rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Dashboard benchmark: full build, no-op rebuild and one changed artifact.
+Run from project root: python scripts/bench_dashboard.py [--items 10000]
+
+Writes synthetic blogs + web copy (recorded in the run manifest, as the
+generators do) and QC reports into a temp output root, then builds the
+dashboard three times and reports elapsed time, cards rebuilt, pages
+written and the size of the shell page vs all fragments.
+"""
+
+import os, sys, json, time, random, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.paths import set_output_root, output_file, output_path
+from pipeline.build_cache import build_cache
+
+WORDS = ("paint wall colour finish coverage washable matte satin emulsion primer interior "
+         "exterior durable modern eco friendly brush roller coat room home ceiling").split()
+
+
+def write_item(i, rng, version=1):
+    body = "".join(f"\n## Section {s}\n\n" + " ".join(rng.choice(WORDS) for _ in range(120)) + "\n"
+                   for s in range(4))
+    kind, folder, ext = (("blog", "blogs", ".md") if i % 2 else ("web_copy", "web_copy", ".json"))
+    slug = f"item-{i}"
+    output = {"title": f"Item {i} v{version}", "slug": slug, "description": body[20:140], "body": body}
+    path = output_file(folder, slug + ext)
+    with open(path, "w") as f:
+        f.write(body if ext == ".md" else json.dumps(output))
+    meta = {k: v for k, v in output.items() if k != "body"}
+    build_cache.record(f"{kind}:{slug}", str(version), meta, outputs=[path])
+    with open(output_file("qc", kind, f"{slug}.json"), "w") as f:
+        json.dump({"document": f"{kind}/{slug}", "result": {"readability_score": 50.0,
+                                                            "brand_violations": [], "seo_issues": []}}, f)
+
+
+def size_of(folder):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(folder) for f in fs)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=10000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        from pipeline.dashboard import build_dashboard
+
+        for i in range(args.items):
+            write_item(i, rng)
+        build_cache.flush()
+        print(f"{args.items} artifacts\n")
+
+        def step(label):
+            t = time.perf_counter()
+            build_dashboard()
+            print(f"  ↳ {label}: {time.perf_counter() - t:.2f}s\n")
+
+        step("full build")
+        step("no-op rebuild")
+        write_item(args.items // 2, rng, version=2)
+        step("one artifact changed")
+
+        shell = os.path.getsize(output_path("dashboard", "dashboard.html"))
+        data = size_of(output_path("dashboard", "data"))
+        print(f"shell page {shell / 1e3:.1f} KB, fragments {data / 1e6:.1f} MB total")
+
+
+if __name__ == "__main__":
+    main()
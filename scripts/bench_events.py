@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Live events overhead benchmark: cost on the pipeline's hot path.
+Run from project root: python scripts/bench_events.py [--events 200000 --clients 0,4,16]
+
+  span off     tracing.span() with no live server (events disabled)
+  span live    tracing.span() while events are published
+  publish      events.publish() alone, with N SSE clients connected that
+               never read their socket (the worst case: stalled browsers)
+
+Publishing must not slow down as stalled clients pile up.
+"""
+
+import os, sys, time, socket, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import events, tracing
+from pipeline.paths import set_output_root
+from pipeline.live_server import start_live_server, stop_live_server
+
+
+def per_op(fn, n):
+    t = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t) / n * 1e9
+
+
+def span_op(i):
+    with tracing.span("bench", cat="provider", slug="x"):
+        pass
+
+
+def stalled_client(server):
+    s = socket.create_connection(server.server_address[:2])
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    s.sendall(b"GET /events HTTP/1.1\r\nHost: bench\r\n\r\n")
+    return s  # never read from again
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200000)
+    ap.add_argument("--clients", default="0,4,16")
+    args = ap.parse_args()
+    n = args.events
+
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        print(f"{'case':<22} {'ns/op':>9}")
+        print(f"{'span off':<22} {per_op(span_op, n):>9.0f}")
+
+        server = start_live_server(port=0)
+        print(f"{'span live':<22} {per_op(span_op, n):>9.0f}")
+
+        clients = []
+        for k in (int(c) for c in args.clients.split(",")):
+            while len(clients) < k:
+                clients.append(stalled_client(server))
+            time.sleep(0.2)
+            cost = per_op(lambda i: events.publish("item", line=i, status="ok", slug="bench-item"), n)
+            print(f"{f'publish, {k} stalled':<22} {cost:>9.0f}")
+
+        for c in clients:
+            c.close()
+        stop_live_server(server)
+
+
+if __name__ == "__main__":
+    main()
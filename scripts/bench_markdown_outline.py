@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Markdown outline benchmark: cold parse vs cached outline_file() lookups.
+Run from project root: python scripts/bench_markdown_outline.py [--docs 5000]
+
+Writes synthetic ~800-word blogs into a temp output root, then outlines
+every file twice: cold (parsed, cache filled) and warm (answered from the
+content-hash cache without reading the files again).
+"""
+
+import os, sys, json, time, random, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.paths import set_output_root, output_file
+from pipeline.markdown_outline import outline_file
+
+KEYWORDS = ["home painting ideas", "interior wall paint", "trending paint colors"]
+WORDS = (
+    "paint wall colour finish coverage washable matte satin emulsion primer interior "
+    "exterior durable modern eco friendly brush roller coat room home ceiling texture "
+    "the a of and to for with your our #FFF #calyco"
+).split() + KEYWORDS
+
+
+def blog(i, rng):
+    parts = [f"# Post {i}\n"]
+    for s in range(6):
+        parts.append(f"\n## Section {s}\n\n")
+        for _ in range(3):
+            parts.append(" ".join(rng.choice(WORDS) for _ in range(45))
+                         + " [more](https://calycopaints.com).\n\n")
+    return "".join(parts)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=5000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        with open(output_file("raw", "google_trends.json"), "w") as f:
+            json.dump({"keywords": KEYWORDS}, f)
+        paths, size = [], 0
+        for i in range(args.docs):
+            text = blog(i, rng)
+            size += len(text)
+            paths.append(output_file("blogs", f"post-{i}.md"))
+            with open(paths[-1], "w") as f:
+                f.write(text)
+
+        print(f"{args.docs} blogs, {size / 1e6:.1f} MB\n")
+        print(f"{'pass':<6} {'elapsed s':>10} {'docs/s':>9} {'MB/s':>7}")
+        for name in ("cold", "warm"):
+            t = time.perf_counter()
+            outlines = [outline_file(p) for p in paths]
+            el = time.perf_counter() - t
+            print(f"{name:<6} {el:>10.3f} {args.docs / el:>9.0f} {size / 1e6 / el:>7.1f}")
+
+        doc = outlines[0]
+        print(f"\npost-0: {len(doc['headings'])} headings, {len(doc['paragraphs'])} paragraphs, "
+              f"{doc['links']} links, keywords {json.dumps({k: v['density'] for k, v in doc['keywords'].items()})}")
+
+
+if __name__ == "__main__":
+    main()
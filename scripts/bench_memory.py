@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Image ingestion memory benchmark: peak RSS vs concurrency.
+Run from project root: python scripts/bench_memory.py [--payload-mb 8 --concurrency 1,4,16]
+
+Starts pipeline.mock_server returning large images, then for each
+concurrency level runs a fresh child process that downloads images through
+  streaming  generate_image() (chunked, incremental base64, temp file + rename)
+  buffered   the old path: response.json() → b64decode → write
+and reports its peak RSS. Streaming should stay flat as concurrency rises;
+buffered grows with concurrency × image size.
+"""
+
+import os, sys, json, time, base64, argparse, resource, subprocess, tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def peak_rss_mb():
+    # VmHWM is reset on exec; ru_maxrss on Linux can carry over the parent's
+    # peak (here: the mock server's), so prefer it where available.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ============================================================
+# CHILD
+# ============================================================
+
+def _buffered(i):
+    import requests
+    from pipeline.ai_generator import HF_API_URL
+    from pipeline.paths import output_file
+
+    r = requests.post(HF_API_URL, json={"inputs": f"bench {i}"}, timeout=120)
+    data = base64.b64decode(r.json()["generated_image"])
+    with open(output_file("images", f"bench-{i}.png"), "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def _streaming(i):
+    from pipeline.ai_generator import generate_image
+    path = generate_image(f"bench {i}", f"bench-{i}")
+    return os.path.getsize(path) if path else 0
+
+
+def child(mode, concurrency, images, out_path):
+    import contextlib
+    from pipeline.paths import set_output_root
+
+    fn = _streaming if mode == "streaming" else _buffered
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                sizes = list(pool.map(fn, range(images)))
+        elapsed = time.perf_counter() - start
+
+    with open(out_path, "w") as f:
+        json.dump({
+            "mode": mode, "concurrency": concurrency, "images": images,
+            "ok": sum(1 for s in sizes if s), "elapsed": elapsed,
+            "baseline_mb": baseline, "peak_rss_mb": peak_rss_mb(),
+        }, f)
+
+
+# ============================================================
+# PARENT
+# ============================================================
+
+def run(mode, concurrency, images, env):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        out_path = tmp.name
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode,
+             "--concurrency", str(concurrency), "--images", str(images), "--out", out_path],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip()[-2000:])
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of image ingestion vs concurrency.")
+    parser.add_argument("--payload-mb", type=float, default=8.0)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--modes", default="streaming,buffered")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, int(args.concurrency), args.images, args.out)
+        return 0
+
+    from pipeline.mock_server import start_mock_server, provider_env
+
+    server, urls = start_mock_server(payload_bytes=int(args.payload_mb * 1024 * 1024))
+
+    print(f"{'mode':<10} {'conc':>5} {'images':>7} {'elapsed s':>10} {'start MB':>9} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ, PYTHONPATH=ROOT, BUILD_CACHE="0", IMAGE_CACHE_BYTES="0", IMAGE_DEDUP="off",
+            HF_RATE_PER_MIN="0", IMAGE_HEDGE_WORKERS="64",
+        )
+        env.update(provider_env(urls, os.path.join(tmp, "stock_images.json")))
+
+        for mode in args.modes.split(","):
+            for c in [int(x) for x in args.concurrency.split(",") if x]:
+                r = run(mode, c, max(args.images, c), env)
+                print(f"{mode:<10} {c:>5} {r['ok']:>7} {r['elapsed']:>10.2f} "
+                      f"{r['baseline_mb']:>9.1f} {r['peak_rss_mb']:>12.1f}")
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
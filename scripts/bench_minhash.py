@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Competitor index benchmark: MinHash/LSH queries vs a pairwise scan.
+Run from project root: python scripts/bench_minhash.py [--paragraphs 200000] [--queries 500]
+
+Indexes synthetic competitor paragraphs page by page (20 per add, as the
+scraper does) into a temp output root, then queries with edited copies of
+indexed paragraphs (planted overlaps) and with fresh text.
+
+  lsh       CompetitorIndex.overlaps (banded signatures, binary search)
+  scan      exact Jaccard of the query's shingles against every paragraph
+"""
+
+import os, sys, time, random, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.minhash import CompetitorIndex, words, shingles, COMPETITOR_OVERLAP
+
+VOCAB = [f"w{i}" for i in range(5000)] + (
+    "paint wall colour finish coverage washable matte satin emulsion primer interior "
+    "exterior durable modern eco friendly brush roller coat room home ceiling texture"
+).split()
+
+
+def paragraph(rng):
+    return " ".join(rng.choice(VOCAB) for _ in range(rng.randint(30, 80)))
+
+
+def edited(text, rng, changes=2):
+    tokens = text.split()
+    for _ in range(changes):
+        tokens[rng.randrange(len(tokens))] = rng.choice(VOCAB)
+    return " ".join(tokens)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paragraphs", type=int, default=200000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--scan", type=int, default=20, help="queries timed with the pairwise scan")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    corpus = [paragraph(rng) for _ in range(args.paragraphs)]
+
+    with tempfile.TemporaryDirectory() as root:
+        index = CompetitorIndex(root)
+        t = time.perf_counter()
+        for i in range(0, len(corpus), 20):
+            index.add(corpus[i:i + 20], url=f"https://example.com/p{i // 20}", brand="bench")
+        build = time.perf_counter() - t
+        print(f"indexed {len(index)} paragraphs in {build:.1f}s ({len(index) / build:.0f}/s), "
+              f"{len(index._runs)} runs")
+
+        t = time.perf_counter()
+        reloaded = CompetitorIndex(root)
+        len(reloaded)
+        print(f"reloaded from disk in {time.perf_counter() - t:.2f}s\n")
+
+        planted = [edited(corpus[rng.randrange(len(corpus))], rng) for _ in range(args.queries)]
+        fresh = [paragraph(rng) for _ in range(args.queries)]
+
+        t = time.perf_counter()
+        hits = sum(1 for q in planted if index.overlaps([q]))
+        false = sum(1 for q in fresh if index.overlaps([q]))
+        lsh = (time.perf_counter() - t) / (2 * args.queries)
+
+        sets = [set(shingles(words(p)).tolist()) for p in corpus]
+        t = time.perf_counter()
+        for q in planted[:args.scan]:
+            qs = set(shingles(words(q)).tolist())
+            max(len(qs & s) / len(qs | s) for s in sets)
+        scan = (time.perf_counter() - t) / args.scan
+
+        print(f"{'method':<6} {'ms/query':>9}")
+        print(f"{'lsh':<6} {lsh * 1000:>9.2f}")
+        print(f"{'scan':<6} {scan * 1000:>9.2f}")
+        print(f"\nspeedup {scan / lsh:.0f}x; planted overlaps found {hits}/{args.queries}, "
+              f"false positives {false}/{args.queries} (threshold {COMPETITOR_OVERLAP})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index benchmark: multi-index hash radius queries vs a linear scan.
+Run from project root: python scripts/bench_phash.py [--sizes 1000,10000,100000]
+
+Hashes are random 64-bit values and each query is a stored hash with up to
+--radius bits flipped, so the numbers reflect the index alone
+(image_hashes() cost is reported separately, on assets/placeholder.jpg).
+"""
+
+import os, sys, time, random, argparse, statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.phash import MultiIndexHash, hamming, image_hashes, PHASH_THRESHOLD
+
+
+def flip(value, bits):
+    for b in random.sample(range(64), bits):
+        value ^= 1 << b
+    return value
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--radius", type=int, default=PHASH_THRESHOLD)
+    args = ap.parse_args()
+
+    random.seed(0)
+    runs = []
+    for _ in range(20):
+        t = time.perf_counter()
+        image_hashes("assets/placeholder.jpg")
+        runs.append(time.perf_counter() - t)
+    print(f"image_hashes: {statistics.median(runs) * 1000:.2f} ms / image\n")
+
+    print(f"{'images':>8} {'build s':>8} {'index ms':>9} {'linear ms':>10} {'speedup':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        values = [random.getrandbits(64) for _ in range(n)]
+        queries = [flip(random.choice(values), random.randint(0, args.radius))
+                   for _ in range(args.queries)]
+
+        t = time.perf_counter()
+        index = MultiIndexHash()
+        for i, v in enumerate(values):
+            index.add(v, i)
+        build = time.perf_counter() - t
+
+        t = time.perf_counter()
+        index_hits = [len(index.search(q, args.radius)) for q in queries]
+        index_ms = (time.perf_counter() - t) * 1000 / len(queries)
+
+        t = time.perf_counter()
+        linear_hits = [sum(1 for v in values if hamming(q, v) <= args.radius) for q in queries]
+        linear_ms = (time.perf_counter() - t) * 1000 / len(queries)
+
+        assert index_hits == linear_hits, "index disagrees with linear scan"
+        print(f"{n:>8} {build:>8.2f} {index_ms:>9.3f} {linear_ms:>10.3f} {linear_ms / index_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
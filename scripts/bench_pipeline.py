@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Offline pipeline benchmark against local provider stand-ins.
+Run from project root: python scripts/bench_pipeline.py [--sizes 1,100,10000]
+
+Starts pipeline.mock_server, then runs the batch pipeline once per size in
+a fresh subprocess (so peak RSS is per run) with a throwaway output root
+and the build cache disabled. Reports items/sec, per-stage p50/p95 and
+peak RSS. --save/--baseline store and compare results to catch regressions.
+"""
+
+import os, sys, json, time, argparse, resource, subprocess, tempfile, contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+KINDS = ("web_copy", "blog", "social", "ads")
+STAGES_OF_INTEREST = (
+    "batch.item", "generate_image", "image.huggingface", "image.local_sd",
+    "image.stock", "image.placeholder", "qc", "seo.schema",
+)
+
+
+def peak_rss_mb():
+    # VmHWM is reset on exec; ru_maxrss on Linux can carry over the parent's
+    # peak (here: the mock server's), so prefer it where available.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ============================================================
+# CHILD: one measured run
+# ============================================================
+
+def child(n, out_path, workers):
+    from pipeline.paths import set_output_root
+    from pipeline.batch import run_batch
+    from pipeline import tracing, transport
+
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        rows = ({"type": KINDS[i % len(KINDS)], "title": f"Bench item {i}"} for i in range(n))
+
+        errors = 0
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for result in run_batch(rows, workers=workers):
+                errors += result["status"] != "ok"
+        elapsed = time.perf_counter() - start
+
+    stages = {r["name"]: r for r in tracing.summary() if r["name"] in STAGES_OF_INTEREST}
+    with open(out_path, "w") as f:
+        json.dump({
+            "items": n,
+            "errors": errors,
+            "elapsed": elapsed,
+            "items_per_sec": n / elapsed if elapsed else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+            "http": transport.stats(),
+        }, f)
+
+
+# ============================================================
+# PARENT: mock server + table
+# ============================================================
+
+def run_size(n, env, workers):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        out_path = tmp.name
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(n),
+             "--out", out_path, "--workers", str(workers)],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip()[-2000:])
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(out_path)
+
+
+def print_report(results):
+    print(f"\n{'items':>7} {'items/s':>9} {'elapsed s':>10} {'errors':>7} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"{r['items']:>7} {r['items_per_sec']:>9.1f} {r['elapsed']:>10.2f} "
+              f"{r['errors']:>7} {r['peak_rss_mb']:>12.1f}")
+
+    for r in results:
+        for provider, h in sorted(r.get("http", {}).items()):
+            print(f"   {r['items']} items · {provider}: {h['requests']} requests, "
+                  f"{h['retries']} retries, {h['throttled_s']:.1f}s rate-limited")
+
+    for r in results:
+        print(f"\n⏱️ {r['items']} items — per-stage latency (ms)")
+        print(f"   {'stage':<20} {'n':>7} {'p50':>9} {'p95':>9}")
+        for name in STAGES_OF_INTEREST:
+            s = r["stages"].get(name)
+            if s:
+                print(f"   {name:<20} {s['count']:>7} {s['p50'] * 1000:>9.2f} {s['p95'] * 1000:>9.2f}")
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {r["items"]: r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        b = baseline.get(r["items"])
+        if not b:
+            continue
+        if r["items_per_sec"] < b["items_per_sec"] * (1 - tolerance):
+            regressions.append(f"{r['items']} items: {b['items_per_sec']:.1f} → {r['items_per_sec']:.1f} items/s")
+        if r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{r['items']} items: RSS {b['peak_rss_mb']:.0f} → {r['peak_rss_mb']:.0f} MB")
+
+    if regressions:
+        print("\n🚨 Regressions vs baseline:")
+        for line in regressions:
+            print("   " + line)
+        return 1
+    print("\n✅ No regressions vs baseline")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline throughput benchmark.")
+    parser.add_argument("--sizes", default="1,100,10000")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--loading-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of mock calls answered with 429")
+    parser.add_argument("--hf-rate-per-min", type=float, default=0.0,
+                        help="Client-side HF quota to simulate (0 = unlimited)")
+    parser.add_argument("--save", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against a previously saved results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.out, args.workers)
+        return 0
+
+    from pipeline.mock_server import start_mock_server, provider_env
+
+    server, urls = start_mock_server(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, loading_rate=args.loading_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        payload_bytes=args.payload_bytes, seed=42,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ, BUILD_CACHE="0", IMAGE_CACHE_BYTES="0", IMAGE_DEDUP="off", PYTHONPATH=ROOT,
+            HF_RATE_PER_MIN=str(args.hf_rate_per_min), STOCK_RATE_PER_MIN="0",
+        )
+        env.update(provider_env(urls, os.path.join(tmp, "stock_images.json")))
+
+        results = []
+        for n in [int(x) for x in args.sizes.split(",") if x]:
+            print(f"▶️ {n} items ...", flush=True)
+            results.append(run_size(n, env, args.workers))
+
+    server.shutdown()
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print("\nSaved →", args.save)
+
+    if args.baseline:
+        return compare(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Corpus QC benchmark: cold passes at several worker counts, then a warm re-run.
+Run from project root: python scripts/bench_qc.py [--docs 50000] [--workers 1,4]
+
+Writes a synthetic corpus (blogs + web copy, ~400 words each) and trend
+keywords into a temp output root. Each cold pass starts from an empty QC
+cache; the warm pass re-runs over the unchanged corpus. Every cold pass must
+produce the same reports as the first (pool workers see the same output root
+and keywords as the inline path) and nothing may be written outside the root.
+"""
+
+import os, sys, json, time, random, shutil, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.paths import set_output_root, output_file, output_path
+
+WORDS = (
+    "paint wall colour finish coverage washable matte satin emulsion primer interior "
+    "exterior durable modern eco friendly brush roller coat room home ceiling texture "
+    "shade palette warm cool neutral bold the a of and to for with your our"
+).split()
+
+
+KEYWORDS = ["washable matte", "eco friendly", "ceiling"]
+
+
+def write_corpus(n, rng):
+    with open(output_file("raw", "google_trends.json"), "w") as f:
+        json.dump({"keywords": KEYWORDS}, f)
+    for i in range(n):
+        body = "\n\n".join(
+            f"## Section {s}\n" + " ".join(rng.choice(WORDS) for _ in range(100)) + "."
+            for s in range(4)
+        )
+        if i % 2:
+            with open(output_file("blogs", f"post-{i}.md"), "w") as f:
+                f.write(f"# Post {i}\n\n{body}")
+        else:
+            with open(output_file("web_copy", f"page-{i}.json"), "w") as f:
+                json.dump({"title": f"Page {i}", "slug": f"page-{i}", "body": body}, f)
+
+
+def reports():
+    """{doc id: keyword counts} from the per-artifact QC reports."""
+    out = {}
+    qc_dir = output_path("qc")
+    for kind in sorted(os.listdir(qc_dir)):
+        if os.path.isdir(os.path.join(qc_dir, kind)):
+            for name in os.listdir(os.path.join(qc_dir, kind)):
+                with open(os.path.join(qc_dir, kind, name)) as f:
+                    out[f"{kind}/{name}"] = json.load(f)["result"].get("keywords")
+    return out
+
+
+def stray_writes():
+    path = os.path.join("outputs", ".cache", "markdown.jsonl")
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=50000)
+    ap.add_argument("--workers", default=f"1,{os.cpu_count() or 2}")
+    args = ap.parse_args()
+
+    from pipeline.qc_runner import run_corpus_qc
+
+    with tempfile.TemporaryDirectory() as root:
+        set_output_root(root)
+        t = time.perf_counter()
+        write_corpus(args.docs, random.Random(0))
+        print(f"corpus: {args.docs} documents written in {time.perf_counter() - t:.1f}s\n")
+
+        print(f"{'pass':<6} {'workers':>7} {'checked':>8} {'cached':>8} {'elapsed s':>10} {'docs/s':>9}")
+        expected, stray = None, stray_writes()
+        for w in (int(x) for x in args.workers.split(",")):
+            shutil.rmtree(output_path(".cache"), ignore_errors=True)
+            shutil.rmtree(output_path("qc"), ignore_errors=True)
+            t = time.perf_counter()
+            s = run_corpus_qc(workers=w)
+            el = time.perf_counter() - t
+            print(f"{'cold':<6} {w:>7} {s['checked']:>8} {s['cached']:>8} {el:>10.2f} {s['documents'] / el:>9.0f}")
+
+            got = reports()
+            if not all(got.values()):
+                sys.exit(f"workers={w}: reports without trend keywords")
+            if expected is not None and got != expected:
+                sys.exit(f"workers={w}: reports differ from workers={args.workers.split(',')[0]}")
+            expected = got
+            if stray_writes() != stray:
+                sys.exit(f"workers={w}: wrote outputs/.cache/markdown.jsonl outside the output root")
+
+        t = time.perf_counter()
+        s = run_corpus_qc()
+        el = time.perf_counter() - t
+        print(f"{'warm':<6} {'-':>7} {s['checked']:>8} {s['cached']:>8} {el:>10.2f} {s['documents'] / el:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
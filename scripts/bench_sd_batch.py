@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Local SD batching benchmark: images/sec vs LOCAL_SD_BATCH.
+Run from project root: python scripts/bench_sd_batch.py [--url http://127.0.0.1:7860/sdapi/v1/txt2img]
+
+Without --url it starts pipeline.mock_server simulating one GPU with a
+fixed per-call overhead and a per-image cost. Each batch size submits the
+same set of concurrent prompts through pipeline.sd_batcher.
+"""
+
+import os, sys, time, argparse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run(url, batch_size, prompts, identical, timeout):
+    from pipeline.sd_batcher import SDBatcher
+
+    batcher = SDBatcher(lambda: url, batch_size=batch_size)
+    params = {"steps": 20}
+    jobs = ["calm interior, soft light" if identical else f"calm interior #{i}" for i in range(prompts)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=prompts) as pool:
+        images = list(pool.map(lambda p: batcher.generate(p, params, timeout), jobs))
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for img in images if img)
+    return ok, elapsed, batcher.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images/sec vs txt2img batch size.")
+    parser.add_argument("--url", help="Real A1111 txt2img endpoint (default: mock)")
+    parser.add_argument("--batch-sizes", default="1,2,4,8")
+    parser.add_argument("--prompts", type=int, default=32)
+    parser.add_argument("--identical", action="store_true",
+                        help="Same prompt everywhere (batch_size path instead of prompt list)")
+    parser.add_argument("--overhead-ms", type=float, default=400.0, help="Mock per-call cost")
+    parser.add_argument("--per-image-ms", type=float, default=100.0, help="Mock per-image cost")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        from pipeline.mock_server import start_mock_server
+        server, urls = start_mock_server(sd_overhead_ms=args.overhead_ms, per_image_ms=args.per_image_ms)
+        url = urls["local_sd_url"]
+
+    print(f"{'batch':>6} {'images':>7} {'calls':>6} {'elapsed s':>10} {'images/s':>9}")
+    for size in [int(x) for x in args.batch_sizes.split(",") if x]:
+        ok, elapsed, calls = run(url, size, args.prompts, args.identical, args.timeout)
+        print(f"{size:>6} {ok:>7} {calls:>6} {elapsed:>10.2f} {ok / elapsed:>9.2f}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
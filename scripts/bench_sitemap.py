@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Sitemap engine benchmark: full build, then incremental republishes.
+Run from project root: python scripts/bench_sitemap.py [--urls 500000]
+
+  build     record every URL and publish all shards + the index
+  reload    a fresh process-equivalent load of the URL index
+  noop      re-record every URL with unchanged content, then publish
+  one       change one page's content, then publish
+"""
+
+import os, sys, time, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.sitemap import Sitemap, SHARD_DIR
+
+
+def timed(label, fn):
+    t = time.perf_counter()
+    result = fn()
+    el = time.perf_counter() - t
+    print(f"{label:<8} {el:>9.2f} {result.get('written', '-'):>8} {result.get('shards', '-'):>7}")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--urls", type=int, default=500000)
+    args = ap.parse_args()
+
+    locs = [f"https://calycopaints.com/blog/post-{i}" for i in range(args.urls)]
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{args.urls} URLs\n")
+        print(f"{'step':<8} {'elapsed s':>9} {'written':>8} {'shards':>7}")
+
+        sm = Sitemap(root)
+
+        def build():
+            for loc in locs:
+                sm.update(loc, "v1", lastmod="2025-01-01")
+            return sm.publish()
+
+        timed("build", build)
+        sm = Sitemap(root)
+        timed("reload", lambda: {"urls": len(sm)})
+
+        def noop():
+            changed = sum(sm.update(loc, "v1") for loc in locs)
+            assert changed == 0
+            return sm.publish()
+
+        timed("noop", noop)
+
+        def one():
+            sm.update(locs[len(locs) // 2], "v2")
+            return sm.publish()
+
+        timed("one", one)
+
+        shard_dir = os.path.join(root, SHARD_DIR)
+        size = sum(os.path.getsize(os.path.join(shard_dir, f)) for f in os.listdir(shard_dir))
+        print(f"\n{len(os.listdir(shard_dir))} gzipped shards, {size / 1e6:.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long does a cold worker take to import the pipeline?
+Run from project root: python scripts/bench_startup.py [--runs 15]
+
+Each scenario runs in a fresh interpreter inside an empty temp directory,
+so it also checks that importing creates no files.
+
+  baseline  python -c pass (interpreter start-up only)
+  lazy      import pipeline
+  qc        from pipeline import run_quality_checks
+  eager     touch every export (submodules only, heavy deps stay lazy)
+  legacy    every export plus the third-party imports the old eager
+            __init__ pulled in — the "before" number
+"""
+
+import os, sys, json, argparse, statistics, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "baseline": "pass",
+    "lazy": "import pipeline",
+    "qc": "from pipeline import run_quality_checks",
+    "eager": "import pipeline\nfor n in pipeline.__all__:\n    getattr(pipeline, n)",
+    "legacy": (
+        "import selenium.webdriver, selenium.webdriver.chrome.options\n"
+        "import requests, textstat, slugify\n"
+        "import pipeline\nfor n in pipeline.__all__:\n    getattr(pipeline, n)"
+    ),
+}
+
+PROBE = """
+import time, sys, json
+t = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t
+heavy = [m for m in ("selenium", "requests", "textstat", "slugify") if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_once(code):
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code)],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1:], []
+        created = os.listdir(cwd)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        return result["elapsed"], result["heavy"], created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10} {'median ms':>10} {'min ms':>8}  heavy modules loaded / files created")
+    for name, code in SCENARIOS.items():
+        times, heavy, created = [], [], []
+        for _ in range(args.runs):
+            t, heavy, created = run_once(code)
+            if t is None:
+                break
+            times.append(t * 1000)
+
+        if not times:
+            print(f"{name:<10} {'failed':>10}           {heavy}")
+            continue
+
+        note = ", ".join(heavy) or "-"
+        if created:
+            note += f"  ⚠️ created: {', '.join(created)}"
+        print(f"{name:<10} {statistics.median(times):>10.1f} {min(times):>8.1f}  {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Text analysis benchmark: single-pass TextAnalysis vs the old per-check scans.
+Run from project root: python scripts/bench_text_analysis.py [--docs 2000] [--words 600]
+
+  old       textstat.flesch_reading_ease + lower()/split() brand and SEO scans
+  new       qc.check_text: one TextAnalysis shared by every check
+
+Readability parity: max |new - textstat| Flesch score over the corpus.
+When the NLTK cmudict corpus is not installed, textstat is pointed at an
+empty dictionary (instead of trying to download it on every call) so both
+sides count syllables with Pyphen.
+"""
+
+import os, sys, time, random, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.brand_rules import load_rules
+from pipeline.qc import check_text
+from pipeline.text_analysis import analyze, syllables, _dictionaries
+
+VOCAB = (
+    "paint wall colour finish coverage washable matte satin emulsion primer interior "
+    "exterior durable modern eco-friendly brush roller coat room home ceiling texture "
+    "shade palette warm cool neutral bold beautiful everyday washability don't it's "
+    "the a of and to for with your our is are choose apply"
+).split()
+
+
+def document(rng, words):
+    parts, n = [f"# Guide {rng.randint(0, 10**6)}\n"], 0
+    while n < words:
+        if rng.random() < 0.03:
+            parts.append(f"\n\n## Section {n}\n")
+        sentence = [rng.choice(VOCAB) for _ in range(rng.randint(3, 20))]
+        parts.append(" ".join(sentence).capitalize() + rng.choice(".!?") + " ")
+        n += len(sentence)
+    return "".join(parts)
+
+
+def old_check(textstat, phrases, text):
+    lowered = text.lower()
+    return {
+        "readability_score": textstat.flesch_reading_ease(text),
+        "brand_violations": [p for p in phrases if p.lower() in lowered],
+        "seo_issues": [i for i, bad in (("headings", text.count("#") < 2),
+                                        ("short", len(text.split()) < 300)) if bad],
+    }
+
+
+def timed(fn, docs):
+    t = time.perf_counter()
+    results = [fn(d) for d in docs]
+    return time.perf_counter() - t, results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--words", type=int, default=600)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    docs = [document(rng, args.words) for _ in range(args.docs)]
+    cmu, _ = _dictionaries()
+
+    try:
+        import textstat
+    except ImportError:
+        textstat = None
+    if textstat is not None and not cmu:
+        from textstat.backend.counts import _count_syllables
+        _count_syllables.get_cmudict = lambda lang: {}
+
+    print(f"{len(docs)} documents x ~{args.words} words, "
+          f"syllables from {'cmudict' if cmu else 'pyphen'}\n")
+    print(f"{'impl':<6} {'elapsed s':>10} {'docs/s':>9}")
+
+    if textstat is not None:
+        phrases = list(load_rules().rules.values())
+        t_old, old = timed(lambda d: old_check(textstat, phrases, d), docs)
+        print(f"{'old':<6} {t_old:>10.2f} {len(docs) / t_old:>9.0f}")
+
+    syllables.cache_clear()
+    analyze.cache_clear()
+    t_new, new = timed(check_text, docs)
+    print(f"{'new':<6} {t_new:>10.2f} {len(docs) / t_new:>9.0f}")
+
+    if textstat is not None:
+        diffs = [abs(a["readability_score"] - b["readability_score"]) for a, b in zip(old, new)]
+        print(f"\nspeedup {t_old / t_new:.1f}x; Flesch max |diff| {max(diffs):.6f}, "
+              f"mean {sum(diffs) / len(diffs):.6f}")
+
+
+if __name__ == "__main__":
+    main()